@@ -0,0 +1,111 @@
+"""
+Admission Control
+WSGI middleware that sheds load by estimated request cost before any body is read
+"""
+
+import json
+import re
+
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import ClosingIterator, get_content_length
+
+from api.request_decoding import ENCODED_LENGTH_KEY
+from services.admission import AdmissionController
+from services.metrics import metrics
+
+# Paths that are never shed: node-to-node cache traffic and monitoring
+EXEMPT_PREFIXES = ('/api/cache/', '/api/metrics')
+
+ERROR_NAMES = {429: 'Too Many Requests', 503: 'Service Unavailable'}
+
+# Methods whose requests carry no body worth costing
+BODILESS_METHODS = ('GET', 'HEAD', 'DELETE')
+
+# Event streams stay open for a job's lifetime: rate-checked, but they
+# don't hold a concurrency slot
+UNPOOLED_PATHS = re.compile(r'/api/jobs/[^/]+/events')
+
+
+def _reject(status: int, message: str, retry_after: float, environ, start_response):
+    # Rejected before Flask runs, so mirror the 429/503 error handlers
+    response = Response(json.dumps({
+        'error': ERROR_NAMES[status],
+        'message': message,
+        'status': status
+    }), status=status, mimetype='application/json')
+    response.headers['Retry-After'] = AdmissionController.retry_after_header(retry_after)
+    return response(environ, start_response)
+
+
+class AdmissionMiddleware:
+    """
+    Estimate each /api request's cost from Content-Length (the wire size
+    for compressed bodies; requests without a body cost the base unit),
+    check it against the rate buckets, then hold a slot of the cheap or
+    expensive concurrency pool until the response, streamed or not, is
+    closed. Overloaded requests get a fast 429/503 with Retry-After.
+    """
+
+    def __init__(self, wsgi_app, controller: AdmissionController, max_length: int,
+                 trust_forwarded_for: bool = False):
+        self.wsgi_app = wsgi_app
+        self.controller = controller
+        self.max_length = max_length
+        self.trust_forwarded_for = trust_forwarded_for
+
+    def _client(self, environ) -> str:
+        if self.trust_forwarded_for:
+            forwarded = environ.get('HTTP_X_FORWARDED_FOR', '')
+            if forwarded:
+                return forwarded.split(',')[0].strip()
+        return environ.get('REMOTE_ADDR', '')
+
+    @staticmethod
+    def _has_body(environ) -> bool:
+        if environ.get('REQUEST_METHOD') in BODILESS_METHODS:
+            return False
+        return (ENCODED_LENGTH_KEY in environ or bool(environ.get('CONTENT_LENGTH'))
+                or 'chunked' in environ.get('HTTP_TRANSFER_ENCODING', '').lower())
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if (not path.startswith('/api/') or path.startswith(EXEMPT_PREFIXES)
+                or environ.get('REQUEST_METHOD') == 'OPTIONS'):
+            return self.wsgi_app(environ, start_response)
+
+        # Compressed bodies were swapped for an inflating stream outside us
+        compressed = ENCODED_LENGTH_KEY in environ
+        if not self._has_body(environ):
+            cost = self.controller.estimate_cost(0)
+        else:
+            cost = self.controller.estimate_cost(
+                environ[ENCODED_LENGTH_KEY] if compressed else get_content_length(environ),
+                compressed=compressed,
+                max_length=self.max_length
+            )
+
+        status, retry_after = self.controller.check_rate(self._client(environ), cost)
+        if status == 429:
+            return _reject(429, 'Request rate limit exceeded for this client', retry_after,
+                           environ, start_response)
+        if status == 503:
+            return _reject(503, 'The server is at capacity. Please try again later', retry_after,
+                           environ, start_response)
+
+        if UNPOOLED_PATHS.fullmatch(path):
+            metrics.increment('admission.admitted.unpooled')
+            return self.wsgi_app(environ, start_response)
+
+        pool = self.controller.pool_for(cost)
+        if not pool.acquire():
+            metrics.increment(f'admission.shed.{pool.name}')
+            return _reject(503, 'The server is at capacity. Please try again later',
+                           self.controller.retry_after, environ, start_response)
+
+        metrics.increment(f'admission.admitted.{pool.name}')
+        try:
+            app_iter = self.wsgi_app(environ, start_response)
+        except BaseException:
+            pool.release()
+            raise
+        return ClosingIterator(app_iter, pool.release)
@@ -0,0 +1,282 @@
+"""
+Response Compression
+Size-aware gzip/brotli negotiation with streaming compressors
+"""
+
+import time
+import zlib
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from flask import Response, current_app, request
+
+from services.cache_backend import CacheBackend
+from services.cancellation import CancellationToken
+from services.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+# Preference order when the client accepts several encodings equally
+PREFERRED_ENCODINGS = ('br', 'gzip')
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html', 'text/event-stream'}
+
+# Per-route settings attached by @compressible
+_ROUTE_SETTINGS_ATTR = '_compression_settings'
+
+# Where store_compressed() asks compress_response() to keep the body
+_COMPRESSED_STORE_ATTR = 'compressed_store'
+
+# Compressed bodies larger than this aren't kept for precompressed serving
+PRECOMPRESSED_MAX_BYTES = 16 * 1024 * 1024
+
+
+def available_encodings() -> tuple:
+    return tuple(name for name in PREFERRED_ENCODINGS if name != 'br' or brotli is not None)
+
+
+def negotiate_encoding(accept_encoding: str, available: Iterable[str] = None) -> Optional[str]:
+    """
+    Pick the best content coding from an Accept-Encoding header.
+    Returns None for identity.
+    """
+    available = tuple(available if available is not None else available_encodings())
+    if not accept_encoding:
+        return None
+
+    qualities = {}
+    for part in accept_encoding.split(','):
+        fields = part.strip().split(';')
+        name = fields[0].strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in fields[1:]:
+            key, _, value = param.strip().partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+
+    best, best_quality = None, 0.0
+    for name in available:
+        quality = qualities.get(name, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class StreamingCompressor:
+    """Incremental gzip or brotli compressor with a CPU-time meter."""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        self.cpu_seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        if encoding == 'gzip':
+            # wbits=31 -> gzip container
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif encoding == 'br':
+            if brotli is None:
+                raise ValueError("brotli is not installed")
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def _metered(self, func, *args) -> bytes:
+        start = time.thread_time()
+        output = func(*args)
+        self.cpu_seconds += time.thread_time() - start
+        self.bytes_out += len(output)
+        return output
+
+    def compress(self, data: bytes) -> bytes:
+        self.bytes_in += len(data)
+        if self.encoding == 'br':
+            return self._metered(self._compressor.process, data)
+        return self._metered(self._compressor.compress, data)
+
+    def flush(self) -> bytes:
+        """Emit everything buffered so far (keeps chunked streams moving)."""
+        if self.encoding == 'br':
+            return self._metered(self._compressor.flush)
+        return self._metered(self._compressor.flush, zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._metered(self._compressor.finish)
+        return self._metered(self._compressor.flush, zlib.Z_FINISH)
+
+
+def _record(compressor: StreamingCompressor, route: str):
+    prefix = f'compression.{route}.{compressor.encoding}'
+    metrics.increment(f'{prefix}.responses')
+    metrics.increment(f'{prefix}.bytes_in', compressor.bytes_in)
+    metrics.increment(f'{prefix}.bytes_out', compressor.bytes_out)
+    metrics.increment(f'{prefix}.cpu_seconds', compressor.cpu_seconds)
+
+
+def _compress_stream(chunks: Iterable[bytes], compressor: StreamingCompressor,
+                     route: str, store: Callable[[bytes], None] = None) -> Iterator[bytes]:
+    # Output is collected for `store` until it grows past PRECOMPRESSED_MAX_BYTES
+    kept = [] if store is not None else None
+    try:
+        for chunk in chunks:
+            output = compressor.compress(chunk) + compressor.flush()
+            if output:
+                if kept is not None and compressor.bytes_out > PRECOMPRESSED_MAX_BYTES:
+                    kept = None
+                elif kept is not None:
+                    kept.append(output)
+                yield output
+        output = compressor.finish()
+        if kept is not None and compressor.bytes_out <= PRECOMPRESSED_MAX_BYTES:
+            kept.append(output)
+            store(b''.join(kept))
+        yield output
+        _record(compressor, route)
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def compressible(level: Dict[str, int] = None, min_size: int = None):
+    """
+    Opt a route into response compression.
+
+    `level` maps encoding to compression level ({'gzip': 6, 'br': 4});
+    `min_size` overrides COMPRESSION_MIN_SIZE for this route.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return view(*args, **kwargs)
+        setattr(wrapper, _ROUTE_SETTINGS_ATTR, {'level': level or {}, 'min_size': min_size})
+        return wrapper
+    return decorator
+
+
+def _route_settings() -> Optional[dict]:
+    if request.endpoint is None:
+        return None
+    view = current_app.view_functions.get(request.endpoint)
+    return getattr(view, _ROUTE_SETTINGS_ATTR, None)
+
+
+def _negotiate(settings: dict) -> Optional[Tuple[str, int, int]]:
+    """(encoding, level, min_size) for this request's response, or None for identity."""
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding', ''))
+    if encoding is None:
+        return None
+    min_size = settings['min_size']
+    if min_size is None:
+        min_size = current_app.config.get('COMPRESSION_MIN_SIZE', 1024)
+    level = settings['level'].get(
+        encoding, current_app.config.get('COMPRESSION_LEVELS', {}).get(encoding, 6)
+    )
+    return encoding, level, min_size
+
+
+def variant_key(key: str, encoding: str, level: int) -> str:
+    """Cache key of the body cached under `key`, compressed with `encoding` at `level`."""
+    return f'{key}.{encoding}{level}'
+
+
+def cached_compressed_response(cache: CacheBackend, key: str,
+                               mimetype: str = 'application/json') -> Optional[Response]:
+    """
+    The body kept for `key` by store_compressed(), in the encoding and
+    level this request's response would get, served without recompressing.
+    None when the response wouldn't be compressed or no variant is cached.
+    """
+    settings = _route_settings()
+    if not current_app.config.get('COMPRESSION_ENABLED', True) or settings is None:
+        return None
+    negotiated = _negotiate(settings)
+    if negotiated is None:
+        return None
+    encoding, level, _ = negotiated
+    body = cache.get(variant_key(key, encoding, level))
+    if body is None:
+        return None
+    response = Response(body, mimetype=mimetype)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    metrics.increment(f'compression.precompressed.{encoding}.responses')
+    return response
+
+
+def store_compressed(response: Response, cache: CacheBackend, key: str,
+                     cancel: CancellationToken = None) -> Response:
+    """
+    Have compress_response() keep the compressed body of `response` in
+    `cache` for cached_compressed_response(). Nothing is kept when
+    `cancel` fires, as the stream then ends early.
+    """
+    setattr(response, _COMPRESSED_STORE_ATTR, (cache, key, cancel))
+    return response
+
+
+def _compressed_store(response: Response, encoding: str, level: int) -> Optional[Callable[[bytes], None]]:
+    target = getattr(response, _COMPRESSED_STORE_ATTR, None)
+    if target is None:
+        return None
+    cache, key, cancel = target
+
+    def store(body: bytes):
+        if cancel is not None and cancel.cancelled:
+            return
+        if cache.put(variant_key(key, encoding, level), body):
+            metrics.increment(f'compression.precompressed.{encoding}.stored')
+    return store
+
+
+def compress_response(response: Response) -> Response:
+    """after_request hook: compress opted-in responses above the size threshold."""
+    if not current_app.config.get('COMPRESSION_ENABLED', True):
+        return response
+    settings = _route_settings()
+    if settings is None:
+        return response
+    if (response.status_code != 200 or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    negotiated = _negotiate(settings)
+    if negotiated is None:
+        return response
+    encoding, level, min_size = negotiated
+    route = request.endpoint
+    store = _compressed_store(response, encoding, level)
+
+    if not response.is_streamed:
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+        compressor = StreamingCompressor(encoding, level)
+        response.set_data(compressor.compress(body) + compressor.finish())
+        _record(compressor, route)
+        if store is not None and len(response.get_data()) <= PRECOMPRESSED_MAX_BYTES:
+            store(response.get_data())
+    else:
+        # Streamed bodies can't be peeked here without running the generator
+        # outside its context, so rely on the size hint set by stream_json()
+        size_hint = getattr(response, 'size_hint', None)
+        if size_hint is not None and size_hint < min_size:
+            return response
+        response.response = _compress_stream(
+            response.response, StreamingCompressor(encoding, level), route, store
+        )
+        response.headers.pop('Content-Length', None)
+
+    response.headers['Content-Encoding'] = encoding
+    return response
+
@@ -48,6 +48,17 @@ def register_error_handlers(app):
             'status': 415
         }), 415
     
+    @app.errorhandler(429)
+    def too_many_requests(error):
+        response = jsonify({
+            'error': 'Too Many Requests',
+            'message': 'Request rate limit exceeded. Please slow down',
+            'status': 429
+        })
+        if getattr(error, 'retry_after', None) is not None:
+            response.headers['Retry-After'] = str(error.retry_after)
+        return response, 429
+    
     @app.errorhandler(500)
     def internal_server_error(error):
         return jsonify({
@@ -66,11 +77,22 @@ def register_error_handlers(app):
     
     @app.errorhandler(503)
     def service_unavailable(error):
-        return jsonify({
+        response = jsonify({
             'error': 'Service Unavailable',
             'message': 'The service is temporarily unavailable. Please try again later',
             'status': 503
-        }), 503
+        })
+        if getattr(error, 'retry_after', None) is not None:
+            response.headers['Retry-After'] = str(error.retry_after)
+        return response, 503
+    
+    @app.errorhandler(504)
+    def gateway_timeout(error):
+        return jsonify({
+            'error': 'Gateway Timeout',
+            'message': 'The request took too long to complete. Please try again later',
+            'status': 504
+        }), 504
     
     @app.errorhandler(Exception)
     def handle_unexpected_error(error):
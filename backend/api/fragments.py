@@ -0,0 +1,72 @@
+"""
+Pre-serialized JSON Fragments
+Per-request cache of encoded orp_data entries
+"""
+
+from typing import Dict, Iterator, Tuple
+
+from api.json_stream import StreamingJSONEncoder
+from services.orp_calculator import ORPCalculator
+from services.processed_document import TOKEN_FLAG_HEADING, ProcessedDocument
+
+# orp_data items sit inside the top-level dict's list
+ORP_ITEM_DEPTH = 2
+
+BLANK_PAUSE_ENTRY = {
+    'word': '',
+    'before': '',
+    'orp': '',
+    'after': '',
+    'position': 0,
+    'is_heading': False
+}
+
+
+class ORPFragmentCache:
+    """
+    Encodes each distinct (word, is_heading) orp_data entry once.
+
+    Documents repeat a small vocabulary thousands of times, so the hot loop
+    only appends references to cached strings instead of building and
+    re-encoding a fresh dict per occurrence.
+    """
+
+    def __init__(self, encoder: StreamingJSONEncoder, orp_calc: ORPCalculator = None):
+        self.encoder = encoder
+        self.orp_calc = orp_calc or ORPCalculator()
+        self.fragments: Dict[Tuple[str, bool], str] = {}
+        # Shared by every blank pause in the document
+        self.blank_pause = encoder.encode_leaf(BLANK_PAUSE_ENTRY, ORP_ITEM_DEPTH)
+
+    def get(self, word: str, is_heading: bool = False) -> str:
+        if not word.strip():
+            return self.blank_pause
+
+        key = (word, is_heading)
+        fragment = self.fragments.get(key)
+        if fragment is None:
+            orp_info = self.orp_calc.split_word(word)
+            fragment = self.encoder.encode_leaf({
+                'word': word,
+                'before': orp_info['before'],
+                'orp': orp_info['orp'],
+                'after': orp_info['after'],
+                'position': orp_info['orp_position'],
+                'is_heading': is_heading
+            }, ORP_ITEM_DEPTH)
+            self.fragments[key] = fragment
+        return fragment
+
+    def iter_document(self, document: ProcessedDocument) -> Iterator[str]:
+        """Fragments for document.iter_orp_data(), without building the dicts."""
+        get = self.get
+        for word, _, multiplier, flags in document.iter_tokens():
+            fragment = get(word, bool(flags & TOKEN_FLAG_HEADING))
+            if multiplier == 1:
+                yield fragment
+            else:
+                yield from (fragment,) * multiplier
+
+    @property
+    def unique_entries(self) -> int:
+        return len(self.fragments)
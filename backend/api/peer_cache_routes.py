@@ -0,0 +1,78 @@
+"""
+Peer Cache Endpoints
+Serve this node's local result cache to the other backend nodes
+"""
+
+import base64
+import hmac
+import re
+
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from services.peer_cache import PEER_TOKEN_HEADER
+
+peer_cache_blueprint = Blueprint('peer_cache', __name__)
+
+# Cache keys are hex digests; anything else is rejected before touching storage
+CACHE_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_.-]{1,128}$')
+
+
+def _local_cache():
+    return current_app.extensions['local_result_cache']
+
+
+def _invalid_keys(keys) -> bool:
+    return not isinstance(keys, (list, dict)) or not all(
+        isinstance(key, str) and CACHE_KEY_PATTERN.match(key) for key in keys
+    )
+
+
+@peer_cache_blueprint.before_request
+def check_peer_token():
+    token = current_app.config.get('CACHE_PEER_TOKEN', '')
+    if not token or not hmac.compare_digest(request.headers.get(PEER_TOKEN_HEADER, ''), token):
+        return jsonify({
+            'error': 'Forbidden',
+            'message': 'Peer cache endpoints require a valid cache token'
+        }), 403
+
+
+@peer_cache_blueprint.route('/entries/<key>', methods=['GET'])
+def get_entry(key):
+    if not CACHE_KEY_PATTERN.match(key):
+        return jsonify({'error': 'Invalid key'}), 400
+    value = _local_cache().get(key)
+    if value is None:
+        return jsonify({'error': 'Not Found'}), 404
+    return Response(value, mimetype='application/octet-stream')
+
+
+@peer_cache_blueprint.route('/entries/<key>', methods=['PUT'])
+def put_entry(key):
+    if not CACHE_KEY_PATTERN.match(key):
+        return jsonify({'error': 'Invalid key'}), 400
+    _local_cache().put(key, request.get_data())
+    return '', 204
+
+
+@peer_cache_blueprint.route('/batch-get', methods=['POST'])
+def batch_get():
+    keys = (request.get_json(silent=True) or {}).get('keys')
+    if _invalid_keys(keys):
+        return jsonify({'error': 'Invalid keys'}), 400
+    values = _local_cache().get_many(keys)
+    return jsonify({
+        'values': {key: base64.b64encode(value).decode('ascii') for key, value in values.items()}
+    })
+
+
+@peer_cache_blueprint.route('/batch-put', methods=['POST'])
+def batch_put():
+    values = (request.get_json(silent=True) or {}).get('values')
+    if _invalid_keys(values):
+        return jsonify({'error': 'Invalid keys'}), 400
+    try:
+        items = {key: base64.b64decode(value, validate=True) for key, value in values.items()}
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid values'}), 400
+    return jsonify({'stored': _local_cache().put_many(items)})
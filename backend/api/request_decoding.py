@@ -0,0 +1,135 @@
+"""
+Compressed Request Bodies
+WSGI middleware that inflates gzip/deflate uploads incrementally
+"""
+
+import io
+import json
+import zlib
+
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import LimitedStream, get_content_length
+
+from services.metrics import metrics
+
+# zlib wbits per Content-Encoding: 16+ -> gzip container, 32+ -> accept
+# either zlib or gzip framing for "deflate", which clients disagree on
+REQUEST_ENCODINGS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'x-gzip': 16 + zlib.MAX_WBITS,
+    'deflate': 32 + zlib.MAX_WBITS,
+}
+
+# Compressed bytes read from the socket per step
+READ_CHUNK_SIZE = 64 * 1024
+
+# WSGI environ key keeping the wire Content-Length of an inflated body
+# (None if it had none) for inner middleware such as admission control
+ENCODED_LENGTH_KEY = 'speedread.encoded_content_length'
+
+
+class DecompressingStream(io.RawIOBase):
+    """
+    Read-only stream that inflates a compressed source on demand.
+
+    Never inflates more than the caller asked for (zlib max_length), and
+    raises 413 as soon as the decompressed total passes max_size, so a
+    zip bomb is stopped after at most max_size bytes of output.
+    """
+
+    def __init__(self, source, wbits: int, max_size: int):
+        self.source = source
+        self.max_size = max_size
+        self.total = 0
+        self._decompressor = zlib.decompressobj(wbits)
+        self._pending = b''  # Compressed input not yet consumed
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def _inflate(self, size: int) -> bytes:
+        output = b''
+        while not output and not self._eof:
+            if not self._pending:
+                self._pending = self.source.read(READ_CHUNK_SIZE)
+                if not self._pending:
+                    if not self._decompressor.eof:
+                        raise BadRequest("Truncated compressed request body")
+                    self._eof = True
+                    break
+            try:
+                output = self._decompressor.decompress(self._pending, size)
+            except zlib.error:
+                raise BadRequest("Malformed compressed request body")
+            self._pending = self._decompressor.unconsumed_tail
+            if self._decompressor.eof:
+                # Trailing bytes after the compressed member are ignored
+                self._pending = b''
+                self._eof = True
+        return output
+
+    def _reject(self):
+        metrics.increment('request_decoding.rejected_too_large')
+        raise RequestEntityTooLarge(
+            f"Decompressed request body exceeds {self.max_size} bytes"
+        )
+
+    def readinto(self, buffer) -> int:
+        output = self._inflate(len(buffer))
+        self.total += len(output)
+        if self.total > self.max_size:
+            self._reject()
+        if self.total == self.max_size and not self._eof and self._inflate(1):
+            # Readers capped at exactly max_size (e.g. Werkzeug's
+            # MAX_CONTENT_LENGTH) would otherwise see a silently truncated body
+            self._reject()
+        buffer[:len(output)] = output
+        return len(output)
+
+
+class DecompressRequestMiddleware:
+    """
+    Accept `Content-Encoding: gzip`/`deflate` request bodies.
+
+    The body is swapped for a DecompressingStream before Flask sees it and
+    marked as self-terminating, so request.get_json() and friends read the
+    inflated bytes incrementally and MAX_CONTENT_LENGTH still applies to
+    the decompressed size.
+    """
+
+    def __init__(self, wsgi_app, max_size: int):
+        self.wsgi_app = wsgi_app
+        self.max_size = max_size
+
+    def __call__(self, environ, start_response):
+        encoding = environ.get('HTTP_CONTENT_ENCODING', '').strip().lower()
+        if encoding and encoding != 'identity':
+            wbits = REQUEST_ENCODINGS.get(encoding)
+            if wbits is None:
+                # Rejected before Flask runs, so mirror the 415 error handler
+                response = Response(json.dumps({
+                    'error': 'Unsupported Media Type',
+                    'message': f'Unsupported Content-Encoding: {encoding}. Use gzip or deflate',
+                    'status': 415
+                }), status=415, mimetype='application/json')
+                return response(environ, start_response)
+
+            source = environ['wsgi.input']
+            content_length = get_content_length(environ)
+            if content_length is not None:
+                source = LimitedStream(source, content_length)
+
+            environ['wsgi.input'] = io.BufferedReader(
+                DecompressingStream(source, wbits, self.max_size), READ_CHUNK_SIZE
+            )
+            environ['wsgi.input_terminated'] = True
+            environ[ENCODED_LENGTH_KEY] = content_length
+            environ.pop('CONTENT_LENGTH', None)
+            environ.pop('HTTP_CONTENT_ENCODING', None)
+            metrics.increment(f'request_decoding.{encoding}.requests')
+            if content_length is not None:
+                metrics.increment(f'request_decoding.{encoding}.bytes_in', content_length)
+
+        return self.wsgi_app(environ, start_response)
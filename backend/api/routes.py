@@ -1,27 +1,398 @@
 
 
-from flask import Blueprint, request, jsonify
+import json
+from array import array
+from flask import Blueprint, Response, current_app, request, jsonify, url_for
+from werkzeug.exceptions import GatewayTimeout, HTTPException, ServiceUnavailable
 from services.text_processor import TextProcessor
 from services.orp_calculator import ORPCalculator
 from services.word_preprocessor import WordPreprocessor
+from services.processed_document import TOKEN_FLAG_HEADING, TOKEN_FLAG_PAUSE, ProcessedDocument
+from services.bulkhead import BulkheadFullError, BulkheadTimeoutError
+from services.cancellation import CHECK_MASK, CancellationToken, OperationCancelled, socket_disconnect_probe
+from services.content_extractor import ContentExtractor
+from services.document_index import DocumentIndex, document_word_offsets, stream_word_offsets
+from services.document_sessions import DocumentSession
+from services.incremental import apply_edits
+from services.jobs import JOB_DONE, JOB_FAILED, JOB_CANCELLED, Job, QueueFullError
+from services.result_cache import cache_key
+from services.search_index import SearchIndex
+from services.single_flight import file_lock
+from services.stage_cache import TokenizedText
+from services.metrics import metrics
+from services.position_map import PositionMap, source_spans
 from utils.validators import Validator
+from utils.constants import PACING_OPTION_RANGES, TEXT_UPLOAD_EXTENSIONS
+from utils.text_decoding import TextTooLongError, decode_stream
+from api.json_stream import LazyList, new_encoder, stream_json
+from api.fragments import ORPFragmentCache
+from api.compression import cached_compressed_response, compressible, compress_response, store_compressed
 
 api_blueprint = Blueprint('api', __name__)
+api_blueprint.after_request(compress_response)
+
+# Body types accepted by /process-text besides application/json
+PLAIN_TEXT_MIMETYPE = 'text/plain'
+MULTIPART_MIMETYPE = 'multipart/form-data'
+TEXT_UPLOAD_FIELD = 'file'
+
+# /process-text output formats: per-word strings, or offsets into one text buffer
+OUTPUT_FORMATS = ('words', 'offsets')
+OFFSET_TOKEN_FIELDS = ['start', 'length', 'orp_offset', 'flags']
+
+# Background jobs: Retry-After when the queue is full, and seconds between
+# keep-alive comments on an idle progress stream
+JOB_RETRY_AFTER = 5
+JOB_EVENTS_HEARTBEAT = 15
+
+# Retry-After when an extraction or processing bulkhead is full
+BULKHEAD_RETRY_AFTER = 1
+
+# Status logged for requests abandoned by the client (nginx convention)
+CLIENT_CLOSED_REQUEST = 499
+
+# Options adding seek fields to the response ('index', 'toc', 'mapping')
+INDEX_OPTIONS = ('include_index', 'include_toc', 'include_mapping')
+
+# Session windows: tokens returned when no count is given, and the most per call
+SESSION_WINDOW_COUNT = 1000
+SESSION_WINDOW_MAX_COUNT = 100_000
+
+# Session search: matches returned when no limit is given, the most per
+# call, and the longest query accepted
+SEARCH_LIMIT = 100
+SEARCH_MAX_LIMIT = 10_000
+SEARCH_MAX_QUERY_LENGTH = 200
+
+
+def _error(error: str, message: str, status: int = 400):
+    return jsonify({
+        'error': error,
+        'message': message
+    }), status
+
+
+def _parse_bool(value, default: bool = True) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() not in ('false', '0', 'no', 'off', '')
+
+
+def _read_text_upload():
+    """
+    Read text from a text/plain body or a multipart .txt upload.
+    Bytes are decoded incrementally straight from the input stream, so
+    neither JSON escaping nor a full raw copy of the body is involved.
+    """
+    if request.mimetype == MULTIPART_MIMETYPE:
+        upload = request.files.get(TEXT_UPLOAD_FIELD)
+        if upload is None:
+            return None, None, _error(
+                'Missing file field',
+                f'Multipart body must contain a "{TEXT_UPLOAD_FIELD}" .txt file'
+            )
+        is_valid, error = Validator.validate_file_extension(upload.filename, TEXT_UPLOAD_EXTENSIONS)
+        if not is_valid:
+            return None, None, _error('Invalid file', error)
+        stream, charset = upload.stream, upload.mimetype_params.get('charset')
+        options = request.form
+    else:
+        stream, charset = request.stream, request.mimetype_params.get('charset')
+        options = request.args
+    
+    try:
+        text, _ = decode_stream(stream, Validator.MAX_TEXT_LENGTH, charset)
+    except TextTooLongError as e:
+        return None, None, _error('Invalid input', str(e))
+    
+    return text, {
+        'detect_headings': _parse_bool(options.get('detect_headings')),
+        'output': options.get('output', 'words'),
+        'session': _parse_bool(options.get('session'), False),
+        **_index_options(options),
+        **_pacing_options(options)
+    }, None
+
+
+def _read_process_text_request():
+    """
+    Returns (text, options, None) on success or (None, None, error_response).
+    """
+    if request.mimetype in (PLAIN_TEXT_MIMETYPE, MULTIPART_MIMETYPE):
+        return _read_text_upload()
+    
+    data = request.get_json()
+    if not data or 'text' not in data:
+        return None, None, _error('Missing text field', 'Request body must contain "text" field')
+    
+    return data['text'], {
+        'detect_headings': data.get('detect_headings', True),
+        'output': data.get('output', 'words'),
+        'session': _parse_bool(data.get('session'), False),
+        **_index_options(data),
+        **_pacing_options(data)
+    }, None
+
+
+def _pacing_options(source) -> dict:
+    return {name: source.get(name) for name in PACING_OPTION_RANGES}
+
+
+def _index_options(source) -> dict:
+    return {name: _parse_bool(source.get(name), False) for name in INDEX_OPTIONS}
+
+
+def _build_preprocessor(options: dict, cancel: CancellationToken = None):
+    """
+    WordPreprocessor for the request's pacing options (config defaults
+    for omitted ones). Returns (preprocessor, None) or (None, error_response).
+    """
+    pacing = {}
+    for name, (minimum, maximum) in PACING_OPTION_RANGES.items():
+        value = options.get(name)
+        if value is None:
+            continue
+        is_valid, error = Validator.validate_int_option(value, name, minimum, maximum)
+        if not is_valid:
+            return None, _error('Invalid input', error)
+        pacing[name] = int(value)
+    return WordPreprocessor(**pacing, cancel=cancel), None
+
+
+def _cancel_token() -> CancellationToken:
+    """
+    Cancellation token for this request: expires REQUEST_DEADLINE seconds
+    from now and, where the server exposes the client socket (gunicorn,
+    the werkzeug dev server), fires when the client disconnects.
+    """
+    probe = None
+    if current_app.config['DISCONNECT_DETECTION_ENABLED']:
+        sock = request.environ.get('gunicorn.socket') or request.environ.get('werkzeug.socket')
+        if sock is not None:
+            probe = socket_disconnect_probe(sock)
+    return CancellationToken.with_timeout(current_app.config['REQUEST_DEADLINE'], probe)
+
+
+def _cancelled_response(error: OperationCancelled):
+    if error.reason == 'disconnect':
+        # Never delivered; the status only shows up in access logs
+        return '', CLIENT_CLOSED_REQUEST
+    return _error('Timeout', 'Processing did not finish within the request deadline', 504)
+
+
+def _tokenize(text: str, processor: TextProcessor) -> TokenizedText:
+    """Text stage output, shared across requests for the same text."""
+    stage_cache = current_app.extensions.get('stage_cache')
+    if stage_cache is None:
+        return TokenizedText.from_text(text, processor)
+    return stage_cache.get(text, processor)
+
+
+def _build_stats(preprocessor: WordPreprocessor, original_count: int, processed_count: int,
+                 repeated_lines: int = 0) -> dict:
+    return {
+        'original_count': original_count,
+        'processed_count': processed_count,
+        'estimated_time_300wpm': round(preprocessor.estimate_reading_time(processed_count, 300), 1),
+        'estimated_time_500wpm': round(preprocessor.estimate_reading_time(processed_count, 500), 1),
+        'repeated_lines': repeated_lines
+    }
+
+
+def _run_in_bulkhead(name: str, func, *args, cancel: CancellationToken = None):
+    """
+    Run func(*args) on the named bulkhead's thread pool (inline when
+    bulkheads are disabled), inside this app's context. A full bulkhead
+    raises 503 with Retry-After, a call over its timeout 504 (and cancels
+    `cancel`, so the abandoned task stops at its next check).
+    """
+    bulkhead = current_app.extensions.get('bulkheads', {}).get(name)
+    if bulkhead is None:
+        return func(*args)
+    app = current_app._get_current_object()
+    
+    def task():
+        if cancel is not None:
+            # The deadline may have passed while queued
+            cancel.check()
+        with app.app_context():
+            return func(*args)
+    
+    try:
+        return bulkhead.run(task)
+    except BulkheadFullError as e:
+        raise ServiceUnavailable(str(e), retry_after=BULKHEAD_RETRY_AFTER)
+    except BulkheadTimeoutError as e:
+        if cancel is not None:
+            cancel.cancel('timeout')
+        raise GatewayTimeout(str(e))
+
+
+def _document_key(text: str, detect_headings: bool, preprocessor: WordPreprocessor) -> str:
+    """Result cache key of the processed document for the text and options."""
+    return cache_key(text, {
+        'detect_headings': bool(detect_headings),
+        'long_word_threshold': preprocessor.long_word_threshold,
+        'pause_count': preprocessor.pause_count
+    })
+
+
+def _load_or_process(text: str, detect_headings: bool, processor: TextProcessor,
+                     preprocessor: WordPreprocessor, orp_calc: ORPCalculator,
+                     key: str = None) -> ProcessedDocument:
+    """
+    Cached document for the text and options, computed at most once at a
+    time: identical concurrent requests share one pipeline run within the
+    worker (single-flight) and, with a lock directory, across workers.
+    `key` is the _document_key, when the caller already has it.
+    """
+    cache = current_app.extensions.get('result_cache')
+    single_flight = current_app.extensions.get('single_flight')
+    lock_dir = current_app.extensions.get('single_flight_lock_dir')
+    
+    def build():
+        tokens = _tokenize(text, processor)
+        word_flags = tokens.word_flags(text, processor) if detect_headings else None
+        return ProcessedDocument.from_words(tokens.words(), word_flags, preprocessor, orp_calc,
+                                            tokens.repeated_lines if detect_headings else 0)
+    
+    def process():
+        # Only the pipeline run takes a processing thread; coalesced
+        # followers wait here without one
+        document = _run_in_bulkhead('processing', build, cancel=processor.cancel)
+        if cache is not None:
+            cache.put_document(key, document)
+        return document
+    
+    def load_or_process():
+        if cache is None:
+            return process()
+        document = cache.get_document(key)
+        if document is not None:
+            return document
+        if lock_dir is None:
+            return process()
+        with file_lock(lock_dir, key, single_flight.timeout) as acquired:
+            # Another worker may have finished while we waited for the lock
+            document = cache.get_document(key) if acquired else None
+            return document if document is not None else process()
+    
+    if cache is None and single_flight is None:
+        return process()
+    
+    key = key or _document_key(text, detect_headings, preprocessor)
+    if single_flight is None:
+        return load_or_process()
+    return single_flight.do(key, load_or_process)
+
+
+def _build_seek_data(text: str, detect_headings: bool, processor: TextProcessor,
+                     word_offsets: array, sentence_words: array, options: dict,
+                     with_index: bool = False):
+    """
+    (DocumentIndex or None, PositionMap) for a processed text. The index
+    is only built when asked for (or `with_index`), and the position map
+    only locates words in the source text for include_mapping.
+    """
+    index = None
+    if with_index or options.get('include_index') or options.get('include_toc'):
+        index = DocumentIndex.build(word_offsets, sentence_words, processor.iter_lines(text),
+                                    detect_headings, processor.cancel)
+    spans = ()
+    if options.get('include_mapping'):
+        spans = source_spans(text, _tokenize(text, processor), processor.cancel)
+    return index, PositionMap(word_offsets, *spans)
+
+
+def _index_fields(index: DocumentIndex, positions: PositionMap, options: dict) -> dict:
+    """Response fields for the INDEX_OPTIONS the request asked for."""
+    fields = {}
+    if options.get('include_index'):
+        fields['index'] = index.to_dict()
+    if options.get('include_toc'):
+        fields['toc'] = index.toc_list()
+    if options.get('include_mapping'):
+        fields['mapping'] = positions.to_dict()
+    return fields
+
+
+def _build_offset_payload(text: str, detect_headings: bool, processor: TextProcessor,
+                          preprocessor: WordPreprocessor, orp_calc: ORPCalculator,
+                          options: dict = None) -> dict:
+    """
+    Offsets output: the normalized text once, plus a flat int list with
+    OFFSET_TOKEN_FIELDS per processed token. Tokens are spans into that
+    text, so no per-word strings are created for the response.
+    """
+    tokens = _tokenize(text, processor)
+    normalized, starts, lengths = tokens.normalized, tokens.starts, tokens.lengths
+    word_flags = tokens.word_flags(text, processor) if detect_headings else None
+    repeated_lines = tokens.repeated_lines if detect_headings else 0
+    indices, headings = preprocessor.preprocess_spans(normalized, starts, lengths, word_flags)
+    positions = orp_calc.positions_for_lengths(lengths, use_numpy=False)
+    
+    tokens = []
+    extend = tokens.extend
+    pause = (0, 0, 0, TOKEN_FLAG_PAUSE)
+    cancel = processor.cancel
+    for position, (index, is_heading) in enumerate(zip(indices, headings)):
+        if cancel is not None and not position & CHECK_MASK:
+            cancel.check()
+        if index < 0 or not lengths[index]:
+            extend(pause)
+        else:
+            extend((starts[index], lengths[index], positions[index] - 1,
+                    TOKEN_FLAG_HEADING if is_heading else 0))
+    
+    payload = {
+        'success': True,
+        'format': 'offsets',
+        'text': normalized,
+        'token_fields': OFFSET_TOKEN_FIELDS,
+        'tokens': tokens,
+        'stats': _build_stats(preprocessor, len(starts), len(indices), repeated_lines)
+    }
+    if options and any(options.get(name) for name in INDEX_OPTIONS):
+        index, positions = _build_seek_data(text, detect_headings, processor,
+                                            *stream_word_offsets(indices), options)
+        payload.update(_index_fields(index, positions, options))
+    return payload
+
+
+def _stream_document(document: ProcessedDocument, preprocessor: WordPreprocessor,
+                     orp_calc: ORPCalculator, cancel: CancellationToken = None, **extra):
+    """
+    Stream the body, rendering words and orp_data from the document as
+    it goes; orp_data entries are encoded once per distinct
+    (word, is_heading) and reused as pre-serialized fragments. Rendering
+    stops early if `cancel` fires.
+    """
+    encoder = new_encoder()
+    fragments = ORPFragmentCache(encoder, orp_calc)
+    return stream_json({
+        'success': True,
+        'words': LazyList(len(document), document.iter_words),
+        'orp_data': LazyList(len(document), lambda: fragments.iter_document(document), encoded=True),
+        'stats': _build_stats(preprocessor, document.original_count, len(document),
+                              document.repeated_lines),
+        **extra
+    }, 200, encoder=encoder, cancel=cancel)
 
 
 @api_blueprint.route('/process-text', methods=['POST'])
+@compressible(level={'gzip': 6, 'br': 4})
 def process_text():
     try:
-        # Validate request
-        data = request.get_json()
-        if not data or 'text' not in data:
-            return jsonify({
-                'error': 'Missing text field',
-                'message': 'Request body must contain "text" field'
-            }), 400
+        # Validate request (JSON, text/plain or multipart .txt upload)
+        text, options, error_response = _read_process_text_request()
+        if error_response is not None:
+            return error_response
         
-        text = data['text']
-        detect_headings = data.get('detect_headings', True)  # New option
+        detect_headings = options['detect_headings']
+        if options['output'] not in OUTPUT_FORMATS:
+            return _error('Invalid input', f"output must be one of: {', '.join(OUTPUT_FORMATS)}")
         
         # Validate input
         is_valid, error = Validator.validate_text_input(text)
@@ -31,97 +402,205 @@ def process_text():
                 'message': error
             }), 400
         
-        # Initialize services
-        processor = TextProcessor()
-        preprocessor = WordPreprocessor()
+        # Initialize services (sharing one cancellation token)
+        cancel = _cancel_token()
+        processor = TextProcessor(cancel)
+        preprocessor, error_response = _build_preprocessor(options, cancel)
+        if error_response is not None:
+            return error_response
         orp_calc = ORPCalculator()
         
-        # Step 1: Split text into words with heading detection
-        if detect_headings:
-            # Use heading-aware processing
-            words_with_meta = processor.split_words_with_metadata(text)
-            processed_word_objects = preprocessor.preprocess_with_headings(words_with_meta)
-            
-            # Extract words list and build ORP data
-            processed_words = []
-            orp_data = []
-            
-            for word_obj in processed_word_objects:
-                word = word_obj['word']
-                multiplier = word_obj['display_multiplier']
-                is_heading = word_obj['is_heading']
-                
-                # Repeat word based on multiplier
-                for _ in range(multiplier):
-                    processed_words.append(word)
-                    
-                    if word.strip():  # Skip blank pauses
-                        orp_info = orp_calc.split_word(word)
-                        orp_data.append({
-                            'word': word,
-                            'before': orp_info['before'],
-                            'orp': orp_info['orp'],
-                            'after': orp_info['after'],
-                            'position': orp_info['orp_position'],
-                            'is_heading': is_heading
-                        })
-                    else:
-                        # Blank pause for pacing
-                        orp_data.append({
-                            'word': '',
-                            'before': '',
-                            'orp': '',
-                            'after': '',
-                            'position': 0,
-                            'is_heading': False
-                        })
-            
-            # For stats, count original words
-            original_words = [w for w, _ in words_with_meta]
+        sessions = current_app.extensions.get('sessions')
+        if options['session']:
+            if sessions is None:
+                return _error('Not enabled', 'Document sessions are disabled', 404)
+            if options['output'] != 'words':
+                return _error('Invalid input', 'Sessions only support the words output')
+        
+        # Once the body is committed, only a disconnect stops it
+        if options['output'] == 'offsets':
+            return stream_json(_run_in_bulkhead(
+                'processing', _build_offset_payload, text, detect_headings, processor, preprocessor, orp_calc,
+                options, cancel=cancel
+            ), 200, cancel=cancel.without_deadline())
+        
+        # A cached document's compressed body is cached next to it, so a
+        # repeat is served without rendering or compressing it again
+        cache = current_app.extensions.get('result_cache')
+        body_key = None
+        if cache is not None and not options['session'] and not any(options[name] for name in INDEX_OPTIONS):
+            body_key = _document_key(text, detect_headings, preprocessor)
+            response = cached_compressed_response(cache, body_key)
+            if response is not None:
+                return response
+        
+        # Step 1-3: split, apply pacing rules and ORP into a compact document
+        # (or load it from the result cache shared by all workers)
+        document = _load_or_process(text, detect_headings, processor, preprocessor, orp_calc, body_key)
+        
+        # Optional seek index, table of contents and position mapping, and
+        # the session keeping them for /api/sessions calls
+        extra = {}
+        if options['session'] or any(options[name] for name in INDEX_OPTIONS):
+            index, positions = _run_in_bulkhead(
+                'processing', lambda: _build_seek_data(text, detect_headings, processor,
+                                                       *document_word_offsets(document), options,
+                                                       with_index=options['session']),
+                cancel=cancel
+            )
+            extra = _index_fields(index, positions, options)
+            if options['session']:
+                # Same id for the same text and options; ids are per worker
+                session_id = _document_key(text, detect_headings, preprocessor)[:32]
+                search = _run_in_bulkhead('processing', SearchIndex.build, document, processor, cancel,
+                                          cancel=cancel)
+                sessions.put(session_id, DocumentSession(document, index, positions, search))
+                extra['session_id'] = session_id
+        
+        # Step 4: Calculate statistics and stream the response
+        stream_cancel = cancel.without_deadline()
+        response = _stream_document(document, preprocessor, orp_calc, stream_cancel, **extra)
+        if body_key is not None:
+            store_compressed(response, cache, body_key, stream_cancel)
+        return response
+        
+    except OperationCancelled as e:
+        return _cancelled_response(e)
+    except HTTPException:
+        # Body decoding errors (400/413) go to the registered error handlers
+        raise
+    except Exception as e:
+        return jsonify({
+            'error': 'Processing failed',
+            'message': str(e)
+        }), 500
+
+
+@api_blueprint.route('/process-text/incremental', methods=['POST'])
+@compressible(level={'gzip': 6, 'br': 4})
+def process_text_incremental():
+    """
+    Like /process-text (words output), for documents edited in place. The
+    body holds either the full "text", or the "document_id" returned by a
+    previous call plus "edits" to apply to that version. Only paragraphs
+    that changed are processed again.
+    """
+    try:
+        incremental = current_app.extensions.get('incremental')
+        if incremental is None:
+            return _error('Not enabled', 'Incremental processing is disabled', 404)
+        
+        data = request.get_json()
+        if not data or ('text' not in data and 'document_id' not in data):
+            return _error('Missing text field', 'Request body must contain "text" or "document_id" and "edits"')
+        
+        if 'text' in data:
+            text = data['text']
         else:
-            # Use original processing without heading detection
-            normalized = processor.normalize(text)
-            words = processor.split_words(normalized)
-            processed_words = preprocessor.preprocess(words)
-            
-            orp_data = []
-            for word in processed_words:
-                if word.strip():
-                    orp_info = orp_calc.split_word(word)
-                    orp_data.append({
-                        'word': word,
-                        'before': orp_info['before'],
-                        'orp': orp_info['orp'],
-                        'after': orp_info['after'],
-                        'position': orp_info['orp_position'],
-                        'is_heading': False
-                    })
-                else:
-                    orp_data.append({
-                        'word': '',
-                        'before': '',
-                        'orp': '',
-                        'after': '',
-                        'position': 0,
-                        'is_heading': False
-                    })
-            original_words = words
-        
-        # Step 4: Calculate statistics
-        stats = {
-            'original_count': len(original_words),
-            'processed_count': len(processed_words),
-            'estimated_time_300wpm': round(preprocessor.estimate_reading_time(len(processed_words), 300), 1),
-            'estimated_time_500wpm': round(preprocessor.estimate_reading_time(len(processed_words), 500), 1)
-        }
+            # Ids are per worker and evicted over time; clients resend the text on 404
+            text = incremental.text_for(str(data['document_id']))
+            if text is None:
+                return _error('Unknown document', 'Document not found, send the full "text" instead', 404)
+            try:
+                text = apply_edits(text, data.get('edits', []))
+            except ValueError as e:
+                return _error('Invalid input', str(e))
         
+        is_valid, error = Validator.validate_text_input(text)
+        if not is_valid:
+            return _error('Invalid input', error)
+        
+        cancel = _cancel_token()
+        preprocessor, error_response = _build_preprocessor(_pacing_options(data), cancel)
+        if error_response is not None:
+            return error_response
+        orp_calc = ORPCalculator()
+        
+        detect_headings = data.get('detect_headings', True)
+        processor = TextProcessor(cancel)
+        document_id, document, segments = _run_in_bulkhead(
+            'processing', incremental.process,
+            text, detect_headings, processor, preprocessor, orp_calc,
+            cancel=cancel
+        )
+        extra = {}
+        index_options = _index_options(data)
+        if any(index_options.values()):
+            extra = _index_fields(*_run_in_bulkhead(
+                'processing', lambda: _build_seek_data(text, detect_headings, processor,
+                                                       *document_word_offsets(document), index_options),
+                cancel=cancel
+            ), index_options)
+        return _stream_document(document, preprocessor, orp_calc, cancel.without_deadline(),
+                                document_id=document_id, segments=segments, **extra)
+        
+    except OperationCancelled as e:
+        return _cancelled_response(e)
+    except HTTPException:
+        raise
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'words': processed_words,
-            'orp_data': orp_data,
-            'stats': stats
-        }), 200
+            'error': 'Processing failed',
+            'message': str(e)
+        }), 500
+
+
+def _job_or_error(job_id: str):
+    """Returns (job, None) or (None, error_response)."""
+    jobs = current_app.extensions.get('jobs')
+    if jobs is None:
+        return None, _error('Not enabled', 'Background jobs are disabled', 404)
+    job = jobs.get(job_id)
+    if job is None:
+        return None, _error('Unknown job', 'Job not found (it may have expired)', 404)
+    return job, None
+
+
+def _job_status(job: Job) -> dict:
+    return {
+        'success': True,
+        **job.to_dict(),
+        'result_url': url_for('api.get_job_result', job_id=job.id),
+        'events_url': url_for('api.job_events', job_id=job.id)
+    }
+
+
+@api_blueprint.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    Queue a /process-text run (same body and options, words output) and
+    return its id at once; large texts don't tie up a request worker.
+    """
+    try:
+        jobs = current_app.extensions.get('jobs')
+        if jobs is None:
+            return _error('Not enabled', 'Background jobs are disabled', 404)
+        
+        text, options, error_response = _read_process_text_request()
+        if error_response is not None:
+            return error_response
+        if options['output'] != 'words':
+            return _error('Invalid input', 'Jobs only support the words output')
+        
+        is_valid, error = Validator.validate_text_input(text)
+        if not is_valid:
+            return _error('Invalid input', error)
+        
+        preprocessor, error_response = _build_preprocessor(options)
+        if error_response is not None:
+            return error_response
+        
+        try:
+            job = jobs.submit(Job(text, options['detect_headings'], preprocessor, ORPCalculator()))
+        except QueueFullError as e:
+            response, status = _error('Service Unavailable', str(e), 503)
+            response.headers['Retry-After'] = str(JOB_RETRY_AFTER)
+            return response, status
+        
+        return jsonify(_job_status(job)), 202
         
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({
             'error': 'Processing failed',
@@ -129,6 +608,225 @@ def process_text():
         }), 500
 
 
+@api_blueprint.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job, error_response = _job_or_error(job_id)
+    if error_response is not None:
+        return error_response
+    return jsonify(_job_status(job)), 200
+
+
+@api_blueprint.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job, error_response = _job_or_error(job_id)
+    if error_response is not None:
+        return error_response
+    current_app.extensions['jobs'].cancel(job_id)
+    return jsonify(_job_status(job)), 200
+
+
+@api_blueprint.route('/jobs/<job_id>/result', methods=['GET'])
+@compressible(level={'gzip': 6, 'br': 4})
+def get_job_result(job_id):
+    """
+    The /process-text response of a finished job, or of the lines
+    processed so far ("partial": true) while it is queued or running.
+    """
+    job, error_response = _job_or_error(job_id)
+    if error_response is not None:
+        return error_response
+    document, status = job.partial_document()
+    if status == JOB_FAILED:
+        return _error('Processing failed', job.error, 500)
+    if status == JOB_CANCELLED:
+        return _error('Job cancelled', 'The job was cancelled before it finished', 409)
+    
+    return _stream_document(document, job.preprocessor, job.orp_calc,
+                            job_id=job.id, status=status, progress=job.progress,
+                            partial=status != JOB_DONE)
+
+
+@api_blueprint.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Server-sent events: a 'progress' event per change, then one named after the final status."""
+    job, error_response = _job_or_error(job_id)
+    if error_response is not None:
+        return error_response
+    
+    def events():
+        version = None
+        while True:
+            current = job.wait_for_change(version, JOB_EVENTS_HEARTBEAT)
+            if current == version:
+                yield ': keep-alive\n\n'
+                continue
+            version = current
+            status = job.to_dict()
+            event = status['status'] if job.finished else 'progress'
+            yield f'event: {event}\ndata: {json.dumps(status)}\n\n'
+            if job.finished:
+                return
+    
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+def _session_or_error(session_id: str):
+    """Returns (session, None) or (None, error_response)."""
+    sessions = current_app.extensions.get('sessions')
+    if sessions is None:
+        return None, _error('Not enabled', 'Document sessions are disabled', 404)
+    session = sessions.get(session_id)
+    if session is None:
+        # Sessions are per worker and evicted over time; clients reprocess on 404
+        return None, _error('Unknown session', 'Session not found, process the text again', 404)
+    return session, None
+
+
+def _int_arg(name: str, default: int, minimum: int, maximum: int):
+    """Returns (value, None) or (None, error_response) for a query-string integer."""
+    value = request.args.get(name)
+    if value is None:
+        return default, None
+    try:
+        value = int(value)
+    except ValueError:
+        return None, _error('Invalid input', f'{name} must be an integer')
+    is_valid, error = Validator.validate_int_option(value, name, minimum, maximum)
+    if not is_valid:
+        return None, _error('Invalid input', error)
+    return value, None
+
+
+@api_blueprint.route('/sessions/<session_id>/toc', methods=['GET'])
+def get_session_toc(session_id):
+    session, error_response = _session_or_error(session_id)
+    if error_response is not None:
+        return error_response
+    return jsonify({
+        'success': True,
+        'session_id': session_id,
+        'total': len(session),
+        'toc': session.index.toc_list()
+    }), 200
+
+
+@api_blueprint.route('/sessions/<session_id>/window', methods=['GET'])
+@compressible(level={'gzip': 6, 'br': 4})
+def get_session_window(session_id):
+    """
+    words/orp_data for part of a session's processed stream: `count`
+    tokens from offset `start`, or TOC entry `chapter` up to the next
+    entry of its level or above (at most `count` tokens when given).
+    """
+    session, error_response = _session_or_error(session_id)
+    if error_response is not None:
+        return error_response
+    
+    total = len(session)
+    count, error_response = _int_arg('count', None, 1, SESSION_WINDOW_MAX_COUNT)
+    if error_response is not None:
+        return error_response
+    if 'chapter' in request.args:
+        if not session.index.toc:
+            return _error('Invalid input', 'The document has no table of contents')
+        chapter, error_response = _int_arg('chapter', 0, 0, len(session.index.toc) - 1)
+        if error_response is not None:
+            return error_response
+        start = session.index.toc[chapter][3]
+        stop = session.index.chapter_end(chapter, total)
+        if count is not None:
+            stop = min(stop, start + count)
+    else:
+        start, error_response = _int_arg('start', 0, 0, total)
+        if error_response is not None:
+            return error_response
+        stop = min(start + (count or SESSION_WINDOW_COUNT), total)
+    
+    window = session.window(start, stop)
+    encoder = new_encoder()
+    fragments = ORPFragmentCache(encoder, ORPCalculator())
+    return stream_json({
+        'success': True,
+        'session_id': session_id,
+        'start': start,
+        'end': stop,
+        'total': total,
+        'words': LazyList(len(window), window.iter_words),
+        'orp_data': LazyList(len(window), lambda: fragments.iter_document(window), encoded=True)
+    }, 200, encoder=encoder)
+
+
+@api_blueprint.route('/sessions/<session_id>/position', methods=['GET'])
+def get_session_position(session_id):
+    """
+    Translates original word index `word` or processed offset `offset`
+    into both, plus the word's span in the source text when the session
+    was created with include_mapping.
+    """
+    session, error_response = _session_or_error(session_id)
+    if error_response is not None:
+        return error_response
+    
+    positions = session.positions
+    if 'word' in request.args:
+        word_index, error_response = _int_arg('word', 0, 0, len(positions) - 1)
+    elif 'offset' in request.args:
+        offset, error_response = _int_arg('offset', 0, 0, len(session) - 1)
+        word_index = positions.to_original(offset) if error_response is None else None
+    else:
+        error_response = _error('Invalid input', 'Query must contain "word" or "offset"')
+    if error_response is not None:
+        return error_response
+    
+    result = {
+        'success': True,
+        'session_id': session_id,
+        'word_index': word_index,
+        'offset': positions.to_processed(word_index)
+    }
+    span = positions.source_span(word_index)
+    if span is not None:
+        result['source_start'], result['source_length'] = span
+    return jsonify(result), 200
+
+
+@api_blueprint.route('/sessions/<session_id>/search', methods=['GET'])
+def search_session(session_id):
+    """
+    Occurrences of the word or phrase `q` (matched case-insensitively,
+    ignoring surrounding punctuation): the original word index and
+    processed offset of each match's first word, in document order.
+    """
+    session, error_response = _session_or_error(session_id)
+    if error_response is not None:
+        return error_response
+    
+    query = request.args.get('q', '')
+    if not query.strip():
+        return _error('Missing query', 'Query string must contain "q"')
+    if len(query) > SEARCH_MAX_QUERY_LENGTH:
+        return _error('Invalid input', f'q must be at most {SEARCH_MAX_QUERY_LENGTH} characters')
+    limit, error_response = _int_arg('limit', SEARCH_LIMIT, 1, SEARCH_MAX_LIMIT)
+    if error_response is not None:
+        return error_response
+    
+    matches = session.search.search(query)
+    to_processed = session.positions.to_processed
+    return jsonify({
+        'success': True,
+        'session_id': session_id,
+        'query': query,
+        'total': len(matches),
+        'matches': [
+            {'word_index': word_index, 'offset': to_processed(word_index)}
+            for word_index in matches[:limit]
+        ]
+    }), 200
+
+
 @api_blueprint.route('/calculate-orp', methods=['POST'])
 def calculate_orp():
     try:
@@ -159,11 +857,32 @@ def calculate_orp():
 
 @api_blueprint.route('/extract-url', methods=['POST'])
 def extract_url():
-    return jsonify({
-        'error': 'Not implemented',
-        'message': 'URL extraction will be added in a future version',
-        'status': 501
-    }), 501
+    """
+    Fetch and extract an article. Runs on the extraction bulkhead, so slow
+    remote sites use up extraction threads only, never processing ones.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        url = data.get('url', '')
+        if not isinstance(url, str) or not Validator.is_valid_url(url):
+            return _error('Invalid input', 'Request body must contain a valid http(s) "url"')
+        
+        article = _run_in_bulkhead('extraction', ContentExtractor().extract_from_url, url)
+        return jsonify({'success': True, **article}), 200
+        
+    except NotImplementedError:
+        return jsonify({
+            'error': 'Not implemented',
+            'message': 'URL extraction will be added in a future version',
+            'status': 501
+        }), 501
+    except HTTPException:
+        raise
+    except Exception as e:
+        return jsonify({
+            'error': 'Extraction failed',
+            'message': str(e)
+        }), 502
 
 
 @api_blueprint.route('/upload-pdf', methods=['POST'])
@@ -175,6 +894,14 @@ def upload_pdf():
     }), 501
 
 
+@api_blueprint.route('/metrics', methods=['GET'])
+def get_metrics():
+    return jsonify({
+        'success': True,
+        'metrics': metrics.snapshot()
+    }), 200
+
+
 @api_blueprint.route('/test', methods=['GET'])
 def test_endpoint():
     return jsonify({
@@ -182,6 +909,9 @@ def test_endpoint():
         'message': 'API is working correctly',
         'endpoints': {
             'process_text': '/api/process-text (POST)',
+            'process_text_incremental': '/api/process-text/incremental (POST)',
+            'jobs': '/api/jobs (POST), /api/jobs/<id> (GET, DELETE)',
+            'sessions': '/api/sessions/<id>/toc, /window, /position, /search (GET)',
             'calculate_orp': '/api/calculate-orp (POST)',
             'extract_url': '/api/extract-url (POST) - Not implemented',
             'upload_pdf': '/api/upload-pdf (POST) - Not implemented'
@@ -51,6 +51,29 @@ class ProcessingStats(BaseModel):
     processed_count: int = Field(ge=0, description="Processed word count (with duplicates/pauses)")
     estimated_time_300wpm: float = Field(ge=0, description="Estimated reading time at 300 WPM (seconds)")
     estimated_time_500wpm: float = Field(ge=0, description="Estimated reading time at 500 WPM (seconds)")
+    repeated_lines: int = Field(ge=0, description="Lines whose heading detection was reused from an identical earlier line")
+
+
+class DocumentIndexData(BaseModel):
+    """Processed offsets to seek to (include_index)"""
+    sentences: List[int] = Field(description="Offsets of sentence starts")
+    paragraphs: List[int] = Field(description="Offsets of paragraph starts")
+    headings: List[int] = Field(description="Offsets of heading starts")
+
+
+class TocEntry(BaseModel):
+    """Table of contents entry (include_toc)"""
+    title: str = Field(description="Heading line")
+    level: int = Field(ge=1, description="Guessed level, 1 = top")
+    word_index: int = Field(ge=0, description="Index of the heading's first original word")
+    offset: int = Field(ge=0, description="Processed offset of the heading")
+
+
+class PositionMappingData(BaseModel):
+    """Original word <-> processed offset <-> source text (include_mapping)"""
+    word_offsets: List[int] = Field(description="Processed offset of each original word's first display")
+    source_starts: List[int] = Field(description="Start of each original word in the submitted text")
+    source_lengths: List[int] = Field(description="Length of each original word in the submitted text")
 
 
 class ProcessTextResponse(BaseModel):
@@ -58,6 +81,10 @@ class ProcessTextResponse(BaseModel):
     words: List[str] = Field(description="Processed word array")
     orp_data: List[ORPData] = Field(description="ORP information for each word")
     stats: ProcessingStats = Field(description="Processing statistics")
+    index: Optional[DocumentIndexData] = Field(None, description="Seek index, with include_index")
+    toc: Optional[List[TocEntry]] = Field(None, description="Table of contents, with include_toc")
+    mapping: Optional[PositionMappingData] = Field(None, description="Position mapping, with include_mapping")
+    session_id: Optional[str] = Field(None, description="Document session id, with session")
 
 
 class CalculateORPResponse(BaseModel):
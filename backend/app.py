@@ -3,13 +3,101 @@ SpeedRead Backend - Main Application
 Flask API for speed reading text processing
 """
 
+import os
 from flask import Flask
 from flask_cors import CORS
 from api.routes import api_blueprint
+from api.peer_cache_routes import peer_cache_blueprint
 from api.error_handlers import register_error_handlers
+from api.request_decoding import DecompressRequestMiddleware
+from api.admission import AdmissionMiddleware
+from services import warm_cache
+from services.admission import AdmissionController, ConcurrencyPool
+from services.bulkhead import Bulkhead
+from services.cache_backend import MemoryCache
+from services.document_sessions import DocumentSessions
+from services.incremental import IncrementalProcessor
+from services.jobs import JobQueue
+from services.peer_cache import PeerCacheClient
+from services.result_cache import ResultCache
+from services.single_flight import SingleFlight, cross_process_locks_available
+from services.stage_cache import StageCache
 import config
 
 
+def configure_result_cache(app):
+    """
+    Local SQLite cache when RESULT_CACHE_ENABLED, sharded across nodes
+    when CACHE_PEERS is set (with an in-memory local store if needed).
+    """
+    local_cache = None
+    if app.config['RESULT_CACHE_ENABLED']:
+        local_cache = ResultCache(
+            app.config['RESULT_CACHE_PATH'],
+            app.config['RESULT_CACHE_MAX_BYTES']
+        )
+    
+    peers = [url.strip() for url in app.config['CACHE_PEERS'].split(',') if url.strip()]
+    if not peers:
+        if local_cache is not None:
+            app.extensions['result_cache'] = local_cache
+        return
+    
+    if not app.config['CACHE_PEER_TOKEN'] or not app.config['CACHE_NODE_URL']:
+        raise ValueError("CACHE_PEERS requires CACHE_NODE_URL and CACHE_PEER_TOKEN")
+    local_cache = local_cache or MemoryCache(app.config['MEMORY_CACHE_MAX_BYTES'])
+    app.extensions['local_result_cache'] = local_cache
+    app.extensions['result_cache'] = PeerCacheClient(
+        peers,
+        app.config['CACHE_NODE_URL'],
+        local_cache,
+        token=app.config['CACHE_PEER_TOKEN'],
+        timeout=app.config['CACHE_PEER_TIMEOUT'],
+        replicas=app.config['CACHE_VIRTUAL_NODES']
+    )
+    app.register_blueprint(peer_cache_blueprint, url_prefix='/api/cache')
+
+
+def configure_single_flight(app):
+    if not app.config['SINGLE_FLIGHT_ENABLED']:
+        return
+    app.extensions['single_flight'] = SingleFlight(app.config['SINGLE_FLIGHT_TIMEOUT'])
+    
+    # Cross-worker coalescing hands results over through the result cache
+    lock_dir = app.config['SINGLE_FLIGHT_LOCK_DIR']
+    if lock_dir and cross_process_locks_available() and 'result_cache' in app.extensions:
+        os.makedirs(lock_dir, exist_ok=True)
+        app.extensions['single_flight_lock_dir'] = lock_dir
+
+
+def configure_admission(app):
+    """
+    Wrap the WSGI app with cost-based admission control. Runs inside the
+    request decoding middleware but before Flask reads any body.
+    """
+    if not app.config['ADMISSION_ENABLED']:
+        return
+    rate_limited = app.config['RATELIMIT_ENABLED']
+    controller = AdmissionController(
+        app.config['ADMISSION_EXPENSIVE_COST'],
+        ConcurrencyPool('cheap', app.config['ADMISSION_CHEAP_CONCURRENCY'],
+                        app.config['ADMISSION_CHEAP_QUEUE'], app.config['ADMISSION_QUEUE_TIMEOUT']),
+        ConcurrencyPool('expensive', app.config['ADMISSION_EXPENSIVE_CONCURRENCY'],
+                        app.config['ADMISSION_EXPENSIVE_QUEUE'], app.config['ADMISSION_QUEUE_TIMEOUT']),
+        client_rate=app.config['RATELIMIT_CLIENT_RATE'] if rate_limited else None,
+        client_burst=app.config['RATELIMIT_CLIENT_BURST'],
+        global_rate=app.config['RATELIMIT_GLOBAL_RATE'] if rate_limited else None,
+        global_burst=app.config['RATELIMIT_GLOBAL_BURST']
+    )
+    app.extensions['admission'] = controller
+    app.wsgi_app = AdmissionMiddleware(
+        app.wsgi_app,
+        controller,
+        max_length=app.config['MAX_CONTENT_LENGTH'],
+        trust_forwarded_for=app.config['ADMISSION_TRUST_FORWARDED_FOR']
+    )
+
+
 def create_app():
     app = Flask(__name__)
     app.config.from_object(config.Config)
@@ -19,8 +107,16 @@ def create_app():
         app,
         resources={r"/api/*": {"origins": app.config["CORS_ORIGINS"]}},
         supports_credentials=True,  # Allow cookies/auth if needed
-        methods=["GET", "POST", "OPTIONS"],
-        allow_headers=["Content-Type", "Authorization"]
+        methods=["GET", "POST", "DELETE", "OPTIONS"],
+        allow_headers=["Content-Type", "Authorization", "Content-Encoding"]
+    )
+    
+    # Shed load by estimated cost, then inflate gzip/deflate request
+    # bodies before Flask parses them
+    configure_admission(app)
+    app.wsgi_app = DecompressRequestMiddleware(
+        app.wsgi_app,
+        max_size=app.config['MAX_DECOMPRESSED_SIZE']
     )
     
     # Register blueprints
@@ -29,6 +125,36 @@ def create_app():
     # Register error handlers
     register_error_handlers(app)
     
+    # Pre-compute ORP/token tables before workers fork
+    if app.config['WARMUP_ENABLED'] and not warm_cache.is_warm():
+        warm_cache.warm_up(app.config['WARMUP_WORD_COUNT'])
+    
+    # Processed results shared across workers, restarts and nodes
+    configure_result_cache(app)
+    configure_single_flight(app)
+    if app.config['STAGE_CACHE_ENABLED']:
+        app.extensions['stage_cache'] = StageCache(app.config['STAGE_CACHE_MAX_BYTES'])
+    if app.config['INCREMENTAL_ENABLED']:
+        app.extensions['incremental'] = IncrementalProcessor(
+            app.config['INCREMENTAL_SEGMENT_CACHE_BYTES'],
+            app.config['INCREMENTAL_DOCUMENT_CACHE_BYTES']
+        )
+    if app.config['DOCUMENT_SESSIONS_ENABLED']:
+        app.extensions['sessions'] = DocumentSessions(app.config['DOCUMENT_SESSION_CACHE_BYTES'])
+    if app.config['BULKHEADS_ENABLED']:
+        app.extensions['bulkheads'] = {
+            'extraction': Bulkhead('extraction', app.config['EXTRACTION_WORKERS'],
+                                   app.config['EXTRACTION_QUEUE'], app.config['EXTRACTION_TIMEOUT']),
+            'processing': Bulkhead('processing', app.config['PROCESSING_WORKERS'],
+                                   app.config['PROCESSING_QUEUE'], app.config['PROCESSING_TIMEOUT'])
+        }
+    if app.config['JOBS_ENABLED']:
+        app.extensions['jobs'] = JobQueue(
+            app.config['JOB_WORKERS'],
+            app.config['JOB_MAX_QUEUED'],
+            app.config['JOB_RESULT_TTL']
+        )
+    
     # Health check endpoint
     @app.route('/health')
     def health():
@@ -0,0 +1,4 @@
+"""
+Benchmarks Package
+Manual performance measurements (not collected by pytest)
+"""
@@ -0,0 +1,53 @@
+"""
+Response Compression Benchmark
+Ratio and CPU cost of each encoding/level on a /api/process-text body
+
+Run from the backend directory:
+    python -m benchmarks.bench_compression [characters]
+"""
+
+import sys
+import time
+
+from api.compression import StreamingCompressor, available_encodings
+from app import create_app
+from benchmarks.bench_process_text import build_text
+
+LEVELS = {
+    'gzip': (1, 6, 9),
+    'br': (1, 4, 6, 11),
+}
+
+
+def compress_chunks(chunks, encoding: str, level: int):
+    compressor = StreamingCompressor(encoding, level)
+    start = time.perf_counter()
+    size = 0
+    for chunk in chunks:
+        size += len(compressor.compress(chunk)) + len(compressor.flush())
+    size += len(compressor.finish())
+    return size, time.perf_counter() - start, compressor.cpu_seconds
+
+
+def main():
+    characters = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    app = create_app()
+    app.config['DEBUG'] = False
+    app.config['COMPRESSION_ENABLED'] = False
+    client = app.test_client()
+
+    response = client.post('/api/process-text', json={'text': build_text(characters)})
+    chunks = list(response.response)
+    body_size = sum(len(chunk) for chunk in chunks)
+
+    print(f"/api/process-text body for {characters:,} characters: {body_size / 1024 / 1024:.1f} MB")
+    print(f"{'encoding':<10}{'level':>6}{'size MB':>10}{'ratio':>8}{'wall ms':>10}{'cpu ms':>9}")
+    for encoding in available_encodings():
+        for level in LEVELS[encoding]:
+            size, wall, cpu = compress_chunks(chunks, encoding, level)
+            print(f"{encoding:<10}{level:>6}{size / 1024 / 1024:>10.2f}"
+                  f"{body_size / size:>8.1f}{wall * 1000:>10.1f}{cpu * 1000:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Batch ORP Benchmark
+batch_calculate() against the vectorized batch_offsets() paths
+
+Run from the backend directory:
+    python -m benchmarks.bench_orp_batch [words]
+"""
+
+import sys
+import time
+
+from benchmarks.bench_process_text import build_text
+from services import orp_calculator
+from services.orp_calculator import ORPCalculator
+from services.text_processor import TextProcessor
+
+
+def best_of(func, runs: int = 3) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    processor = TextProcessor()
+    words = processor.split_words(processor.normalize(build_text(count * 7)))[:count]
+    calculator = ORPCalculator()
+
+    variants = [('batch_calculate', lambda: calculator.batch_calculate(words)),
+                ('offsets/python', lambda: calculator.batch_offsets(words, use_numpy=False))]
+    if orp_calculator.np is not None:
+        variants.append(('offsets/numpy', lambda: calculator.batch_offsets(words, use_numpy=True)))
+
+    print(f"ORP for {len(words):,} words")
+    baseline = None
+    for label, func in variants:
+        elapsed = best_of(func)
+        baseline = baseline or elapsed
+        print(f"{label:<16} {elapsed * 1000:8.1f} ms  {baseline / elapsed:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
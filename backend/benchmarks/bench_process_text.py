@@ -0,0 +1,75 @@
+"""
+/api/process-text Benchmark
+Compares peak memory and latency of a buffered body against the streamed response
+
+Run from the backend directory:
+    python -m benchmarks.bench_process_text [characters]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from flask import Response
+
+from api import routes
+from api.json_stream import new_encoder, stream_json
+from app import create_app
+
+SAMPLE_PARAGRAPH = (
+    "CHAPTER ONE\n"
+    "The quick brown fox jumps over the lazy dog, again and again.\n"
+    "Speed reading relies on the optimal recognition point of each word.\n"
+    "Extraordinarily long words slow readers down; commas add pauses!\n"
+)
+
+
+def build_text(characters: int) -> str:
+    repeats = characters // len(SAMPLE_PARAGRAPH) + 1
+    return (SAMPLE_PARAGRAPH * repeats)[:characters]
+
+
+def measure(label: str, func):
+    # Time without tracing (tracemalloc slows allocation-heavy code a lot)
+    start = time.perf_counter()
+    size = func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<12} {elapsed * 1000:9.1f} ms  peak {peak / 1024 / 1024:8.1f} MB  body {size / 1024 / 1024:7.1f} MB")
+
+
+def buffered_response(payload: dict, status: int = 200, encoder=None):
+    """The pre-streaming behaviour: one fully materialized body."""
+    encoder = encoder or new_encoder()
+    return Response(b''.join(encoder.iter_chunks(payload)), status=status,
+                    mimetype='application/json')
+
+
+def main():
+    characters = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    app = create_app()
+    app.config['DEBUG'] = False
+    client = app.test_client()
+    text = build_text(characters)
+
+    def run():
+        response = client.post('/api/process-text', json={'text': text})
+        # Consume chunk by chunk, as a WSGI server would
+        return sum(len(chunk) for chunk in response.response)
+
+    print(f"/api/process-text with {characters:,} characters")
+    measure('streamed', run)
+
+    routes.stream_json = buffered_response
+    try:
+        measure('buffered', run)
+    finally:
+        routes.stream_json = stream_json
+
+
+if __name__ == '__main__':
+    main()
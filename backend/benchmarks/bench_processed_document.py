@@ -0,0 +1,69 @@
+"""
+ProcessedDocument Benchmark
+Compares retained memory of the dict-based pipeline output against ProcessedDocument
+
+Run from the backend directory:
+    python -m benchmarks.bench_processed_document [characters]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from benchmarks.bench_process_text import build_text
+from services.orp_calculator import ORPCalculator
+from services.processed_document import ProcessedDocument
+from services.text_processor import TextProcessor
+from services.word_preprocessor import WordPreprocessor
+
+
+def build_dicts(text: str):
+    """The previous in-memory shape: word objects plus six-key orp_data dicts."""
+    processor, preprocessor, orp_calc = TextProcessor(), WordPreprocessor(), ORPCalculator()
+    word_objects = preprocessor.preprocess_with_headings(processor.split_words_with_metadata(text))
+    orp_data = []
+    for word_obj in word_objects:
+        orp_info = orp_calc.split_word(word_obj['word'])
+        entry = {
+            'word': word_obj['word'],
+            'before': orp_info['before'],
+            'orp': orp_info['orp'],
+            'after': orp_info['after'],
+            'position': orp_info['orp_position'],
+            'is_heading': word_obj['is_heading']
+        }
+        orp_data.extend([entry] * word_obj['display_multiplier'])
+    return word_objects, orp_data
+
+
+def build_document(text: str):
+    return ProcessedDocument.from_text(text)
+
+
+def measure(label: str, func, text: str):
+    start = time.perf_counter()
+    func(text)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = func(text)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(f"{label:<10} {elapsed * 1000:9.1f} ms  retained {retained / 1024 / 1024:8.1f} MB  "
+          f"peak {peak / 1024 / 1024:8.1f} MB")
+    return retained
+
+
+def main():
+    characters = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    text = build_text(characters)
+
+    print(f"Processed document for {characters:,} characters")
+    dicts = measure('dicts', build_dicts, text)
+    document = measure('document', build_document, text)
+    print(f"retained memory ratio: {dicts / document:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -22,6 +22,10 @@ class Config:
     # File Upload Limits (for future PDF support)
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     
+    # Compressed uploads (Content-Encoding: gzip/deflate) are capped on
+    # their decompressed size, checked incrementally while inflating
+    MAX_DECOMPRESSED_SIZE = int(os.getenv('MAX_DECOMPRESSED_SIZE', str(16 * 1024 * 1024)))
+    
     # Text Processing Limits
     MAX_TEXT_LENGTH = 1_000_000  # 1MB text limit (1 million characters)
     MIN_TEXT_LENGTH = 1
@@ -30,6 +34,77 @@ class Config:
     LONG_WORD_THRESHOLD = 7  # Words longer than this get duplicated
     PAUSE_COUNT = 4  # Number of blank pauses after sentences
     
+    # Boot-time cache warm-up (run gunicorn with --preload so workers share it)
+    WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'False').lower() == 'true'
+    WARMUP_WORD_COUNT = int(os.getenv('WARMUP_WORD_COUNT', '500'))
+    
+    # Response Compression (brotli is used when the package is installed)
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))  # bytes
+    COMPRESSION_LEVELS = {'gzip': 6, 'br': 4}  # Defaults; routes may override
+    
+    # Persistent result cache (SQLite WAL file shared by all workers)
+    RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'False').lower() == 'true'
+    RESULT_CACHE_PATH = os.getenv('RESULT_CACHE_PATH', os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'instance', 'result_cache.sqlite3'
+    ))
+    RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+    
+    # Distributed result cache: keys are sharded across CACHE_PEERS (base
+    # URLs of all backend nodes) by consistent hashing
+    CACHE_PEERS = os.getenv('CACHE_PEERS', '')  # Comma-separated
+    CACHE_NODE_URL = os.getenv('CACHE_NODE_URL', '')  # This node's URL as listed in CACHE_PEERS
+    CACHE_PEER_TOKEN = os.getenv('CACHE_PEER_TOKEN', '')  # Shared secret between nodes
+    CACHE_PEER_TIMEOUT = float(os.getenv('CACHE_PEER_TIMEOUT', '0.5'))  # seconds
+    CACHE_VIRTUAL_NODES = int(os.getenv('CACHE_VIRTUAL_NODES', '100'))
+    MEMORY_CACHE_MAX_BYTES = int(os.getenv('MEMORY_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    
+    # In-process cache of tokenized text, so option changes skip tokenizing
+    STAGE_CACHE_ENABLED = os.getenv('STAGE_CACHE_ENABLED', 'True').lower() == 'true'
+    STAGE_CACHE_MAX_BYTES = int(os.getenv('STAGE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    
+    # Incremental reprocessing: processed paragraphs and the last text of
+    # each edited document, kept in process
+    INCREMENTAL_ENABLED = os.getenv('INCREMENTAL_ENABLED', 'True').lower() == 'true'
+    INCREMENTAL_SEGMENT_CACHE_BYTES = int(os.getenv('INCREMENTAL_SEGMENT_CACHE_BYTES', str(64 * 1024 * 1024)))
+    INCREMENTAL_DOCUMENT_CACHE_BYTES = int(os.getenv('INCREMENTAL_DOCUMENT_CACHE_BYTES', str(64 * 1024 * 1024)))
+    
+    # Document sessions: processed documents kept in process with their
+    # table of contents, so clients can fetch one chapter or window at a time
+    DOCUMENT_SESSIONS_ENABLED = os.getenv('DOCUMENT_SESSIONS_ENABLED', 'True').lower() == 'true'
+    DOCUMENT_SESSION_CACHE_BYTES = int(os.getenv('DOCUMENT_SESSION_CACHE_BYTES', str(64 * 1024 * 1024)))
+    
+    # Background jobs (/api/jobs): worker threads per process, waiting jobs
+    # before new ones are refused with 503, and how long results are kept
+    JOBS_ENABLED = os.getenv('JOBS_ENABLED', 'True').lower() == 'true'
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_MAX_QUEUED = int(os.getenv('JOB_MAX_QUEUED', '100'))
+    JOB_RESULT_TTL = float(os.getenv('JOB_RESULT_TTL', '600'))  # seconds
+    
+    # Cooperative cancellation: processing stops within milliseconds once
+    # a request is older than REQUEST_DEADLINE seconds (0 disables) or, on
+    # servers exposing the socket, once its client has disconnected
+    REQUEST_DEADLINE = float(os.getenv('REQUEST_DEADLINE', '30'))
+    DISCONNECT_DETECTION_ENABLED = os.getenv('DISCONNECT_DETECTION_ENABLED', 'True').lower() == 'true'
+    
+    # Bulkheads: network-bound extraction and CPU-bound processing run on
+    # separate bounded thread pools, so a slow remote site can't hold up
+    # text processing. Work beyond workers + queue is refused with 503 and
+    # work exceeding the timeout answers 504
+    BULKHEADS_ENABLED = os.getenv('BULKHEADS_ENABLED', 'True').lower() == 'true'
+    EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '4'))
+    EXTRACTION_QUEUE = int(os.getenv('EXTRACTION_QUEUE', '8'))
+    EXTRACTION_TIMEOUT = float(os.getenv('EXTRACTION_TIMEOUT', '15'))  # seconds
+    PROCESSING_WORKERS = int(os.getenv('PROCESSING_WORKERS', '4'))
+    PROCESSING_QUEUE = int(os.getenv('PROCESSING_QUEUE', '16'))
+    PROCESSING_TIMEOUT = float(os.getenv('PROCESSING_TIMEOUT', '60'))  # seconds
+    
+    # Request coalescing: identical concurrent documents are processed once.
+    # SINGLE_FLIGHT_LOCK_DIR extends this across workers (needs a result cache)
+    SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', 'True').lower() == 'true'
+    SINGLE_FLIGHT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_TIMEOUT', '30'))  # seconds
+    SINGLE_FLIGHT_LOCK_DIR = os.getenv('SINGLE_FLIGHT_LOCK_DIR', '')
+    
     # Database (Future - when implementing persistence)
     DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///speedread.db')
     
@@ -39,9 +114,26 @@ class Config:
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     
-    # Rate Limiting (Future - when implementing rate limits)
+    # Admission control: /api requests are costed before the body is read
+    # (1 unit + 1 per KB) and run in separate concurrency pools for cheap and
+    # expensive requests; when a pool and its queue are full, requests get 503
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'True').lower() == 'true'
+    ADMISSION_EXPENSIVE_COST = float(os.getenv('ADMISSION_EXPENSIVE_COST', '64'))  # ~64KB bodies
+    ADMISSION_CHEAP_CONCURRENCY = int(os.getenv('ADMISSION_CHEAP_CONCURRENCY', '32'))
+    ADMISSION_CHEAP_QUEUE = int(os.getenv('ADMISSION_CHEAP_QUEUE', '128'))
+    ADMISSION_EXPENSIVE_CONCURRENCY = int(os.getenv('ADMISSION_EXPENSIVE_CONCURRENCY', '2'))
+    ADMISSION_EXPENSIVE_QUEUE = int(os.getenv('ADMISSION_EXPENSIVE_QUEUE', '4'))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '5'))  # seconds
+    ADMISSION_TRUST_FORWARDED_FOR = os.getenv('ADMISSION_TRUST_FORWARDED_FOR', 'False').lower() == 'true'
+    
+    # Rate Limiting: cost-weighted token buckets per client (429) and per
+    # worker process (503), in cost units per second (needs ADMISSION_ENABLED)
     RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'False').lower() == 'true'
-    RATELIMIT_STORAGE_URL = os.getenv('RATELIMIT_STORAGE_URL', 'memory://')
+    RATELIMIT_STORAGE_URL = os.getenv('RATELIMIT_STORAGE_URL', 'memory://')  # Only in-process buckets for now
+    RATELIMIT_CLIENT_RATE = float(os.getenv('RATELIMIT_CLIENT_RATE', '2000'))
+    RATELIMIT_CLIENT_BURST = float(os.getenv('RATELIMIT_CLIENT_BURST', '4000'))
+    RATELIMIT_GLOBAL_RATE = float(os.getenv('RATELIMIT_GLOBAL_RATE', '8000'))
+    RATELIMIT_GLOBAL_BURST = float(os.getenv('RATELIMIT_GLOBAL_BURST', '16000'))
 
 
 class ProductionConfig(Config):
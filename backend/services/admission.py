@@ -0,0 +1,171 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from services.metrics import metrics
+
+
+# Request cost: one unit per request plus one per KB of (decompressed) body
+COST_BYTES_PER_UNIT = 1024
+
+# Compressed bodies are charged as this many times their wire size
+COMPRESSED_COST_FACTOR = 5
+
+# Per-client buckets kept at once; least recently seen clients are dropped
+MAX_TRACKED_CLIENTS = 10_000
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` units per second up to `capacity`.
+    Not thread-safe on its own; callers hold a lock.
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float, now: float = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        # A caller's `now` may predate a bucket created meanwhile
+        elapsed = max(now - self.updated, 0.0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = max(now, self.updated)
+
+    def try_take(self, cost: float, now: float = None) -> float:
+        """
+        Take `cost` tokens. Returns 0 on success, otherwise the seconds
+        until they would be available (nothing is taken). Costs above the
+        capacity only need a full bucket, so big requests aren't starved.
+        """
+        self._refill(time.monotonic() if now is None else now)
+        cost = min(cost, self.capacity)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def give_back(self, cost: float):
+        self.tokens = min(self.capacity, self.tokens + min(cost, self.capacity))
+
+
+class ConcurrencyPool:
+    """
+    Caps how many requests of one class run at once. Up to `max_queue`
+    callers wait (at most `queue_timeout` seconds) for a slot; beyond
+    that acquire() fails immediately so the request can be shed.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> bool:
+        with self._condition:
+            if self.in_flight >= self.limit:
+                if self.waiting >= self.max_queue:
+                    return False
+                self.waiting += 1
+                self._export()
+                try:
+                    acquired = self._condition.wait_for(lambda: self.in_flight < self.limit,
+                                                        self.queue_timeout)
+                finally:
+                    self.waiting -= 1
+                if not acquired:
+                    self._export()
+                    return False
+            self.in_flight += 1
+            self._export()
+            return True
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._export()
+            self._condition.notify()
+
+    def _export(self):
+        metrics.set_gauge(f'admission.{self.name}.in_flight', self.in_flight)
+        metrics.set_gauge(f'admission.{self.name}.queue_depth', self.waiting)
+
+
+class AdmissionController:
+    """
+    Decides whether a request may run, from its estimated cost only (the
+    body isn't read). Cost-weighted token buckets per client and for the
+    whole process limit throughput when rate limiting is on; cheap and
+    expensive requests then run in separate concurrency pools so a few
+    huge documents can't occupy every slot.
+    """
+
+    def __init__(self, expensive_cost: float, cheap_pool: ConcurrencyPool,
+                 expensive_pool: ConcurrencyPool, client_rate: float = None,
+                 client_burst: float = None, global_rate: float = None,
+                 global_burst: float = None, retry_after: float = 1):
+        self.expensive_cost = expensive_cost
+        self.cheap_pool = cheap_pool
+        self.expensive_pool = expensive_pool
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.global_bucket = TokenBucket(global_rate, global_burst) if global_rate else None
+        self.retry_after = retry_after
+        self._clients: 'OrderedDict[str, TokenBucket]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_cost(content_length: Optional[int], compressed: bool = False,
+                      max_length: int = None) -> float:
+        """Cost units of a request; unknown lengths are charged max_length."""
+        if content_length is None:
+            content_length = max_length or 0
+        elif compressed:
+            content_length *= COMPRESSED_COST_FACTOR
+        return 1 + content_length / COST_BYTES_PER_UNIT
+
+    def pool_for(self, cost: float) -> ConcurrencyPool:
+        return self.expensive_pool if cost >= self.expensive_cost else self.cheap_pool
+
+    def check_rate(self, client: str, cost: float) -> Tuple[Optional[int], float]:
+        """
+        (None, 0) when the request fits the buckets, else (429, retry_after)
+        for a client over its rate or (503, retry_after) when the process
+        as a whole is.
+        """
+        with self._lock:
+            now = time.monotonic()
+            bucket = None
+            if self.client_rate:
+                bucket = self._clients.get(client)
+                if bucket is None:
+                    bucket = self._clients[client] = TokenBucket(self.client_rate, self.client_burst, now)
+                    if len(self._clients) > MAX_TRACKED_CLIENTS:
+                        self._clients.popitem(last=False)
+                else:
+                    self._clients.move_to_end(client)
+                wait = bucket.try_take(cost, now)
+                if wait:
+                    metrics.increment('admission.shed.client_rate')
+                    return 429, wait
+
+            if self.global_bucket is not None:
+                wait = self.global_bucket.try_take(cost, now)
+                if wait:
+                    if bucket is not None:
+                        bucket.give_back(cost)
+                    metrics.increment('admission.shed.global_rate')
+                    return 503, wait
+        return None, 0.0
+
+    @staticmethod
+    def retry_after_header(seconds: float) -> str:
+        return str(max(1, math.ceil(seconds)))
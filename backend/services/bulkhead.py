@@ -0,0 +1,94 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, TypeVar
+from services.metrics import metrics
+
+
+T = TypeVar('T')
+
+
+class BulkheadFullError(Exception):
+    pass
+
+
+class BulkheadTimeoutError(Exception):
+    pass
+
+
+class Bulkhead:
+    """
+    Bounded executor for one class of work (e.g. network-bound extraction
+    vs CPU-bound processing), so saturation in one can't delay the other.
+
+    At most `workers` tasks run and `max_queue` wait; further submissions
+    fail at once with BulkheadFullError. run() waits up to `timeout`
+    seconds for the result. A timed-out task keeps its slot until it
+    actually ends, so a stuck dependency fills this bulkhead only.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int, timeout: float):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self.pending = 0
+        self._lock = threading.Lock()
+        # Threads are started on first submit, so forked workers get their own
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'{name}-bulkhead')
+
+    def submit(self, func: Callable[..., T], *args, **kwargs) -> 'Future[T]':
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                metrics.increment(f'bulkhead.{self.name}.rejected')
+                raise BulkheadFullError(f'{self.name} capacity exhausted ({self.pending} tasks pending)')
+            self.pending += 1
+            self._export()
+        submitted_at = time.perf_counter()
+
+        def task():
+            started_at = time.perf_counter()
+            with self._lock:
+                self.active += 1
+                self._export()
+            metrics.increment(f'bulkhead.{self.name}.wait_seconds', started_at - submitted_at)
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                metrics.increment(f'bulkhead.{self.name}.failures')
+                raise
+            finally:
+                metrics.increment(f'bulkhead.{self.name}.run_seconds', time.perf_counter() - started_at)
+                with self._lock:
+                    self.active -= 1
+                    self.pending -= 1
+                    self._export()
+
+        metrics.increment(f'bulkhead.{self.name}.submitted')
+        try:
+            return self._executor.submit(task)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+                self._export()
+            raise
+
+    def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Submit and wait for the result (BulkheadFullError/BulkheadTimeoutError on overload)."""
+        future = self.submit(func, *args, **kwargs)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            # Drops the task if it hasn't started (task() never runs, so release
+            # its slot here); a running one finishes in the background
+            if future.cancel():
+                with self._lock:
+                    self.pending -= 1
+                    self._export()
+            metrics.increment(f'bulkhead.{self.name}.timeouts')
+            raise BulkheadTimeoutError(f'{self.name} did not finish within {self.timeout} seconds')
+
+    def _export(self):
+        metrics.set_gauge(f'bulkhead.{self.name}.active', self.active)
+        metrics.set_gauge(f'bulkhead.{self.name}.queued', self.pending - self.active)
@@ -0,0 +1,84 @@
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional
+from services.document_format import DocumentFormatError, decode_document, encode_document
+from services.metrics import metrics
+from services.processed_document import ProcessedDocument
+from utils.sized_lru import SizedLRU
+
+
+COMPRESSION_LEVEL = 6
+
+
+class CacheBackend(ABC):
+    """
+    Interface for byte caches of processed results.
+
+    Implementations provide get()/put(); the batch and document helpers
+    are built on those and may be overridden when a backend can do better
+    (e.g. one network round trip per batch).
+    """
+
+    # Metrics prefix
+    name = 'cache'
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """The value stored under key, or None."""
+
+    @abstractmethod
+    def put(self, key: str, value: bytes) -> bool:
+        """Store a value; returns whether it was stored."""
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Values for the keys that are present."""
+        values = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    def put_many(self, items: Dict[str, bytes]) -> int:
+        """Store several values; returns how many were stored."""
+        return sum(1 for key, value in items.items() if self.put(key, value))
+
+    def get_document(self, key: str) -> Optional[ProcessedDocument]:
+        data = self.get(key)
+        if data is None:
+            return None
+        try:
+            return decode_document(zlib.decompress(data))
+        except (zlib.error, DocumentFormatError):
+            # Corrupt entry: treat as a miss, the next put overwrites it
+            metrics.increment(f'{self.name}.corrupt')
+            return None
+
+    def put_document(self, key: str, document: ProcessedDocument) -> bool:
+        return self.put(key, zlib.compress(encode_document(document), COMPRESSION_LEVEL))
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU byte cache bounded by total value size."""
+
+    name = 'memory_cache'
+
+    def __init__(self, max_bytes: int):
+        self._entries = SizedLRU(max_bytes, self.name)
+
+    @property
+    def max_bytes(self) -> int:
+        return self._entries.max_bytes
+
+    @property
+    def total_bytes(self) -> int:
+        return self._entries.total_bytes
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    def put(self, key: str, value: bytes) -> bool:
+        return self._entries.put(key, value, len(value))
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,83 @@
+import socket
+import time
+from typing import Callable, Optional
+from services.metrics import metrics
+
+
+# Loops check their token every CHECK_INTERVAL lines or tokens (power of two)
+CHECK_INTERVAL = 1024
+CHECK_MASK = CHECK_INTERVAL - 1
+
+# Minimum seconds between two client-disconnect probes
+DISCONNECT_POLL_INTERVAL = 0.05
+
+
+class OperationCancelled(Exception):
+    def __init__(self, reason: str):
+        super().__init__(f'Operation cancelled ({reason})')
+        self.reason = reason
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation for one request. Long loops call check()
+    every CHECK_INTERVAL items; it raises OperationCancelled once the
+    deadline (a time.monotonic() value) has passed, the client has
+    disconnected, or cancel() was called. Each token counts once in
+    the cancellation.<reason> metric.
+    """
+
+    def __init__(self, deadline: float = None, is_disconnected: Callable[[], bool] = None):
+        self.deadline = deadline
+        self.is_disconnected = is_disconnected
+        self.reason: Optional[str] = None
+        self._next_poll = 0.0
+
+    @classmethod
+    def with_timeout(cls, seconds: float, is_disconnected: Callable[[], bool] = None) -> 'CancellationToken':
+        """Token expiring `seconds` from now (never when 0 or None)."""
+        return cls(time.monotonic() + seconds if seconds else None, is_disconnected)
+
+    def without_deadline(self) -> 'CancellationToken':
+        """Token that only watches the client, for a response already committed."""
+        return CancellationToken(None, self.is_disconnected)
+
+    def cancel(self, reason: str = 'cancelled'):
+        if self.reason is None:
+            self.reason = reason
+            metrics.increment(f'cancellation.{reason}')
+
+    @property
+    def cancelled(self) -> bool:
+        if self.reason is None:
+            now = time.monotonic()
+            if self.deadline is not None and now >= self.deadline:
+                self.cancel('deadline')
+            elif self.is_disconnected is not None and now >= self._next_poll:
+                # Probes are syscalls; rate-limit them however often loops check
+                self._next_poll = now + DISCONNECT_POLL_INTERVAL
+                if self.is_disconnected():
+                    self.cancel('disconnect')
+        return self.reason is not None
+
+    def check(self):
+        if self.cancelled:
+            raise OperationCancelled(self.reason)
+
+
+def socket_disconnect_probe(sock: socket.socket) -> Callable[[], bool]:
+    """
+    is_disconnected callback for a client connection: peeks without
+    blocking and reports True once the peer has closed it. Sockets that
+    can't be peeked (e.g. TLS) are assumed connected.
+    """
+    def is_disconnected() -> bool:
+        try:
+            return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b''
+        except (BlockingIOError, InterruptedError):
+            return False
+        except ConnectionError:
+            return True
+        except (OSError, ValueError):
+            return False
+    return is_disconnected
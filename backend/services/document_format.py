@@ -0,0 +1,294 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Tuple
+from services.processed_document import (
+    TOKEN_FLAG_HEADING, TOKEN_FLAG_PAUSE, ProcessedDocument, orp_entry
+)
+
+
+# File layout (all integers little-endian):
+#   header    HEADER
+#   strings   (string_count + 1) u32 byte offsets, then the UTF-8 blob
+#   records   token_count x RECORD
+#   sentences sentence_count u32 record indices (first token of each sentence)
+#   headings  heading_count u32 record indices (first token of each heading)
+MAGIC = b'SRPD'
+FORMAT_VERSION = 2
+
+HEADER = struct.Struct('<4sHHIIIIIIIQQQQ')
+# word_id, display_start (index in the expanded words list), orp position,
+# multiplier, flags, padding
+RECORD = struct.Struct('<IIBBBx')
+U32 = struct.Struct('<I')
+
+
+class DocumentFormatError(ValueError):
+    pass
+
+
+def _u32_bytes(values) -> bytes:
+    return struct.pack(f'<{len(values)}I', *values)
+
+
+def _sentence_starts(document: ProcessedDocument) -> array:
+    """Record index of the first word after each run of sentence pauses."""
+    starts = array('I')
+    after_pause = True
+    for index, flags in enumerate(document.flags):
+        if flags & TOKEN_FLAG_PAUSE:
+            after_pause = True
+        elif after_pause:
+            starts.append(index)
+            after_pause = False
+    return starts
+
+
+def _heading_starts(document: ProcessedDocument) -> array:
+    """Record index of the first word of each heading."""
+    starts = array('I')
+    in_heading = False
+    for index, flags in enumerate(document.flags):
+        if flags & TOKEN_FLAG_PAUSE:
+            continue
+        is_heading = bool(flags & TOKEN_FLAG_HEADING)
+        if is_heading and not in_heading:
+            starts.append(index)
+        in_heading = is_heading
+    return starts
+
+
+def encode_document(document: ProcessedDocument) -> bytes:
+    """Serialize a ProcessedDocument to the binary format."""
+    blob = bytearray()
+    string_offsets = [0]
+    for word in document.strings:
+        blob += word.encode('utf-8')
+        string_offsets.append(len(blob))
+    strings = _u32_bytes(string_offsets) + bytes(blob)
+
+    records = bytearray(RECORD.size * len(document.word_ids))
+    display_start = 0
+    for index, (word_id, position, multiplier, flags) in enumerate(zip(
+            document.word_ids, document.positions, document.multipliers, document.flags)):
+        RECORD.pack_into(records, index * RECORD.size,
+                         word_id, display_start, position, multiplier, flags)
+        display_start += multiplier
+
+    sentences = _sentence_starts(document)
+    headings = _heading_starts(document)
+
+    strings_offset = HEADER.size
+    records_offset = strings_offset + len(strings)
+    sentences_offset = records_offset + len(records)
+    headings_offset = sentences_offset + U32.size * len(sentences)
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, RECORD.size,
+        document.original_count, document.processed_count, len(document.word_ids),
+        len(document.strings), len(sentences), len(headings), document.repeated_lines,
+        strings_offset, records_offset, sentences_offset, headings_offset
+    )
+    return b''.join((header, strings, bytes(records),
+                     _u32_bytes(sentences), _u32_bytes(headings)))
+
+
+def write_document(document: ProcessedDocument, path: str):
+    """
+    Write a document file atomically: readers see either the old file or
+    the complete new one, never a partial write.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.srpd')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(encode_document(document))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+class _U32View:
+    """Sequence view of a u32 section (bisect-compatible)."""
+
+    __slots__ = ('buffer', 'offset', 'count')
+
+    def __init__(self, buffer, offset: int, count: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return U32.unpack_from(self.buffer, self.offset + index * U32.size)[0]
+
+    def __iter__(self) -> Iterator[int]:
+        for (value,) in struct.iter_unpack('<I', self.buffer[self.offset:self.offset + self.count * U32.size]):
+            yield value
+
+
+class _DisplayStarts:
+    """display_start column of the record section, for bisecting word ranges."""
+
+    __slots__ = ('buffer', 'offset', 'count')
+
+    def __init__(self, buffer, offset: int, count: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> int:
+        return U32.unpack_from(self.buffer, self.offset + index * RECORD.size + U32.size)[0]
+
+
+class DocumentView:
+    """
+    Read-only view of an encoded document in any buffer (bytes, mmap).
+
+    Nothing is decoded up front: records and strings are unpacked on
+    access, so serving a word range touches only the bytes it needs.
+    """
+
+    def __init__(self, buffer):
+        if len(buffer) < HEADER.size:
+            raise DocumentFormatError("Buffer too short for a document header")
+        self._buffer = buffer
+        self._parse_header()
+        self._strings: Dict[int, str] = {}
+
+    def _parse_header(self):
+        buffer = self._buffer
+        (magic, version, record_size, self.original_count, self.processed_count,
+         self.token_count, self.string_count, sentence_count, heading_count,
+         self.repeated_lines, strings_offset, self._records_offset, sentences_offset,
+         headings_offset) = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise DocumentFormatError("Not a processed document file")
+        if version != FORMAT_VERSION or record_size != RECORD.size:
+            raise DocumentFormatError(f"Unsupported document format version {version}")
+        if headings_offset + heading_count * U32.size > len(buffer):
+            raise DocumentFormatError("Truncated document file")
+
+        self._string_offsets = _U32View(buffer, strings_offset, self.string_count + 1)
+        self._blob_offset = strings_offset + (self.string_count + 1) * U32.size
+        self._display_starts = _DisplayStarts(buffer, self._records_offset, self.token_count)
+        self.sentence_starts = _U32View(buffer, sentences_offset, sentence_count)
+        self.heading_starts = _U32View(buffer, headings_offset, heading_count)
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> 'DocumentView':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.processed_count
+
+    def string(self, word_id: int) -> str:
+        word = self._strings.get(word_id)
+        if word is None:
+            start = self._blob_offset + self._string_offsets[word_id]
+            end = self._blob_offset + self._string_offsets[word_id + 1]
+            word = self._buffer[start:end].decode('utf-8')
+            self._strings[word_id] = word
+        return word
+
+    def record(self, index: int) -> Tuple[str, int, int, int, int]:
+        """(word, display_start, orp_position, multiplier, flags) of one stored token."""
+        if not 0 <= index < self.token_count:
+            raise IndexError(index)
+        word_id, display_start, position, multiplier, flags = RECORD.unpack_from(
+            self._buffer, self._records_offset + index * RECORD.size
+        )
+        return self.string(word_id), display_start, position, multiplier, flags
+
+    def record_for_word(self, word_index: int) -> int:
+        """Index of the record that covers position word_index of the words list."""
+        return bisect_right(self._display_starts, word_index) - 1
+
+    def iter_range(self, start: int, stop: int) -> Iterator[Tuple[str, int, int]]:
+        """Yield (word, orp_position, flags) for words list positions [start, stop)."""
+        start = max(start, 0)
+        stop = min(stop, self.processed_count)
+        if start >= stop:
+            return
+        index = self.record_for_word(start)
+        position_in_list = start
+        while position_in_list < stop:
+            word, display_start, position, multiplier, flags = self.record(index)
+            count = min(display_start + multiplier, stop) - position_in_list
+            for _ in range(count):
+                yield word, position, flags
+            position_in_list += count
+            index += 1
+
+    def words(self, start: int = 0, stop: int = None) -> List[str]:
+        """Slice of the 'words' list of the API response."""
+        stop = self.processed_count if stop is None else stop
+        return [word for word, _, _ in self.iter_range(start, stop)]
+
+    def orp_data(self, start: int = 0, stop: int = None) -> List[dict]:
+        """Slice of the 'orp_data' list of the API response."""
+        stop = self.processed_count if stop is None else stop
+        return [orp_entry(word, position, flags)
+                for word, position, flags in self.iter_range(start, stop)]
+
+    def to_document(self) -> ProcessedDocument:
+        """Load the whole file back into a ProcessedDocument."""
+        strings = [sys.intern(self.string(word_id)) for word_id in range(self.string_count)]
+        word_ids, positions, multipliers, flags = array('I'), array('B'), array('B'), array('B')
+        records = self._buffer[self._records_offset:self._records_offset + self.token_count * RECORD.size]
+        for word_id, _, position, multiplier, token_flags in RECORD.iter_unpack(records):
+            word_ids.append(word_id)
+            positions.append(position)
+            multipliers.append(multiplier)
+            flags.append(token_flags)
+        return ProcessedDocument(strings, word_ids, positions, multipliers, flags,
+                                 self.original_count, self.repeated_lines)
+
+
+class MappedDocument(DocumentView):
+    """
+    DocumentView of a file through mmap: every worker mapping the same
+    file shares its pages via the page cache.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as handle:
+            if os.fstat(handle.fileno()).st_size < HEADER.size:
+                raise DocumentFormatError("File too short for a document header")
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            super().__init__(self._mmap)
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def close(self):
+        self._mmap.close()
+
+
+def read_document(path: str) -> MappedDocument:
+    return MappedDocument(path)
+
+
+def decode_document(data: bytes) -> ProcessedDocument:
+    """Inverse of encode_document()."""
+    return DocumentView(data).to_document()
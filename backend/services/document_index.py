@@ -0,0 +1,152 @@
+import re
+import sys
+from array import array
+from typing import Iterable, List, Tuple
+from services.cancellation import CHECK_MASK, CancellationToken
+from services.processed_document import TOKEN_FLAG_PAUSE, ProcessedDocument
+
+
+# A source line ending like this closes its paragraph; lines wrapped
+# mid-sentence continue it
+PARAGRAPH_END = re.compile(r'[.!?…][\'"”’)\]]*$')
+
+# Heading levels: numbered headings ("3", "3.2 Results") nest by their
+# depth; major divisions and all-caps lines are level 1, others level 2
+NUMBERED_HEADING = re.compile(r'^(\d+(?:\.\d+)*)\.?\s')
+MAJOR_HEADING = re.compile(
+    r'^(part|book|chapter|prologue|epilogue|appendix|preface|introduction)\b', re.IGNORECASE
+)
+
+
+def heading_level(line: str) -> int:
+    """Best-guess TOC level (1 = top) of a heading line."""
+    numbered = NUMBERED_HEADING.match(line)
+    if numbered:
+        return numbered.group(1).count('.') + 1
+    if MAJOR_HEADING.match(line) or line.isupper():
+        return 1
+    return 2
+
+
+def document_word_offsets(document: ProcessedDocument) -> Tuple[array, array]:
+    """
+    (word_offsets, sentence_words) of a document: the processed offset of
+    each original word's first display, and the original indexes of the
+    words starting a sentence (the first word and every word after a run
+    of blank pauses, which the pacing rules insert at sentence endings and
+    around headings).
+    """
+    word_offsets = array('I')
+    sentence_words = array('I')
+    append_word = word_offsets.append
+    offset = 0
+    after_pause = True
+    for multiplier, flags in zip(document.multipliers, document.flags):
+        if flags & TOKEN_FLAG_PAUSE:
+            after_pause = True
+        else:
+            if after_pause:
+                sentence_words.append(len(word_offsets))
+                after_pause = False
+            append_word(offset)
+        offset += multiplier
+    return word_offsets, sentence_words
+
+
+def stream_word_offsets(indices: array) -> Tuple[array, array]:
+    """document_word_offsets() for a per-display stream of source token indexes (-1 = pause)."""
+    word_offsets = array('I')
+    sentence_words = array('I')
+    previous = -1
+    after_pause = True
+    for offset, index in enumerate(indices):
+        if index < 0:
+            after_pause = True
+        elif index != previous:
+            if after_pause:
+                sentence_words.append(len(word_offsets))
+                after_pause = False
+            word_offsets.append(offset)
+            previous = index
+    return word_offsets, sentence_words
+
+
+class DocumentIndex:
+    """
+    Seek targets in a processed stream (the 'words' list, or the 'tokens'
+    of the offsets output): ascending processed offsets of sentence,
+    paragraph and heading starts, so clients can binary search them.
+
+    A paragraph starts at a line after a blank line, after a line ending a
+    sentence, or where heading lines begin or end; each heading line
+    starts a heading (and a paragraph) and is a table of contents entry:
+    (title, level, original word index, processed offset).
+    """
+
+    __slots__ = ('sentences', 'paragraphs', 'headings', 'toc')
+
+    def __init__(self, sentences: array, paragraphs: array, headings: array,
+                 toc: List[Tuple[str, int, int, int]] = None):
+        self.sentences = sentences
+        self.paragraphs = paragraphs
+        self.headings = headings
+        self.toc = toc or []
+
+    @classmethod
+    def build(cls, word_offsets: array, sentence_words: array,
+              lines: Iterable[Tuple[str, bool, int, bool]], detect_headings: bool = True,
+              cancel: CancellationToken = None) -> 'DocumentIndex':
+        """
+        From document_word_offsets() and TextProcessor.iter_lines() of the
+        source text (heading lines only count with detect_headings).
+        """
+        sentences = array('I', [word_offsets[word] for word in sentence_words])
+        paragraphs = array('I')
+        headings = array('I')
+        toc = []
+        total = len(word_offsets)
+        word = 0
+        previous_heading = False
+        previous_closed = True
+        for count, (line, is_heading, word_count, after_blank) in enumerate(lines):
+            if cancel is not None and not count & CHECK_MASK:
+                cancel.check()
+            if word >= total:
+                break
+            if not word_count:
+                continue
+            is_heading = is_heading and detect_headings
+            if is_heading:
+                headings.append(word_offsets[word])
+                toc.append((line, heading_level(line), word, word_offsets[word]))
+            if is_heading or previous_heading or after_blank or previous_closed:
+                paragraphs.append(word_offsets[word])
+            previous_heading = is_heading
+            previous_closed = PARAGRAPH_END.search(line) is not None
+            word += word_count
+        return cls(sentences, paragraphs, headings, toc)
+
+    def to_dict(self) -> dict:
+        return {
+            'sentences': self.sentences.tolist(),
+            'paragraphs': self.paragraphs.tolist(),
+            'headings': self.headings.tolist()
+        }
+
+    def toc_list(self) -> List[dict]:
+        return [
+            {'title': title, 'level': level, 'word_index': word_index, 'offset': offset}
+            for title, level, word_index, offset in self.toc
+        ]
+
+    def chapter_end(self, entry: int, total: int) -> int:
+        """Processed offset where TOC entry `entry` ends: the next entry at its level or above."""
+        level = self.toc[entry][1]
+        for _, next_level, _, offset in self.toc[entry + 1:]:
+            if next_level <= level:
+                return offset
+        return total
+
+    def memory_size(self) -> int:
+        return (sum(sys.getsizeof(part) for part in (self.sentences, self.paragraphs, self.headings, self.toc))
+                + sum(sys.getsizeof(entry) + sys.getsizeof(entry[0]) for entry in self.toc))
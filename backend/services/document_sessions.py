@@ -0,0 +1,70 @@
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Optional
+from services.document_index import DocumentIndex
+from services.position_map import PositionMap
+from services.processed_document import TOKEN_FLAG_PAUSE, ProcessedDocument
+from services.search_index import SearchIndex
+from utils.sized_lru import SizedLRU
+
+
+class DocumentSession:
+    """
+    A processed document kept after /process-text, with its seek index,
+    table of contents, position map and search index, so clients can
+    fetch parts of it (e.g. one chapter) instead of the whole stream.
+    """
+
+    __slots__ = ('document', 'index', 'positions', 'search', 'token_ends')
+
+    def __init__(self, document: ProcessedDocument, index: DocumentIndex, positions: PositionMap,
+                 search: SearchIndex):
+        self.document = document
+        self.index = index
+        self.positions = positions
+        self.search = search
+        # Processed offset just past each stored token, for bisecting
+        self.token_ends = array('I', accumulate(document.multipliers))
+
+    def __len__(self) -> int:
+        return len(self.document)
+
+    def window(self, start: int, stop: int) -> ProcessedDocument:
+        """The tokens at processed offsets [start, stop), runs cut at the edges."""
+        document = self.document
+        stop = min(stop, len(document))
+        if start >= stop:
+            return ProcessedDocument(document.strings, array('I'), array('B'), array('B'), array('B'), 0)
+
+        first = bisect_right(self.token_ends, start)
+        last = bisect_right(self.token_ends, stop - 1)
+        multipliers = document.multipliers[first:last + 1]
+        # Drop the displays before start / from stop on (last first: they may be one token)
+        multipliers[-1] -= self.token_ends[last] - stop
+        multipliers[0] -= start - (self.token_ends[first] - document.multipliers[first])
+        flags = document.flags[first:last + 1]
+        words = sum(1 for token_flags in flags if not token_flags & TOKEN_FLAG_PAUSE)
+        return ProcessedDocument(document.strings, document.word_ids[first:last + 1],
+                                 document.positions[first:last + 1], multipliers, flags, words)
+
+    def memory_size(self) -> int:
+        return (self.document.memory_size() + self.index.memory_size() + self.positions.memory_size()
+                + self.search.memory_size() + sys.getsizeof(self.token_ends))
+
+
+class DocumentSessions:
+    """Per-process LRU of DocumentSessions by id, bounded in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self._sessions = SizedLRU(max_bytes, 'sessions')
+
+    def get(self, session_id: str) -> Optional[DocumentSession]:
+        return self._sessions.get(session_id)
+
+    def put(self, session_id: str, session: DocumentSession):
+        self._sessions.put(session_id, session, session.memory_size())
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,167 @@
+import hashlib
+import re
+import sys
+from array import array
+from typing import Dict, List, Optional, Tuple
+from services.metrics import metrics
+from services.orp_calculator import ORPCalculator
+from services.processed_document import (
+    PAUSE_WORD, PAUSE_WORD_ID, TOKEN_FLAG_HEADING, TOKEN_FLAG_PAUSE, ProcessedDocument
+)
+from services.result_cache import ALGORITHM_VERSION
+from services.stage_cache import TOKENIZER_VERSION
+from services.text_processor import TextProcessor
+from services.word_preprocessor import WordPreprocessor
+from utils.sized_lru import SizedLRU
+
+
+# Paragraphs are separated by one or more blank lines
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+# Dots on both sides of a line break: normalization may join them into an
+# ellipsis across lines, which shifts per-line heading detection for the
+# rest of the text, so such texts are processed in one piece
+CROSS_LINE_DOTS = re.compile(r'\.\s*\n\s*\.')
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Blank-line separated paragraphs of text, without empty ones."""
+    return [paragraph for paragraph in PARAGRAPH_BREAK.split(text) if paragraph.strip()]
+
+
+def document_id_for(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()[:32]
+
+
+def apply_edits(text: str, edits: List[dict]) -> str:
+    """
+    Apply {'start', 'end', 'text'} replacements in order, each one against
+    the result of the previous ones. Raises ValueError on a bad edit.
+    """
+    if not isinstance(edits, list):
+        raise ValueError('edits must be a list')
+    for edit in edits:
+        if not isinstance(edit, dict):
+            raise ValueError('Each edit must be an object with start, end and text')
+        start, end, replacement = edit.get('start'), edit.get('end', edit.get('start')), edit.get('text', '')
+        if (not isinstance(start, int) or not isinstance(end, int)
+                or isinstance(start, bool) or isinstance(end, bool)):
+            raise ValueError('Edit start and end must be integers')
+        if not 0 <= start <= end <= len(text):
+            raise ValueError(f'Edit range {start}-{end} is outside the document (length {len(text)})')
+        if not isinstance(replacement, str):
+            raise ValueError('Edit text must be a string')
+        text = text[:start] + replacement + text[end:]
+    return text
+
+
+def _starts_in_heading(segment: ProcessedDocument) -> bool:
+    # A leading heading is always preceded by its pause run
+    flags = segment.flags
+    return len(flags) > 1 and bool(flags[0] & TOKEN_FLAG_PAUSE) and bool(flags[1] & TOKEN_FLAG_HEADING)
+
+
+def _ends_in_heading(segment: ProcessedDocument) -> bool:
+    # ... and a trailing one is followed by the heading-end pause run
+    flags = segment.flags
+    return len(flags) > 1 and bool(flags[-1] & TOKEN_FLAG_PAUSE) and bool(flags[-2] & TOKEN_FLAG_HEADING)
+
+
+def merge_segments(segments: List[ProcessedDocument]) -> ProcessedDocument:
+    """
+    Concatenate paragraph documents into the document the whole text
+    would produce. Each paragraph was processed on its own, so a heading
+    running across a paragraph edge has closing pauses before the edge
+    and opening pauses after it; both are dropped so the heading
+    continues like in a single pass.
+    """
+    strings = [PAUSE_WORD]
+    string_ids: Dict[str, int] = {PAUSE_WORD: PAUSE_WORD_ID}
+    word_ids = array('I')
+    positions = array('B')
+    multipliers = array('B')
+    flags = array('B')
+    original_count = 0
+    previous_ends_in_heading = False
+
+    for segment in segments:
+        original_count += segment.original_count
+        if not len(segment.flags):
+            continue
+
+        start = 0
+        if previous_ends_in_heading and _starts_in_heading(segment):
+            for column in (word_ids, positions, multipliers, flags):
+                column.pop()
+            start = 1
+        previous_ends_in_heading = _ends_in_heading(segment)
+
+        remap = []
+        for word in segment.strings:
+            word_id = string_ids.get(word)
+            if word_id is None:
+                word_id = string_ids[word] = len(strings)
+                strings.append(word)
+            remap.append(word_id)
+        word_ids.extend(map(remap.__getitem__, segment.word_ids[start:]))
+        positions.extend(segment.positions[start:])
+        multipliers.extend(segment.multipliers[start:])
+        flags.extend(segment.flags[start:])
+
+    return ProcessedDocument(strings, word_ids, positions, multipliers, flags, original_count)
+
+
+class IncrementalProcessor:
+    """
+    Reprocesses edited documents paragraph by paragraph.
+
+    Processed paragraphs are kept in an in-process LRU keyed by their
+    content hash and the options, so after an edit only the paragraphs
+    that changed go through the pipeline again; the rest are reused and
+    merged. The last text of each document is kept under its id so
+    clients can send edits instead of the whole text.
+    """
+
+    def __init__(self, segment_cache_bytes: int, document_cache_bytes: int):
+        self.segments = SizedLRU(segment_cache_bytes, 'incremental.segments')
+        self.documents = SizedLRU(document_cache_bytes, 'incremental.documents')
+
+    def text_for(self, document_id: str) -> Optional[str]:
+        return self.documents.get(document_id)
+
+    def process(self, text: str, detect_headings: bool = True,
+                processor: TextProcessor = None, preprocessor: WordPreprocessor = None,
+                orp_calc: ORPCalculator = None) -> Tuple[str, ProcessedDocument, dict]:
+        """Returns (document_id, document, {'total', 'reused'} segment counts)."""
+        processor = processor or TextProcessor()
+        preprocessor = preprocessor or WordPreprocessor()
+        orp_calc = orp_calc or ORPCalculator()
+
+        document_id = document_id_for(text)
+        self.documents.put(document_id, text, sys.getsizeof(text))
+
+        if CROSS_LINE_DOTS.search(text):
+            metrics.increment('incremental.full_passes')
+            document = ProcessedDocument.from_text(text, detect_headings, processor, preprocessor, orp_calc)
+            return document_id, document, {'total': 1, 'reused': 0}
+
+        prefix = (f'segment:{ALGORITHM_VERSION}:{TOKENIZER_VERSION}:{int(bool(detect_headings))}:'
+                  f'{preprocessor.long_word_threshold}:{preprocessor.pause_count}\0').encode('utf-8')
+        segments = []
+        reused = 0
+        for paragraph in split_paragraphs(text):
+            key = hashlib.sha256(prefix + paragraph.encode('utf-8', 'surrogatepass')).hexdigest()
+            segment = self.segments.get(key)
+            if segment is None:
+                segment = ProcessedDocument.from_text(paragraph, detect_headings, processor,
+                                                      preprocessor, orp_calc)
+                self.segments.put(key, segment, segment.memory_size())
+            else:
+                reused += 1
+            segments.append(segment)
+
+        document = merge_segments(segments)
+        if detect_headings:
+            # Lines repeated in other paragraphs count too, as in a single pass
+            document.repeated_lines = processor.count_repeated_lines(text)
+        return document_id, document, {'total': len(segments), 'reused': reused}
@@ -0,0 +1,226 @@
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+from services.incremental import CROSS_LINE_DOTS, merge_segments
+from services.metrics import metrics
+from services.orp_calculator import ORPCalculator
+from services.processed_document import ProcessedDocument
+from services.text_processor import TextProcessor
+from services.word_preprocessor import WordPreprocessor
+
+
+# Job states
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+# Lines processed per step; progress, partial results and cancellation
+# checks advance one chunk at a time
+JOB_CHUNK_LINES = 200
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    """
+    One background /api/process-text run. The text is processed in chunks
+    of lines whose documents are merged at the end (see merge_segments),
+    so the chunks done so far double as a partial result.
+    """
+
+    def __init__(self, text: str, detect_headings: bool = True,
+                 preprocessor: WordPreprocessor = None, orp_calc: ORPCalculator = None):
+        self.id = uuid.uuid4().hex
+        self.text = text
+        self.text_length = len(text)
+        self.detect_headings = detect_headings
+        self.preprocessor = preprocessor or WordPreprocessor()
+        self.orp_calc = orp_calc or ORPCalculator()
+        self.status = JOB_QUEUED
+        self.lines_total = text.count('\n') + 1
+        self.lines_done = 0
+        self.segments: List[ProcessedDocument] = []
+        self.document: Optional[ProcessedDocument] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = False
+        # Bumped on every change so progress streams can wait for the next one
+        self.version = 0
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    @property
+    def progress(self) -> float:
+        """Percentage of lines processed."""
+        if self.status == JOB_DONE:
+            return 100.0
+        return round(100.0 * self.lines_done / self.lines_total, 1)
+
+    def partial_document(self) -> Tuple[ProcessedDocument, str]:
+        """
+        (document, status) read together: the finished document, or the
+        chunks processed so far merged, with the status they belong to.
+        """
+        with self._changed:
+            document, segments, status = self.document, list(self.segments), self.status
+        if document is None:
+            document = merge_segments(segments)
+        return document, status
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """Block until the job changes past `version` (or timeout); returns the current version."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def advance(self, segment: ProcessedDocument, lines: int):
+        """Record one processed chunk of `lines` lines."""
+        with self._changed:
+            self.segments.append(segment)
+            self.lines_done += lines
+            self.version += 1
+            self._changed.notify_all()
+
+    def update(self, **fields):
+        with self._changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version += 1
+            self._changed.notify_all()
+
+    def to_dict(self) -> dict:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': self.progress,
+            'lines_processed': self.lines_done,
+            'lines_total': self.lines_total,
+            'text_length': self.text_length,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'error': self.error
+        }
+
+
+class JobQueue:
+    """
+    Bounded pool of worker threads running jobs from a priority queue,
+    smallest text first. At most `max_queued` jobs wait at a time, and
+    finished jobs are dropped `ttl` seconds after they end.
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 100, ttl: float = 600,
+                 chunk_lines: int = JOB_CHUNK_LINES):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.chunk_lines = chunk_lines
+        self._jobs: Dict[str, Job] = {}
+        self._queue = []
+        self._sequence = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._condition = threading.Condition()
+
+    def submit(self, job: Job) -> Job:
+        self.cleanup()
+        with self._condition:
+            if len(self._queue) >= self.max_queued:
+                metrics.increment('jobs.rejected')
+                raise QueueFullError(f'Job queue is full ({self.max_queued} jobs waiting)')
+            self._jobs[job.id] = job
+            heapq.heappush(self._queue, (job.text_length, next(self._sequence), job))
+            metrics.set_gauge('jobs.queued', len(self._queue))
+            # Threads start on first use, so forked workers each get their own
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f'job-worker-{len(self._threads)}', daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._condition.notify()
+        metrics.increment('jobs.submitted')
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.cleanup()
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job at once, or a running one at its next chunk."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            job.cancel_requested = True
+            entries = [entry for entry in self._queue if entry[2] is not job]
+            if len(entries) != len(self._queue):
+                self._queue = entries
+                heapq.heapify(self._queue)
+                metrics.set_gauge('jobs.queued', len(self._queue))
+                self._finish(job, JOB_CANCELLED)
+        return job
+
+    def cleanup(self):
+        """Drop finished jobs older than the TTL."""
+        cutoff = time.time() - self.ttl
+        with self._condition:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+        if expired:
+            metrics.increment('jobs.expired', len(expired))
+
+    def queued(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                _, _, job = heapq.heappop(self._queue)
+                metrics.set_gauge('jobs.queued', len(self._queue))
+            self._run(job)
+
+    def _run(self, job: Job):
+        job.update(status=JOB_RUNNING)
+        try:
+            text = job.text
+            processor = TextProcessor()
+            lines = text.split('\n')
+            # Chunks must not split a cross-line ellipsis (see CROSS_LINE_DOTS)
+            chunk_lines = len(lines) if CROSS_LINE_DOTS.search(text) else self.chunk_lines
+            for start in range(0, len(lines), chunk_lines):
+                if job.cancel_requested:
+                    self._finish(job, JOB_CANCELLED)
+                    return
+                chunk = lines[start:start + chunk_lines]
+                segment = ProcessedDocument.from_text('\n'.join(chunk), job.detect_headings, processor,
+                                                      job.preprocessor, job.orp_calc)
+                job.advance(segment, len(chunk))
+
+            document = merge_segments(job.segments)
+            if job.detect_headings:
+                document.repeated_lines = processor.count_repeated_lines(text)
+            self._finish(job, JOB_DONE, document=document)
+        except Exception as e:
+            self._finish(job, JOB_FAILED, error=str(e))
+
+    def _finish(self, job: Job, status: str, **fields):
+        # The text and chunks aren't needed once the job ends
+        job.update(status=status, finished_at=time.time(), text='',
+                    segments=[], **fields)
+        metrics.increment(f'jobs.{status}')
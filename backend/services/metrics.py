@@ -0,0 +1,46 @@
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process counters and gauges.
+
+    Each gunicorn worker keeps its own registry; values are exported as a
+    flat dict by the /api/metrics endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._gauges = {}
+
+    def increment(self, name: str, amount: float = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    def get(self, name: str, default: float = 0) -> float:
+        with self._lock:
+            if name in self._gauges:
+                return self._gauges[name]
+            return self._counters.get(name, default)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            values = dict(self._counters)
+            values.update(self._gauges)
+        return {name: values[name] for name in sorted(values)}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
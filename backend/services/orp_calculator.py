@@ -1,6 +1,58 @@
 
 
-from typing import Dict
+from array import array
+from typing import Dict, List
+from services import warm_cache
+from utils.constants import ORP_LOOKUP_TABLE, ORP_MAX_POSITION
+
+try:
+    import numpy as np
+except ImportError:  # Optional: batch_offsets falls back to pure Python
+    np = None
+
+
+# ORP position indexed by word length; lengths past the end use the last slot
+ORP_POSITIONS_BY_LENGTH = (
+    [0] + [ORP_LOOKUP_TABLE[length] for length in range(1, max(ORP_LOOKUP_TABLE) + 1)] +
+    [ORP_MAX_POSITION]
+)
+ORP_MAX_LOOKUP_LENGTH = len(ORP_POSITIONS_BY_LENGTH) - 1
+
+
+class ORPOffsets:
+    """
+    ORP results for a batch of words as parallel integer arrays.
+    
+    For word i (0-indexed character offsets):
+    - before: [0, orp_index)
+    - orp:    [orp_index, orp_index + 1)
+    - after:  [orp_index + 1, length)
+    where orp_index = position - 1. Blank words have position 0 and
+    empty before/orp/after. Arrays are numpy arrays when numpy is
+    installed, array.array otherwise.
+    """
+    
+    __slots__ = ('lengths', 'positions')
+    
+    def __init__(self, lengths, positions):
+        self.lengths = lengths
+        self.positions = positions
+    
+    def __len__(self) -> int:
+        return len(self.lengths)
+    
+    def split(self, words: List[str], index: int) -> Dict[str, any]:
+        """Materialize the split_word() dict for one word (for callers that need strings)."""
+        word = words[index]
+        position = int(self.positions[index])
+        if position == 0:
+            return {'before': '', 'orp': '', 'after': '', 'orp_position': 0}
+        return {
+            'before': word[:position - 1],
+            'orp': word[position - 1],
+            'after': word[position:],
+            'orp_position': position
+        }
 
 
 class ORPCalculator:
@@ -29,6 +81,19 @@ class ORPCalculator:
             return 5
     
     def split_word(self, word: str) -> Dict[str, any]:
+        # Fast path: tables pre-computed at boot by warm_cache.warm_up()
+        cached = warm_cache.lookup_split(word)
+        if cached is not None:
+            return {
+                'before': cached[0],
+                'orp': cached[1],
+                'after': cached[2],
+                'orp_position': cached[3]
+            }
+        
+        return self.compute_split(word)
+    
+    def compute_split(self, word: str) -> Dict[str, any]:
         # Handle empty or whitespace-only words
         if not word or not word.strip():
             return {
@@ -59,6 +124,47 @@ class ORPCalculator:
     def batch_calculate(self, words: list) -> list:
         return [self.split_word(word) for word in words]
     
+    def batch_offsets(self, words: List[str], use_numpy: bool = None) -> ORPOffsets:
+        """
+        Vectorized ORP for a whole token list: lengths and ORP positions as
+        integer arrays, without slicing any strings.
+        """
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy and np is None:
+            raise RuntimeError("numpy is not installed")
+        
+        count = len(words)
+        if use_numpy:
+            lengths = np.fromiter(map(len, words), dtype=np.int32, count=count)
+            positions = self.positions_for_lengths(lengths, use_numpy=True)
+            # Whitespace-only words have no ORP (empty ones already map to 0)
+            positions[np.fromiter(map(str.isspace, words), dtype=bool, count=count)] = 0
+            return ORPOffsets(lengths, positions)
+        
+        lengths = array('I', map(len, words))
+        positions = self.positions_for_lengths(lengths, use_numpy=False)
+        for index, word in enumerate(words):
+            if positions[index] and word.isspace():
+                positions[index] = 0
+        return ORPOffsets(lengths, positions)
+    
+    def positions_for_lengths(self, lengths, use_numpy: bool = None):
+        """
+        ORP positions for non-blank tokens given only their lengths, e.g.
+        spans into a text buffer (length 0 -> position 0).
+        """
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy:
+            lookup = np.asarray(ORP_POSITIONS_BY_LENGTH, dtype=np.uint8)
+            return lookup[np.minimum(np.asarray(lengths), ORP_MAX_LOOKUP_LENGTH)]
+        
+        lookup = ORP_POSITIONS_BY_LENGTH
+        max_length = ORP_MAX_LOOKUP_LENGTH
+        return array('B', [lookup[length if length < max_length else max_length]
+                           for length in lengths])
+    
     def add_exception_word(self, word: str, orp_position: int):
         # Future: Save to database
         # For now, just store in memory
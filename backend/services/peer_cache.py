@@ -0,0 +1,145 @@
+import base64
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from services.cache_backend import CacheBackend
+from services.metrics import metrics
+from utils.hash_ring import HashRing
+
+
+# Shared secret sent by peers; the peer cache endpoints reject anything else
+PEER_TOKEN_HEADER = 'X-Cache-Token'
+
+# A peer that failed is skipped (its keys move to the next ring node) this long
+PEER_RETRY_SECONDS = 30.0
+
+# Path of the peer cache endpoints (api/peer_cache_routes.py)
+PEER_CACHE_PATH = '/api/cache'
+
+
+class PeerUnavailable(Exception):
+    pass
+
+
+class PeerCacheClient(CacheBackend):
+    """
+    Shards cache keys across backend nodes with consistent hashing.
+
+    Keys owned by this node go to the local backend; others go over HTTP
+    to the owning peer's /api/cache endpoints with a short timeout. A peer
+    that times out or refuses connections is marked down for
+    PEER_RETRY_SECONDS and its keys fall through to the next node on the
+    ring, so a failure only ever costs a cache miss (local compute).
+    """
+
+    name = 'peer_cache'
+
+    def __init__(self, peers: Iterable[str], self_url: str, local: CacheBackend,
+                 token: str, timeout: float = 0.5, replicas: int = 100):
+        self.self_url = self_url.rstrip('/')
+        nodes = [peer.rstrip('/') for peer in peers]
+        if self.self_url not in nodes:
+            nodes.append(self.self_url)
+        self.ring = HashRing(nodes, replicas)
+        self.local = local
+        self.token = token
+        self.timeout = timeout
+        self._down_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _down_nodes(self) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            return [node for node, until in self._down_until.items() if until > now]
+
+    def _mark_down(self, node: str):
+        with self._lock:
+            self._down_until[node] = time.monotonic() + PEER_RETRY_SECONDS
+        metrics.increment(f'{self.name}.peer_failures')
+
+    def owner(self, key: str) -> str:
+        return self.ring.node_for(key, exclude=self._down_nodes()) or self.self_url
+
+    def _request(self, node: str, method: str, path: str, body: bytes = None,
+                 content_type: str = 'application/octet-stream') -> Optional[bytes]:
+        """Returns the response body, None for 404; raises PeerUnavailable."""
+        request = urllib.request.Request(
+            node + PEER_CACHE_PATH + path, data=body, method=method,
+            headers={PEER_TOKEN_HEADER: self.token, 'Content-Type': content_type}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            metrics.increment(f'{self.name}.peer_errors')
+            raise PeerUnavailable(f'{node} answered {e.code}')
+        except OSError as e:  # URLError, refused connections and timeouts
+            self._mark_down(node)
+            raise PeerUnavailable(f'{node} unreachable: {e}')
+
+    def _group_by_owner(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        groups = defaultdict(list)
+        for key in keys:
+            groups[self.owner(key)].append(key)
+        return groups
+
+    def get(self, key: str) -> Optional[bytes]:
+        node = self.owner(key)
+        if node == self.self_url:
+            return self.local.get(key)
+        try:
+            value = self._request(node, 'GET', f'/entries/{key}')
+        except PeerUnavailable:
+            return None
+        metrics.increment(f'{self.name}.hits' if value is not None else f'{self.name}.misses')
+        return value
+
+    def put(self, key: str, value: bytes) -> bool:
+        node = self.owner(key)
+        if node == self.self_url:
+            return self.local.put(key, value)
+        try:
+            self._request(node, 'PUT', f'/entries/{key}', value)
+        except PeerUnavailable:
+            return False
+        return True
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """One request per owning peer."""
+        values = {}
+        for node, node_keys in self._group_by_owner(keys).items():
+            if node == self.self_url:
+                values.update(self.local.get_many(node_keys))
+                continue
+            try:
+                body = self._request(node, 'POST', '/batch-get',
+                                     json.dumps({'keys': node_keys}).encode('utf-8'),
+                                     'application/json')
+            except PeerUnavailable:
+                continue
+            found = json.loads(body)['values'] if body else {}
+            values.update((key, base64.b64decode(value)) for key, value in found.items())
+        return values
+
+    def put_many(self, items: Dict[str, bytes]) -> int:
+        """One request per owning peer."""
+        stored = 0
+        for node, node_keys in self._group_by_owner(items).items():
+            if node == self.self_url:
+                stored += self.local.put_many({key: items[key] for key in node_keys})
+                continue
+            payload = {key: base64.b64encode(items[key]).decode('ascii') for key in node_keys}
+            try:
+                body = self._request(node, 'POST', '/batch-put',
+                                     json.dumps({'values': payload}).encode('utf-8'),
+                                     'application/json')
+            except PeerUnavailable:
+                continue
+            stored += json.loads(body)['stored']
+        return stored
@@ -0,0 +1,126 @@
+import re
+import sys
+from array import array
+from bisect import bisect_right
+from typing import Optional, Tuple
+from services.cancellation import CHECK_MASK, CancellationToken
+from services.stage_cache import TokenizedText
+
+
+# What TextProcessor.normalize() turns into one '…'
+_SPACED_ELLIPSIS = re.compile(r'\.\s*\.\s*\.')
+_SPACE_RUN = re.compile(r'\s*')
+_HYPHEN_RUN = re.compile(r'-*')
+_COMMON_GAPS = frozenset((' ', '\n', '-'))
+
+# Characters searched past a word's expected start before aligning it
+MAX_GAP = 64
+
+
+def source_spans(text: str, tokens: TokenizedText, cancel: CancellationToken = None) -> Tuple[array, array]:
+    """
+    (starts, lengths) of each original word in `text`, the text `tokens`
+    was built from. Normalization only inserts spaces and rewrites
+    ellipses and dashes, so the words are found in order: most occur
+    verbatim after whitespace (or the hyphen a long compound was split
+    at), the rest are aligned character by character.
+    """
+    starts = array('I')
+    lengths = array('I')
+    append_start = starts.append
+    append_length = lengths.append
+    normalized = tokens.normalized
+    find = text.find
+    position = 0
+    for count, (start, length) in enumerate(zip(tokens.starts, tokens.lengths)):
+        if cancel is not None and not count & CHECK_MASK:
+            cancel.check()
+        if not length:
+            # Empty token left by splitting a dash-wrapped word ("-x-"):
+            # it stands for the hyphens, which the next word doesn't cover
+            position = _HYPHEN_RUN.match(text, position).end()
+            append_start(position)
+            append_length(0)
+            continue
+        word = normalized[start:start + length]
+        found = find(word, position, position + length + MAX_GAP)
+        if found == position or (found > position and _is_gap(text[position:found])):
+            append_start(found)
+            append_length(length)
+            position = found + length
+        else:
+            position = _SPACE_RUN.match(text, position).end()
+            if text.startswith('-', position) and not word.startswith('-'):
+                # The hyphen a compound was split at
+                position += 1
+            end = _align_word(text, position, word)
+            append_start(position)
+            append_length(end - position)
+            position = end
+    return starts, lengths
+
+
+def _is_gap(between: str) -> bool:
+    return between in _COMMON_GAPS or between.isspace()
+
+
+def _align_word(text: str, position: int, word: str) -> int:
+    """End in `text` of `word` starting at `position`, undoing normalization."""
+    end = len(text)
+    for char in word:
+        if position >= end:
+            break
+        ellipsis = _SPACED_ELLIPSIS.match(text, position) if char == '…' else None
+        if ellipsis is not None:
+            position = ellipsis.end()
+        else:
+            # Equal, or a dash normalization rewrote to '-'
+            position += 1
+    return position
+
+
+class PositionMap:
+    """
+    Translation between original word indexes and processed offsets
+    (positions in 'words'), which drift apart as pacing repeats words and
+    inserts pauses. word_offsets[i] is the offset of word i's first
+    display and ascends, so original -> processed is a lookup and
+    processed -> original a binary search; pauses belong to the word
+    before them. Optionally holds each word's span in the source text.
+    """
+
+    __slots__ = ('word_offsets', 'source_starts', 'source_lengths')
+
+    def __init__(self, word_offsets: array, source_starts: array = None, source_lengths: array = None):
+        self.word_offsets = word_offsets
+        self.source_starts = source_starts
+        self.source_lengths = source_lengths
+
+    def __len__(self) -> int:
+        return len(self.word_offsets)
+
+    def to_processed(self, word_index: int) -> int:
+        return self.word_offsets[word_index]
+
+    def to_original(self, offset: int) -> int:
+        """Original word shown at processed `offset` (the first word for leading pauses)."""
+        return max(bisect_right(self.word_offsets, offset) - 1, 0)
+
+    def source_span(self, word_index: int) -> Optional[Tuple[int, int]]:
+        """(start, length) of the word in the source text, if spans were kept."""
+        if self.source_starts is None:
+            return None
+        return self.source_starts[word_index], self.source_lengths[word_index]
+
+    def to_dict(self) -> dict:
+        mapping = {'word_offsets': self.word_offsets.tolist()}
+        if self.source_starts is not None:
+            mapping['source_starts'] = self.source_starts.tolist()
+            mapping['source_lengths'] = self.source_lengths.tolist()
+        return mapping
+
+    def memory_size(self) -> int:
+        size = sys.getsizeof(self.word_offsets)
+        if self.source_starts is not None:
+            size += sys.getsizeof(self.source_starts) + sys.getsizeof(self.source_lengths)
+        return size
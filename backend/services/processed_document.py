@@ -0,0 +1,156 @@
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+from services.text_processor import TextProcessor
+from services.word_preprocessor import WordPreprocessor
+from services.orp_calculator import ORPCalculator
+
+
+# Per-token flag bits
+TOKEN_FLAG_HEADING = 1
+TOKEN_FLAG_PAUSE = 2
+
+# String table slot shared by every blank pause
+PAUSE_WORD = ' '
+PAUSE_WORD_ID = 0
+
+
+def orp_entry(word: str, position: int, flags: int) -> dict:
+    """One 'orp_data' item of the API response for a stored token."""
+    if flags & TOKEN_FLAG_PAUSE:
+        return {'word': '', 'before': '', 'orp': '', 'after': '', 'position': 0, 'is_heading': False}
+    if not word or not position:
+        # Empty tokens (e.g. from "-x-") are blank, as in ORPCalculator.split_word('')
+        return {'word': word, 'before': '', 'orp': '', 'after': '', 'position': 0,
+                'is_heading': bool(flags & TOKEN_FLAG_HEADING)}
+    return {
+        'word': word,
+        'before': word[:position - 1],
+        'orp': word[position - 1],
+        'after': word[position:],
+        'position': position,
+        'is_heading': bool(flags & TOKEN_FLAG_HEADING)
+    }
+
+
+class ProcessedDocument:
+    """
+    Compact result of the processing pipeline.
+
+    Tokens are stored run-length encoded in parallel arrays: an index into
+    a table of interned distinct words, the ORP position, how many times
+    the token is displayed and TOKEN_FLAG_* bits. A run of blank pauses is
+    a single token. The list/dict shapes of the API are rendered lazily by
+    the iter_* methods. repeated_lines counts the source lines whose
+    heading detection was reused from an identical earlier line.
+    """
+
+    __slots__ = ('strings', 'word_ids', 'positions', 'multipliers', 'flags',
+                 'original_count', 'processed_count', 'repeated_lines')
+
+    def __init__(self, strings: List[str], word_ids: array, positions: array,
+                 multipliers: array, flags: array, original_count: int,
+                 repeated_lines: int = 0):
+        self.strings = strings
+        self.word_ids = word_ids
+        self.positions = positions
+        self.multipliers = multipliers
+        self.flags = flags
+        self.original_count = original_count
+        self.processed_count = sum(multipliers)
+        self.repeated_lines = repeated_lines
+
+    @classmethod
+    def from_words(cls, words: List[str], word_flags: Optional[array] = None,
+                   preprocessor: WordPreprocessor = None,
+                   orp_calc: ORPCalculator = None,
+                   repeated_lines: int = 0) -> 'ProcessedDocument':
+        """
+        Run the pacing rules and ORP over split words. word_flags (see
+        TextProcessor.word_metadata_flags) enables heading handling.
+        """
+        preprocessor = preprocessor or WordPreprocessor()
+        orp_calc = orp_calc or ORPCalculator()
+
+        strings = [PAUSE_WORD]
+        string_ids: Dict[str, int] = {PAUSE_WORD: PAUSE_WORD_ID}
+        string_positions = [0]
+        word_ids = array('I')
+        positions = array('B')
+        multipliers = array('B')
+        flags = array('B')
+
+        for index, multiplier, is_heading in preprocessor.iter_runs(words, word_flags):
+            if index < 0:
+                word_id = PAUSE_WORD_ID
+                token_flags = TOKEN_FLAG_PAUSE
+            else:
+                word = words[index]
+                word_id = string_ids.get(word)
+                if word_id is None:
+                    word_id = len(strings)
+                    string_ids[word] = word_id
+                    strings.append(sys.intern(word))
+                    string_positions.append(orp_calc.split_word(word)['orp_position'])
+                token_flags = TOKEN_FLAG_HEADING if is_heading else 0
+            word_ids.append(word_id)
+            positions.append(string_positions[word_id])
+            multipliers.append(multiplier)
+            flags.append(token_flags)
+
+        return cls(strings, word_ids, positions, multipliers, flags, len(words), repeated_lines)
+
+    @classmethod
+    def from_text(cls, text: str, detect_headings: bool = True,
+                  processor: TextProcessor = None, preprocessor: WordPreprocessor = None,
+                  orp_calc: ORPCalculator = None) -> 'ProcessedDocument':
+        processor = processor or TextProcessor()
+        words = processor.split_words(processor.normalize(text))
+        line_stats = {}
+        word_flags = processor.word_metadata_flags(text, len(words), line_stats) if detect_headings else None
+        return cls.from_words(words, word_flags, preprocessor, orp_calc,
+                              line_stats.get('repeated_lines', 0))
+
+    def __len__(self) -> int:
+        return self.processed_count
+
+    def iter_tokens(self) -> Iterator[Tuple[str, int, int, int]]:
+        """Yield (word, orp_position, multiplier, flags) per stored token."""
+        strings = self.strings
+        return zip(map(strings.__getitem__, self.word_ids),
+                   self.positions, self.multipliers, self.flags)
+
+    def iter_words(self) -> Iterator[str]:
+        """The 'words' list of the API response, one display per item."""
+        strings = self.strings
+        for word_id, multiplier in zip(self.word_ids, self.multipliers):
+            word = strings[word_id]
+            if multiplier == 1:
+                yield word
+            else:
+                yield from (word,) * multiplier
+
+    def iter_word_objects(self) -> Iterator[dict]:
+        """Dicts shaped like WordPreprocessor.preprocess_with_headings() output."""
+        for word, _, multiplier, flags in self.iter_tokens():
+            if flags & TOKEN_FLAG_PAUSE:
+                blank = {'word': word, 'is_heading': False, 'display_multiplier': 1}
+                yield from (blank,) * multiplier
+            else:
+                yield {
+                    'word': word,
+                    'is_heading': bool(flags & TOKEN_FLAG_HEADING),
+                    'display_multiplier': multiplier
+                }
+
+    def iter_orp_data(self) -> Iterator[dict]:
+        """The 'orp_data' entries of the API response, one display per item."""
+        for word, position, multiplier, flags in self.iter_tokens():
+            yield from (orp_entry(word, position, flags),) * multiplier
+
+    def memory_size(self) -> int:
+        """Approximate bytes held by the document (arrays plus string table)."""
+        size = sum(sys.getsizeof(part) for part in (
+            self, self.strings, self.word_ids, self.positions, self.multipliers, self.flags
+        ))
+        return size + sum(sys.getsizeof(word) for word in self.strings)
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from services.cache_backend import CacheBackend
+from services.document_format import FORMAT_VERSION
+from services.metrics import metrics
+
+
+# Bump whenever the pacing/ORP rules change so stale results are never served
+ALGORITHM_VERSION = 1
+
+# last_access is only rewritten when older than this (keeps hot reads cheap)
+ACCESS_RESOLUTION_SECONDS = 60
+
+# How long a writer waits for another worker's transaction
+BUSY_TIMEOUT_SECONDS = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access);
+"""
+
+
+def cache_key(text: str, options: dict) -> str:
+    """SHA-256 of the algorithm/format versions, the options and the text."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {'algorithm': ALGORITHM_VERSION, 'format': FORMAT_VERSION, 'options': options},
+        sort_keys=True
+    ).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(text.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+class ResultCache(CacheBackend):
+    """
+    Disk-backed cache of processed documents shared by all workers.
+
+    SQLite in WAL mode: readers never block, writers from different
+    processes are serialized by SQLite's own locking and every put/evict
+    is one transaction. Values are zlib-compressed binary documents, and
+    the total stored size is kept under max_bytes by evicting the least
+    recently used entries.
+    """
+
+    name = 'result_cache'
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and per process (never reuse across fork)
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS,
+                                         isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key: str) -> Optional[bytes]:
+        connection = self._connection()
+        row = connection.execute(
+            'SELECT value, last_access FROM results WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            metrics.increment('result_cache.misses')
+            return None
+
+        value, last_access = row
+        now = time.time()
+        if now - last_access > ACCESS_RESOLUTION_SECONDS:
+            connection.execute('UPDATE results SET last_access = ? WHERE key = ?', (now, key))
+        metrics.increment('result_cache.hits')
+        return value
+
+    def put(self, key: str, value: bytes) -> bool:
+        """Store value; returns False if it alone exceeds max_bytes."""
+        size = len(value)
+        if size > self.max_bytes:
+            metrics.increment('result_cache.rejected_too_large')
+            return False
+
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                'INSERT OR REPLACE INTO results (key, value, size, last_access) VALUES (?, ?, ?, ?)',
+                (key, value, size, time.time())
+            )
+            self._evict(connection)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        metrics.increment('result_cache.writes')
+        return True
+
+    def _evict(self, connection: sqlite3.Connection):
+        total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in connection.execute('SELECT key, size FROM results ORDER BY last_access'):
+            evicted.append((key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        connection.executemany('DELETE FROM results WHERE key = ?', evicted)
+        metrics.increment('result_cache.evictions', len(evicted))
+
+    def total_bytes(self) -> int:
+        return self._connection().execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def clear(self):
+        self._connection().execute('DELETE FROM results')
@@ -0,0 +1,106 @@
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate
+from typing import List
+from services.cancellation import CHECK_MASK, CancellationToken
+from services.processed_document import TOKEN_FLAG_PAUSE, ProcessedDocument
+from services.text_processor import TextProcessor
+
+
+# Key id of words that are only punctuation (dashes, ellipses...)
+NO_KEY = 0xFFFFFFFF
+
+
+class SearchIndex:
+    """
+    Inverted index of a processed document: for each search key (a word
+    lower-cased, with TextProcessor.clean_punctuation applied) the
+    ascending positions it occurs at. Words that are only punctuation
+    have no key and no position, on both the document and the query side,
+    so "yes - and" is found as "yes and"; word_indexes maps positions
+    back to original word indexes. Postings of all keys share one array,
+    ordered by key: key k's postings are positions[bounds[k]:bounds[k + 1]].
+    """
+
+    __slots__ = ('keys', 'bounds', 'positions', 'word_indexes', 'processor')
+
+    def __init__(self, keys: dict, bounds: array, positions: array, word_indexes: array):
+        self.keys = keys
+        self.bounds = bounds
+        self.positions = positions
+        self.word_indexes = word_indexes
+        # Own processor: the index outlives the request whose cancellation
+        # token the build's processor carries
+        self.processor = TextProcessor()
+
+    @classmethod
+    def build(cls, document: ProcessedDocument, processor: TextProcessor = None,
+              cancel: CancellationToken = None) -> 'SearchIndex':
+        """Index a document's words; keys are computed once per distinct word."""
+        processor = processor or TextProcessor()
+        keys = {}
+        key_id_of_string = array('I')
+        for count, string in enumerate(document.strings):
+            if cancel is not None and not count & CHECK_MASK:
+                cancel.check()
+            key = processor.clean_punctuation(string).lower()
+            key_id_of_string.append(keys.setdefault(key, len(keys)) if key else NO_KEY)
+        word_keys = [
+            key_id_of_string[word_id]
+            for word_id, flags in zip(document.word_ids, document.flags) if not flags & TOKEN_FLAG_PAUSE
+        ]
+        word_indexes = array('I', [index for index, key_id in enumerate(word_keys) if key_id != NO_KEY])
+        key_ids = array('I', [key_id for key_id in word_keys if key_id != NO_KEY])
+
+        # Group positions by key; sorted() is stable, so postings stay ascending
+        counts = Counter(key_ids)
+        bounds = array('I', [0])
+        bounds.extend(accumulate(counts[key_id] for key_id in range(len(keys))))
+        positions = array('I', sorted(range(len(key_ids)), key=key_ids.__getitem__))
+        return cls(keys, bounds, positions, word_indexes)
+
+    def postings(self, key: str) -> array:
+        key_id = self.keys.get(key)
+        if key_id is None:
+            return array('I')
+        return self.positions[self.bounds[key_id]:self.bounds[key_id + 1]]
+
+    def query_keys(self, query: str) -> List[str]:
+        """Search keys of a query, tokenized like the document."""
+        processor = self.processor
+        words = processor.split_words(processor.normalize(query))
+        return [key for key in (processor.clean_punctuation(word).lower() for word in words) if key]
+
+    def search(self, query: str) -> array:
+        """
+        Original word indexes where the query's words occur in sequence
+        (a single word, or a phrase; punctuation-only words are skipped),
+        ascending. Candidates come from the rarest word, each checked
+        against the others' postings by bisect.
+        """
+        keys = self.query_keys(query)
+        if not keys:
+            return array('I')
+        postings = [self.postings(key) for key in keys]
+        rarest = min(range(len(keys)), key=lambda index: len(postings[index]))
+        matches = array('I')
+        for position in postings[rarest]:
+            start = position - rarest
+            if start < 0:
+                continue
+            for index, others in enumerate(postings):
+                if index == rarest:
+                    continue
+                found = bisect_left(others, start + index)
+                if found == len(others) or others[found] != start + index:
+                    break
+            else:
+                matches.append(self.word_indexes[start])
+        return matches
+
+    def memory_size(self) -> int:
+        return (sys.getsizeof(self.keys) + sum(sys.getsizeof(key) for key in self.keys)
+                + sys.getsizeof(self.bounds) + sys.getsizeof(self.positions)
+                + sys.getsizeof(self.word_indexes))
@@ -0,0 +1,112 @@
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, TypeVar
+from services.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Not on POSIX: cross-worker locks are disabled
+    fcntl = None
+
+
+# Lock files are striped by key hash so the lock directory stays bounded
+LOCK_STRIPES = 1024
+
+LOCK_POLL_SECONDS = 0.05
+
+T = TypeVar('T')
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key within a process.
+
+    The first caller (leader) runs the function; callers arriving while it
+    runs wait for its result instead of running it again. Followers give
+    up waiting after `timeout` seconds, or if the leader failed, and run
+    the function themselves.
+    """
+
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = timeout
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            if not call.done.wait(self.timeout):
+                metrics.increment('single_flight.timeouts')
+            elif call.error is None:
+                metrics.increment('single_flight.shared')
+                return call.result
+            return func()
+
+        metrics.increment('single_flight.leaders')
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+def cross_process_locks_available() -> bool:
+    return fcntl is not None
+
+
+@contextmanager
+def file_lock(directory: str, key: str, timeout: float) -> Iterator[bool]:
+    """
+    Exclusive lock on `key` shared by every process using `directory`.
+
+    Yields True once acquired, or False after `timeout` seconds so a stuck
+    holder never blocks the caller forever (the caller then proceeds
+    unlocked). Keys hash onto LOCK_STRIPES lock files.
+    """
+    stripe = int(hashlib.sha1(key.encode('utf-8')).hexdigest(), 16) % LOCK_STRIPES
+    fd = os.open(os.path.join(directory, f'{stripe:04d}.lock'), os.O_CREAT | os.O_RDWR, 0o644)
+    acquired = False
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                acquired = True
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    metrics.increment('single_flight.lock_timeouts')
+                    break
+                time.sleep(LOCK_POLL_SECONDS)
+        yield acquired
+    finally:
+        if acquired:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
@@ -0,0 +1,96 @@
+import hashlib
+import sys
+from array import array
+from typing import List, Optional
+from services.text_processor import TextProcessor
+from utils.sized_lru import SizedLRU
+
+
+# Bump whenever normalization/tokenization changes
+TOKENIZER_VERSION = 1
+
+
+class TokenizedText:
+    """
+    Output of the text stages (normalize, split, heading detection) that
+    doesn't depend on any pacing option: the normalized text plus word
+    spans into it. Word flags (and the count of repeated lines found
+    meanwhile) are only computed the first time heading detection is
+    requested.
+    """
+
+    __slots__ = ('normalized', 'starts', 'lengths', 'flags', 'repeated_lines')
+
+    def __init__(self, normalized: str, starts: array, lengths: array):
+        self.normalized = normalized
+        self.starts = starts
+        self.lengths = lengths
+        self.flags: Optional[array] = None
+        self.repeated_lines = 0
+
+    @classmethod
+    def from_text(cls, text: str, processor: TextProcessor = None) -> 'TokenizedText':
+        processor = processor or TextProcessor()
+        normalized = processor.normalize(text)
+        starts, lengths = processor.split_word_spans(normalized)
+        return cls(normalized, starts, lengths)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def words(self) -> List[str]:
+        """Same list as TextProcessor.split_words(normalized)."""
+        normalized = self.normalized
+        return [normalized[start:start + length] for start, length in zip(self.starts, self.lengths)]
+
+    def word_flags(self, text: str, processor: TextProcessor = None) -> array:
+        """WORD_FLAG_* per word; `text` must be the text this was built from."""
+        if self.flags is None:
+            processor = processor or TextProcessor()
+            line_stats = {}
+            self.flags = processor.word_metadata_flags(text, len(self.starts), line_stats)
+            self.repeated_lines = line_stats.get('repeated_lines', 0)
+        return self.flags
+
+    def memory_size(self) -> int:
+        size = sys.getsizeof(self.normalized) + sys.getsizeof(self.starts) + sys.getsizeof(self.lengths)
+        if self.flags is not None:
+            size += sys.getsizeof(self.flags)
+        return size
+
+
+class StageCache:
+    """
+    In-process LRU of TokenizedText keyed by the text hash, so reprocessing
+    a text with other options only reruns preprocessing and ORP. Bounded
+    by the approximate memory held by the entries.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._entries = SizedLRU(max_bytes, 'stage_cache')
+
+    @property
+    def max_bytes(self) -> int:
+        return self._entries.max_bytes
+
+    @property
+    def total_bytes(self) -> int:
+        return self._entries.total_bytes
+
+    @staticmethod
+    def key_for(text: str) -> str:
+        digest = hashlib.sha256(f'tokenizer:{TOKENIZER_VERSION}\0'.encode('utf-8'))
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def get(self, text: str, processor: TextProcessor = None) -> TokenizedText:
+        key = self.key_for(text)
+        tokens = self._entries.get(key)
+        if tokens is None:
+            tokens = TokenizedText.from_text(text, processor)
+            # Sized up front with room for the word flags added later
+            self._entries.put(key, tokens, tokens.memory_size() + len(tokens))
+        return tokens
+
+    def __len__(self) -> int:
+        return len(self._entries)
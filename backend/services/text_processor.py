@@ -1,11 +1,27 @@
 
 
 import re
-from typing import List, Tuple
+from array import array
+from typing import Iterator, List, Tuple
+from services.cancellation import CHECK_MASK, CancellationToken
+
+
+# Per-word metadata flags (compact form of split_words_with_metadata's dicts)
+WORD_FLAG_HEADING = 1
+WORD_FLAG_ALL_CAPS = 2
+
+_NON_SPACE_RUN = re.compile(r'\S+')
+
+# normalize() checks for cancellation between its passes on texts this long
+NORMALIZE_CHECK_CHARS = 64 * 1024
 
 
 class TextProcessor:
     
+    def __init__(self, cancel: CancellationToken = None):
+        # Checked every CHECK_INTERVAL lines/tokens by the long-running methods
+        self.cancel = cancel
+    
     def is_likely_heading(self, text: str) -> bool:
         """
         Detect if text is likely a heading/title based on formatting patterns.
@@ -38,7 +54,7 @@ class TextProcessor:
             # Exclude lines ending with other sentence punctuation (!, ?, ,)
             if any(text.endswith(p) for p in ['!', '?', ',']):
                 return False
-
+            
             # Treat short, capitalized lines as headings. This avoids
             # misclassifying paragraph lines that were wrapped with a
             # newline (e.g., text split mid-sentence) as headings.
@@ -54,6 +70,9 @@ class TextProcessor:
         
         # Remove leading/trailing whitespace
         text = text.strip()
+        cancel = self.cancel if len(text) >= NORMALIZE_CHECK_CHARS else None
+        if cancel is not None:
+            cancel.check()
         
         # Normalize quotes
         text = text.replace('"', '"').replace('"', '"')  # Smart quotes to straight
@@ -70,6 +89,8 @@ class TextProcessor:
         
         # Replace newlines with spaces
         text = re.sub(r'\n+', ' ', text)
+        if cancel is not None:
+            cancel.check()
         
         # Fix punctuation spacing - ensure space after punctuation
         text = re.sub(r'\.(?=\S)', '. ', text)   # Space after period
@@ -78,6 +99,8 @@ class TextProcessor:
         text = re.sub(r'\:(?=\S)', ': ', text)   # Space after colon
         text = re.sub(r'\;(?=\S)', '; ', text)   # Space after semicolon
         text = re.sub(r'\,(?=\S)', ', ', text)   # Space after comma
+        if cancel is not None:
+            cancel.check()
         
         # Add extra spaces after sentence endings for pause effect
         text = re.sub(r'\.\s', '.   ', text)     # 3 spaces after period
@@ -87,6 +110,8 @@ class TextProcessor:
         
         # Add extra spaces after colons (often section headers)
         text = re.sub(r':\s', ':   ', text)     # 3 spaces after colon
+        if cancel is not None:
+            cancel.check()
         
         # Clean up any multiple spaces that were created
         text = re.sub(r'\s{2,}', '  ', text)     # Max 2 spaces
@@ -119,61 +144,140 @@ class TextProcessor:
         
         text = text.strip()
         
-        # Detect headings BEFORE normalization (to preserve line structure)
-        lines = text.split('\n')
-        
-        # Pre-allocate result list for better memory efficiency
-        words_with_meta = []
-        
         # Normalize and process in one pass
         normalized = self.normalize(text)
         all_words = self.split_words(normalized)
         
-        # Build a simple line-to-heading map (avoid storing full line objects)
-        line_is_heading = []
-        for line in lines:
+        return [
+            (word, {'is_heading': is_heading, 'is_all_caps': is_all_caps})
+            for word, (is_heading, is_all_caps) in zip(all_words, self._iter_word_metadata(text, len(all_words)))
+        ]
+    
+    def _iter_line_metadata(self, text: str, line_stats: dict = None) -> Iterator[Tuple[bool, bool, int]]:
+        """
+        Yield (is_heading, is_all_caps, word_count) per non-empty line.
+        Repeated lines (running headers, footers, navigation) are analysed
+        once per call; line_stats, if given, receives the 'lines' and
+        'repeated_lines' counts once the iterator is exhausted.
+        """
+        seen = {}
+        lines = repeated = 0
+        cancel = self.cancel
+        for line in text.split('\n'):
             line = line.strip()
-            if line:
-                # Only check non-empty lines
-                line_is_heading.append(self.is_likely_heading(line))
+            if not line:
+                continue
+            
+            if cancel is not None and not lines & CHECK_MASK:
+                cancel.check()
+            lines += 1
+            metadata = seen.get(line)
+            if metadata is None:
+                # Get words for this line from normalized text
+                metadata = seen[line] = (
+                    self.is_likely_heading(line),
+                    line.isupper(),
+                    len(self.split_words(self.normalize(line)))
+                )
             else:
-                line_is_heading.append(False)
+                repeated += 1
+            yield metadata
         
-        # Match words to lines efficiently
-        word_idx = 0
-        for line_idx, line in enumerate(lines):
+        if line_stats is not None:
+            line_stats['lines'] = lines
+            line_stats['repeated_lines'] = repeated
+    
+    def iter_lines(self, text: str) -> Iterator[Tuple[str, bool, int, bool]]:
+        """
+        Yield (line, is_heading, word_count, after_blank) per non-empty
+        stripped line, with the heading flag and word count that
+        word_metadata_flags() assigns it, and whether blank lines precede it.
+        """
+        metadata = self._iter_line_metadata(text)
+        after_blank = False
+        for line in text.split('\n'):
             line = line.strip()
             if not line:
+                after_blank = True
                 continue
-            
-            is_heading = line_is_heading[line_idx] if line_idx < len(line_is_heading) else False
-            is_all_caps = line.isupper()
-            
-            # Get words for this line from normalized text
-            line_normalized = self.normalize(line)
-            line_words = self.split_words(line_normalized)
-            
+            is_heading, _, word_count = next(metadata)
+            yield line, is_heading, word_count, after_blank
+            after_blank = False
+    
+    def count_repeated_lines(self, text: str) -> int:
+        """The 'repeated_lines' count of _iter_line_metadata(), without the analysis."""
+        lines = [line for line in map(str.strip, text.split('\n')) if line]
+        return len(lines) - len(set(lines))
+    
+    def _iter_word_metadata(self, text: str, word_count: int) -> Iterator[Tuple[bool, bool]]:
+        """
+        Yield (is_heading, is_all_caps) for each of the word_count words of
+        the normalized text. Headings are detected per line BEFORE
+        normalization (to preserve line structure), and each line claims as
+        many words as it produces when normalized on its own.
+        """
+        word_idx = 0
+        for is_heading, is_all_caps, line_word_count in self._iter_line_metadata(text):
             # Tag each word from this line
-            for _ in line_words:
-                if word_idx < len(all_words):
-                    words_with_meta.append((
-                        all_words[word_idx],
-                        {'is_heading': is_heading, 'is_all_caps': is_all_caps}
-                    ))
-                    word_idx += 1
-        
-        # Add remaining words (if any) as non-headings
-        while word_idx < len(all_words):
-            words_with_meta.append((
-                all_words[word_idx],
-                {'is_heading': False, 'is_all_caps': False}
-            ))
-            word_idx += 1
-        
-        return words_with_meta
+            for _ in range(min(line_word_count, word_count - word_idx)):
+                yield is_heading, is_all_caps
+                word_idx += 1
+        
+        # Remaining words (if any) are non-headings
+        for _ in range(word_count - word_idx):
+            yield False, False
+    
+    def split_word_spans(self, normalized: str) -> Tuple[array, array]:
+        """
+        Tokenize like split_words() but return (starts, lengths) offsets into
+        `normalized` instead of new string objects.
+        """
+        starts = array('I')
+        lengths = array('I')
+        cancel = self.cancel
+        for count, match in enumerate(_NON_SPACE_RUN.finditer(normalized)):
+            if cancel is not None and not count & CHECK_MASK:
+                cancel.check()
+            start, end = match.span()
+            first_hyphen = normalized.find('-', start, end)
+            if first_hyphen == -1 or normalized.find('-', first_hyphen + 1, end) == -1:
+                starts.append(start)
+                lengths.append(end - start)
+                continue
+            
+            # 2+ hyphens: same pairing as _split_multi_hyphenated_words; each
+            # "part-part" chunk is a contiguous slice of the original token
+            parts = normalized[start:end].split('-')
+            offset = start
+            for i in range(0, len(parts), 2):
+                if i + 1 < len(parts):
+                    length = len(parts[i]) + 1 + len(parts[i + 1])
+                else:
+                    length = len(parts[i])
+                starts.append(offset)
+                lengths.append(length)
+                offset += length + 1
+        return starts, lengths
+    
+    def word_metadata_flags(self, text: str, word_count: int, line_stats: dict = None) -> array:
+        """
+        Per-word WORD_FLAG_* bits matching split_words_with_metadata().
+        See _iter_line_metadata() for line_stats.
+        """
+        flags = array('B')
+        if not text:
+            return flags
+        for is_heading, is_all_caps, line_word_count in self._iter_line_metadata(text.strip(), line_stats):
+            line_word_count = min(line_word_count, word_count - len(flags))
+            flag = (WORD_FLAG_HEADING if is_heading else 0) | (WORD_FLAG_ALL_CAPS if is_all_caps else 0)
+            flags.extend(bytes((flag,)) * line_word_count)
+        
+        # Remaining words (if any) are non-headings
+        flags.extend(bytes(word_count - len(flags)))
+        return flags
     
     def _split_multi_hyphenated_words(self, words: List[str]) -> List[str]:
-       
+        
         result = []
         
         for word in words:
@@ -202,7 +306,7 @@ class TextProcessor:
         return result
     
     def remove_special_formatting(self, text: str) -> str:
-       
+        
         return text
     
     def count_words(self, text: str) -> int:
@@ -0,0 +1,128 @@
+import gc
+import os
+import sys
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import config
+
+
+# Bundled word-frequency list (one word per line, most frequent first)
+DEFAULT_WORD_LIST_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data',
+    'common_words.txt'
+)
+
+# Punctuated variants that show up constantly in real text
+WARM_SUFFIXES = ('', ',', '.')
+
+# Token class bit layout: (clean_length << 2) | (has_comma << 1) | is_sentence_ending
+TOKEN_CLASS_SENTENCE_ENDING = 1
+TOKEN_CLASS_HAS_COMMA = 2
+TOKEN_CLASS_LENGTH_SHIFT = 2
+
+# Read-only tables, replaced wholesale by warm_up(). Workers forked after
+# warm_up() share these pages with the master process.
+_orp_splits: Mapping[str, Tuple[str, str, str, int]] = MappingProxyType({})
+_token_classes: Mapping[str, int] = MappingProxyType({})
+
+
+def load_word_list(count: int = None, path: str = None) -> List[str]:
+    """
+    Load the first `count` words of the bundled frequency list.
+    Blank lines and '#' comments are skipped, duplicates are dropped.
+    """
+    count = count if count is not None else config.Config.WARMUP_WORD_COUNT
+    path = path or DEFAULT_WORD_LIST_PATH
+
+    words = []
+    seen = set()
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            word = line.strip()
+            if not word or word.startswith('#') or word in seen:
+                continue
+            seen.add(word)
+            words.append(word)
+            if len(words) >= count:
+                break
+    return words
+
+
+def expand_variants(words: List[str]) -> List[str]:
+    """Add capitalized and punctuated variants of each word."""
+    variants = []
+    seen = set()
+    for word in words:
+        for base in (word, word.capitalize()):
+            for suffix in WARM_SUFFIXES:
+                token = base + suffix
+                if token not in seen:
+                    seen.add(token)
+                    variants.append(token)
+    return variants
+
+
+def classify_token(word: str) -> int:
+    """
+    Pack the threshold-independent facts WordPreprocessor needs into one int,
+    so the same table serves any long_word_threshold.
+    """
+    # Local import: word_preprocessor imports this module for lookups
+    from services.word_preprocessor import classify_token as classify
+
+    return classify(word)
+
+
+def warm_up(count: int = None, path: str = None) -> Dict[str, int]:
+    """
+    Build the shared ORP and token classification tables.
+
+    Call once in the master process before gunicorn forks (run gunicorn with
+    --preload), so every worker starts with warm, copy-on-write shared caches.
+    """
+    global _orp_splits, _token_classes
+
+    from services.orp_calculator import ORPCalculator
+
+    calculator = ORPCalculator()
+    tokens = expand_variants(load_word_list(count, path))
+
+    splits = {}
+    classes = {}
+    for token in tokens:
+        split = calculator.compute_split(token)
+        # Interned keys keep one copy of each token across both tables
+        key = sys.intern(token)
+        splits[key] = (split['before'], split['orp'], split['after'], split['orp_position'])
+        classes[key] = classify_token(token)
+
+    _orp_splits = MappingProxyType(splits)
+    _token_classes = MappingProxyType(classes)
+
+    # Move everything built so far out of the cyclic GC's generations so
+    # collections in the workers don't touch (and copy) the shared pages
+    gc.collect()
+    gc.freeze()
+
+    return {'tokens': len(tokens), 'orp_entries': len(splits)}
+
+
+def lookup_split(word: str) -> Optional[Tuple[str, str, str, int]]:
+    return _orp_splits.get(word)
+
+
+def lookup_token_class(word: str) -> Optional[int]:
+    return _token_classes.get(word)
+
+
+def is_warm() -> bool:
+    return len(_orp_splits) > 0
+
+
+def reset():
+    """Drop the warm tables (used by tests)."""
+    global _orp_splits, _token_classes
+    _orp_splits = MappingProxyType({})
+    _token_classes = MappingProxyType({})
@@ -1,32 +1,99 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import config
+from services import warm_cache
+from services.cancellation import CHECK_MASK, CancellationToken
+from services.text_processor import WORD_FLAG_ALL_CAPS, WORD_FLAG_HEADING
 
 
-from typing import List, Tuple
-import config
+# Punctuation ignored when measuring word length for duplication
+DUPLICATION_STRIP_CHARS = '.,!?;:()[]{}"\'-'
+
+# Characters that trigger a pause after the word
+SENTENCE_MARKER_CHARS = frozenset('.!?:;)')
+
+# Compiled per-token actions (bit flags)
+ACTION_DUPLICATE = 1  # Show the word 3 times
+ACTION_PAUSE = 2      # Blank pauses after the word (sentence ending)
+
+# Pauses after a heading ends
+HEADING_END_PAUSES = 5
+
+# Per-instance token action cache is cleared when it grows past this
+TOKEN_CACHE_LIMIT = 100_000
+
+
+def classify_token(word: str) -> int:
+    """
+    Threshold-independent token class, packed as
+    (clean_length << 2) | (has_comma << 1) | is_sentence_ending.
+    """
+    token_class = len(word.strip(DUPLICATION_STRIP_CHARS)) << warm_cache.TOKEN_CLASS_LENGTH_SHIFT
+    if ',' in word:
+        token_class |= warm_cache.TOKEN_CLASS_HAS_COMMA
+    if not SENTENCE_MARKER_CHARS.isdisjoint(word):
+        token_class |= warm_cache.TOKEN_CLASS_SENTENCE_ENDING
+    return token_class
 
 
 class WordPreprocessor:
+    """
+    Table-driven pacing rules.
+    
+    Each distinct token is classified once (boot-time warm table first,
+    then a per-instance cache) into an action bitmask; the preprocess
+    methods are single passes that only look those actions up.
+    """
+    
+    DUPLICATION_STRIP_CHARS = DUPLICATION_STRIP_CHARS
     
-    def __init__(self, long_word_threshold: int = None, pause_count: int = None):
+    def __init__(self, long_word_threshold: int = None, pause_count: int = None,
+                 cancel: CancellationToken = None):
         self.long_word_threshold = long_word_threshold or config.Config.LONG_WORD_THRESHOLD
         self.pause_count = pause_count or config.Config.PAUSE_COUNT
+        # Checked every CHECK_INTERVAL words by iter_runs()
+        self.cancel = cancel
+        self._actions: Dict[str, int] = {}
+    
+    def _compile_action(self, token_class: int) -> int:
+        action = 0
+        if ((token_class >> warm_cache.TOKEN_CLASS_LENGTH_SHIFT) > self.long_word_threshold or
+                token_class & warm_cache.TOKEN_CLASS_HAS_COMMA):
+            action |= ACTION_DUPLICATE
+        if token_class & warm_cache.TOKEN_CLASS_SENTENCE_ENDING:
+            action |= ACTION_PAUSE
+        return action
+    
+    def token_action(self, word: str) -> int:
+        action = self._actions.get(word)
+        if action is None:
+            token_class = warm_cache.lookup_token_class(word)
+            if token_class is None:
+                token_class = classify_token(word)
+            action = self._compile_action(token_class)
+            if len(self._actions) >= TOKEN_CACHE_LIMIT:
+                self._actions.clear()
+            self._actions[word] = action
+        return action
     
     def preprocess(self, words: List[str]) -> List[str]:
         processed = []
+        append = processed.append
+        extend = processed.extend
+        action_of = self.token_action
+        pauses = [' '] * self.pause_count
         
         for word in words:
-            # Add the original word
-            processed.append(word)
+            action = action_of(word)
+            append(word)
             
-            # Rule 1: Duplicate long words (more processing time needed)
-            # Rule 2: Duplicate words with commas (pause needed)
-            if self._should_duplicate(word):
-                # Add 2 more copies (total of 3 appearances)
-                processed.extend([word, word])
+            # Rule 1/2: long words and comma words appear 3 times
+            if action & ACTION_DUPLICATE:
+                extend((word, word))
             
-            # Rule 3: Add blank pauses after sentence endings
-            if self._is_sentence_ending(word):
-                # Add blank pauses for comprehension break
-                processed.extend([' '] * self.pause_count)
+            # Rule 3: blank pauses after sentence endings
+            if action & ACTION_PAUSE:
+                extend(pauses)
         
         return processed
     
@@ -39,87 +106,124 @@ class WordPreprocessor:
         - word: str
         - is_heading: bool
         - display_multiplier: int (how many times to show the word)
+        
+        Single pass with two states (in/out of a heading): the pauses that
+        close a heading are emitted on the transition to the next
+        non-heading word (or at the end) instead of by looking ahead.
+        Blank pause entries are one shared dict; treat the output as read-only.
         """
         processed = []
-        heading_words = []
+        append = processed.append
+        extend = processed.extend
+        action_of = self.token_action
+        
+        blank = {'word': ' ', 'is_heading': False, 'display_multiplier': 1}
+        pauses = [blank] * self.pause_count
+        heading_end_pauses = [blank] * HEADING_END_PAUSES
         in_heading = False
         
-        for i, (word, meta) in enumerate(words_with_meta):
+        for word, meta in words_with_meta:
             is_heading = meta.get('is_heading', False)
-            is_all_caps = meta.get('is_all_caps', False)
             
-            # Track heading start/end
-            if is_heading and not in_heading:
-                # Starting a new heading - add pause before
-                for _ in range(self.pause_count):
-                    processed.append({
-                        'word': ' ',
-                        'is_heading': False,
-                        'display_multiplier': 1
-                    })
-                in_heading = True
-                heading_words = []
+            if is_heading:
+                if not in_heading:
+                    # Starting a new heading - add pause before
+                    extend(pauses)
+                    in_heading = True
+            elif in_heading:
+                # Previous word closed the heading
+                extend(heading_end_pauses)
+                in_heading = False
             
-            # Determine display multiplier
-            if is_heading or is_all_caps:
-                # Headings and all-caps: show 4-5 times (much slower)
-                multiplier = 3
-            elif self._should_duplicate(word):
-                # Long words or comma words: show 3 times
+            action = action_of(word)
+            
+            # Headings, all-caps lines, long words and comma words: 3 times
+            if is_heading or meta.get('is_all_caps', False) or action & ACTION_DUPLICATE:
                 multiplier = 3
             else:
-                # Normal words: show once
                 multiplier = 1
             
-            # Add the word
-            processed.append({
+            append({
                 'word': word,
                 'is_heading': is_heading,
                 'display_multiplier': multiplier
             })
             
-            # Add sentence ending pauses
-            if self._is_sentence_ending(word) and not is_heading:
-                for _ in range(self.pause_count):
-                    processed.append({
-                        'word': ' ',
-                        'is_heading': False,
-                        'display_multiplier': 1
-                    })
-            
-            # Check if heading is ending
-            if in_heading:
-                heading_words.append(word)
-                # Heading ends if next word is not a heading
-                next_is_heading = False
-                if i + 1 < len(words_with_meta):
-                    next_is_heading = words_with_meta[i + 1][1].get('is_heading', False)
-                
-                if not next_is_heading:
-                    # End of heading - add 5 blank pauses
-                    for _ in range(5):
-                        processed.append({
-                            'word': ' ',
-                            'is_heading': False,
-                            'display_multiplier': 1
-                        })
-                    in_heading = False
+            # Sentence ending pauses (not inside headings)
+            if action & ACTION_PAUSE and not is_heading:
+                extend(pauses)
+        
+        if in_heading:
+            extend(heading_end_pauses)
         
         return processed
     
-    def _should_duplicate(self, word: str) -> bool:
-        # Check length (excluding punctuation for fair comparison)
-        clean_word = word.strip('.,!?;:()[]{}"\'-')
-        is_long = len(clean_word) > self.long_word_threshold
+    def iter_runs(self, words: Iterable[str],
+                  word_flags: Optional[array] = None) -> Iterator[Tuple[int, int, bool]]:
+        """
+        Run-length form of preprocess_with_headings() (or preprocess() when
+        word_flags is None): yields (index, multiplier, is_heading) per
+        source word, and (-1, count, False) for a run of blank pauses.
+        """
+        action_of = self.token_action
+        pause_count = self.pause_count
+        cancel = self.cancel
+        in_heading = False
         
-        # Check for comma (indicates clause break)
-        has_comma = ',' in word
+        for index, word in enumerate(words):
+            if cancel is not None and not index & CHECK_MASK:
+                cancel.check()
+            flags = word_flags[index] if word_flags is not None else 0
+            is_heading = bool(flags & WORD_FLAG_HEADING)
+            
+            if is_heading:
+                if not in_heading:
+                    yield -1, pause_count, False
+                    in_heading = True
+            elif in_heading:
+                yield -1, HEADING_END_PAUSES, False
+                in_heading = False
+            
+            action = action_of(word)
+            
+            if is_heading or flags & WORD_FLAG_ALL_CAPS or action & ACTION_DUPLICATE:
+                yield index, 3, is_heading
+            else:
+                yield index, 1, is_heading
+            
+            if action & ACTION_PAUSE and not is_heading:
+                yield -1, pause_count, False
         
-        return is_long or has_comma
+        if in_heading:
+            yield -1, HEADING_END_PAUSES, False
+    
+    def preprocess_spans(self, text: str, starts: array, lengths: array,
+                         word_flags: Optional[array] = None) -> Tuple[array, array]:
+        """
+        Span-based twin of preprocess_with_headings() (or preprocess() when
+        word_flags is None) for tokens given as offsets into `text`.
+        
+        Returns the processed stream as two parallel arrays: the index of
+        the source token (-1 for a blank pause) and its heading flag. Words
+        are repeated by their display multiplier, so the stream lines up
+        with the 'words' list of the default output.
+        """
+        indices = array('i')
+        headings = array('B')
+        
+        # Transient slices: only used as action-cache keys
+        words = (text[start:start + length] for start, length in zip(starts, lengths))
+        for index, multiplier, is_heading in self.iter_runs(words, word_flags):
+            indices.extend([index] * multiplier)
+            headings.extend(bytes([is_heading]) * multiplier)
+        
+        return indices, headings
+    
+    def _should_duplicate(self, word: str) -> bool:
+        return bool(self.token_action(word) & ACTION_DUPLICATE)
     
     def _is_sentence_ending(self, word: str) -> bool:
-        sentence_markers = ['.', '!', '?', ':', ';', ')']
-        return any(marker in word for marker in sentence_markers)
+        return bool(self.token_action(word) & ACTION_PAUSE)
     
     def estimate_reading_time(self, word_count: int, wpm: int = 300) -> float:
         if word_count <= 0 or wpm <= 0:
@@ -128,8 +232,9 @@ class WordPreprocessor:
         return (word_count / wpm) * 60
     
     def get_statistics(self, original_words: List[str], processed_words: List[str]) -> dict:
-        duplicated_count = sum(1 for w in original_words if self._should_duplicate(w))
-        pause_count = sum(1 for w in original_words if self._is_sentence_ending(w))
+        actions = [self.token_action(w) for w in original_words]
+        duplicated_count = sum(1 for action in actions if action & ACTION_DUPLICATE)
+        pause_count = sum(1 for action in actions if action & ACTION_PAUSE)
         
         return {
             'original_count': len(original_words),
@@ -142,21 +247,31 @@ class WordPreprocessor:
     
     def preprocess_without_pauses(self, words: List[str]) -> List[str]:
         processed = []
+        extend = processed.extend
+        action_of = self.token_action
         
         for word in words:
-            processed.append(word)
-            
-            if self._should_duplicate(word):
-                processed.extend([word, word])
+            if action_of(word) & ACTION_DUPLICATE:
+                extend((word, word, word))
+            else:
+                processed.append(word)
         
         return processed
     
     def customize_duplication(self, words: List[str], duplication_map: dict) -> List[str]:
         processed = []
+        extend = processed.extend
+        
+        # Compile the map into a per-token table so each distinct word is
+        # lower-cased and looked up once
+        repeats: Dict[str, List[str]] = {}
         
         for word in words:
-            # Get custom duplication count or default to 1
-            count = duplication_map.get(word.lower(), 1)
-            processed.extend([word] * count)
+            repeated = repeats.get(word)
+            if repeated is None:
+                # Get custom duplication count or default to 1
+                repeated = [word] * duplication_map.get(word.lower(), 1)
+                repeats[word] = repeated
+            extend(repeated)
         
         return processed
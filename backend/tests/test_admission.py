@@ -0,0 +1,173 @@
+"""
+Unit Tests for Admission Control
+Tests cost estimation, token buckets, concurrency pools and load shedding
+"""
+
+import threading
+import pytest
+import config
+from app import create_app
+from services.admission import AdmissionController, ConcurrencyPool, TokenBucket
+from services.metrics import metrics
+
+
+LARGE_TEXT = 'Some long document text. ' * 8000
+
+
+def make_client(monkeypatch, **settings):
+    """Test client for an app with admission control and the given Config overrides"""
+    monkeypatch.setattr(config.Config, 'ADMISSION_ENABLED', True)
+    for name, value in settings.items():
+        monkeypatch.setattr(config.Config, name, value)
+    app = create_app()
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+class TestAdmissionController:
+    """Test suite for the admission building blocks"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        metrics.reset()
+
+    def test_estimate_cost(self):
+        """Test cost grows with the body and compressed or unknown sizes are charged more"""
+        assert AdmissionController.estimate_cost(0) == 1
+        assert AdmissionController.estimate_cost(1024 * 1024) == 1025
+        assert AdmissionController.estimate_cost(1024, compressed=True) == 6
+        assert AdmissionController.estimate_cost(None, max_length=2048) == 3
+
+    def test_token_bucket(self):
+        """Test the bucket refuses costs above its tokens and reports the wait"""
+        bucket = TokenBucket(rate=10, capacity=20)
+        now = bucket.updated
+        assert bucket.try_take(15, now) == 0
+        assert bucket.try_take(10, now) == pytest.approx(0.5)
+        assert bucket.try_take(10, now + 0.5) == 0
+        # Costs above the capacity need a full bucket only
+        assert bucket.try_take(100, now + 10) == 0
+
+    def test_new_client_bucket_is_full(self):
+        """Test a client's first request may use its whole burst"""
+        controller = AdmissionController(
+            100, ConcurrencyPool('cheap', 1, 0, 0), ConcurrencyPool('expensive', 1, 0, 0),
+            client_rate=1, client_burst=10
+        )
+        assert controller.check_rate('a', 10) == (None, 0)
+        bucket = TokenBucket(rate=1, capacity=10, now=5.0)
+        assert bucket.try_take(10, 4.0) == 0
+
+    def test_pool_sheds_beyond_queue(self):
+        """Test a full pool with a full queue refuses at once"""
+        pool = ConcurrencyPool('test', limit=1, max_queue=0, queue_timeout=5)
+        assert pool.acquire()
+        assert not pool.acquire()
+        pool.release()
+        assert pool.acquire()
+
+    def test_pool_queue_waits_for_slot(self):
+        """Test queued callers get the slot when it is released"""
+        pool = ConcurrencyPool('test', limit=1, max_queue=1, queue_timeout=5)
+        assert pool.acquire()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(pool.acquire()))
+        waiter.start()
+        while not pool.waiting:
+            pass
+        assert metrics.get('admission.test.queue_depth') == 1
+        pool.release()
+        waiter.join()
+        assert results == [True]
+
+    def test_client_and_global_buckets(self):
+        """Test per-client limits answer 429 and the global limit 503"""
+        controller = AdmissionController(
+            100, ConcurrencyPool('cheap', 1, 0, 0), ConcurrencyPool('expensive', 1, 0, 0),
+            client_rate=1, client_burst=10, global_rate=1, global_burst=15
+        )
+        assert controller.check_rate('a', 8) == (None, 0)
+        assert controller.check_rate('a', 8)[0] == 429
+        assert controller.check_rate('b', 8)[0] == 503
+        assert metrics.get('admission.shed.client_rate') == 1
+        assert metrics.get('admission.shed.global_rate') == 1
+
+
+class TestAdmissionMiddleware:
+    """Test load shedding on the API"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        metrics.reset()
+
+    def test_expensive_pool_full(self, monkeypatch):
+        """Test large documents are shed while cheap calls still run"""
+        client = make_client(monkeypatch, ADMISSION_EXPENSIVE_CONCURRENCY=0, ADMISSION_EXPENSIVE_QUEUE=0)
+        response = client.post('/api/process-text', json={'text': LARGE_TEXT})
+        response.close()
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert response.get_json()['status'] == 503
+
+        response = client.post('/api/calculate-orp', json={'word': 'reading'})
+        response.close()
+        assert response.status_code != 503
+        assert metrics.get('admission.shed.expensive') >= 1
+
+    def test_streamed_response_holds_slot(self, monkeypatch):
+        """Test the pool slot is released only when the response is closed"""
+        client = make_client(monkeypatch)
+        pool = client.application.extensions['admission'].expensive_pool
+        response = client.post('/api/process-text', json={'text': LARGE_TEXT})
+        assert pool.in_flight == 1
+        response.get_data()
+        response.close()
+        assert pool.in_flight == 0
+
+    def test_rate_limit_per_client(self, monkeypatch):
+        """Test a client over its budget gets 429 while others are served"""
+        client = make_client(monkeypatch, RATELIMIT_ENABLED=True,
+                             RATELIMIT_CLIENT_RATE=1, RATELIMIT_CLIENT_BURST=300)
+        payload = {'text': LARGE_TEXT}
+        first = client.post('/api/process-text', json=payload)
+        first.close()
+        assert first.status_code == 200
+        response = client.post('/api/process-text', json=payload)
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+
+        other = client.post('/api/process-text', json=payload, environ_base={'REMOTE_ADDR': '10.0.0.2'})
+        other.close()
+        assert other.status_code == 200
+
+    def test_bodiless_requests_are_cheap(self, monkeypatch):
+        """Test GETs without a body run in the cheap pool while large documents are shed"""
+        client = make_client(monkeypatch, ADMISSION_EXPENSIVE_CONCURRENCY=0, ADMISSION_EXPENSIVE_QUEUE=0)
+        response = client.get('/api/test')
+        response.close()
+        assert response.status_code == 200
+        assert metrics.get('admission.admitted.cheap') == 1
+
+    def test_event_streams_unpooled(self, monkeypatch):
+        """Test open job event streams don't hold concurrency slots"""
+        client = make_client(monkeypatch, ADMISSION_CHEAP_CONCURRENCY=1, ADMISSION_CHEAP_QUEUE=0)
+        job = client.post('/api/jobs', json={'text': 'Hello world.'})
+        job_id = job.get_json()['job_id']
+        job.close()
+        streams = [client.get(f'/api/jobs/{job_id}/events') for _ in range(2)]
+        pool = client.application.extensions['admission'].cheap_pool
+        assert pool.in_flight == 0
+        response = client.get(f'/api/jobs/{job_id}')
+        response.close()
+        assert response.status_code == 200
+        for stream in streams:
+            stream.close()
+
+    def test_metrics_not_shed(self, monkeypatch):
+        """Test the metrics endpoint stays reachable when pools are full"""
+        client = make_client(monkeypatch, ADMISSION_CHEAP_CONCURRENCY=0, ADMISSION_CHEAP_QUEUE=0)
+        assert client.post('/api/calculate-orp', json={'word': 'reading'}).status_code == 503
+        assert client.get('/api/metrics').status_code == 200
+
+
+# Run tests with: pytest tests/test_admission.py -v
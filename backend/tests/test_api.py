@@ -4,8 +4,15 @@ Tests API endpoints and request/response handling
 """
 
 import pytest
+import io
+import gzip
 import json
+import zlib
+from flask import jsonify
 from app import create_app
+from api.fragments import ORPFragmentCache
+from api.json_stream import StreamingJSONEncoder
+from api.compression import negotiate_encoding
 
 
 @pytest.fixture
@@ -53,6 +60,13 @@ class TestProcessTextEndpoint:
         assert 'stats' in data
         assert len(data['words']) > 0
     
+    def test_process_text_repeated_lines(self, client):
+        """Test repeated boilerplate lines are reported in the stats"""
+        text = "Company Confidential\nPage one.\nCompany Confidential\nPage two.\nCompany Confidential"
+        for detect_headings, expected in [(True, 2), (False, 0)]:
+            response = client.post('/api/process-text', json={'text': text, 'detect_headings': detect_headings})
+            assert response.get_json()['stats']['repeated_lines'] == expected
+    
     def test_process_text_missing_field(self, client):
         """Test with missing text field"""
         payload = {}
@@ -104,6 +118,230 @@ class TestProcessTextEndpoint:
         assert len(data['words']) > 100
 
 
+class TestPlainTextUploads:
+    """Test text/plain bodies and multipart .txt uploads"""
+    
+    def test_plain_text_body(self, client):
+        """Test raw text/plain body with query-string options"""
+        response = client.post(
+            '/api/process-text?detect_headings=false',
+            data='CHAPTER ONE\nH\u00e9llo world.'.encode('utf-8'),
+            content_type='text/plain; charset=utf-8'
+        )
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['words'][:4] == ['CHAPTER', 'ONE', 'H\u00e9llo', 'world.']
+        assert not any(entry['is_heading'] for entry in data['orp_data'])
+    
+    def test_txt_file_upload(self, client):
+        """Test multipart upload of a .txt file"""
+        response = client.post(
+            '/api/process-text',
+            data={'file': (io.BytesIO('Hello file.'.encode('utf-16')), 'notes.txt')},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 200
+        assert json.loads(response.data)['words'][:2] == ['Hello', 'file.']
+    
+    def test_wrong_extension_rejected(self, client):
+        """Test non-.txt uploads are rejected"""
+        response = client.post(
+            '/api/process-text',
+            data={'file': (io.BytesIO(b'%PDF'), 'book.pdf')},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 400
+    
+    def test_empty_plain_text_rejected(self, client):
+        """Test whitespace-only text/plain body is rejected"""
+        response = client.post('/api/process-text', data=b'   ', content_type='text/plain')
+        assert response.status_code == 400
+
+
+class TestStreamedResponse:
+    """Test that streamed /api/process-text bodies match jsonify()"""
+    
+    SAMPLE_TEXT = "CHAPTER ONE\nH\u00e9llo \u201cworld\u201d, wonderful.\nDone! (ok)\n" * 20
+    
+    @pytest.mark.parametrize('debug', [True, False])
+    def test_body_is_byte_compatible(self, debug):
+        """Test streamed output equals jsonify output in both modes"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['DEBUG'] = debug
+        client = app.test_client()
+        
+        response = client.post('/api/process-text', json={'text': self.SAMPLE_TEXT})
+        assert response.status_code == 200
+        assert response.mimetype == 'application/json'
+        assert response.is_streamed
+        body = response.get_data()
+        response.close()
+        
+        with app.app_context():
+            expected = jsonify(json.loads(body)).get_data()
+        assert body == expected
+
+
+class TestOffsetOutput:
+    """Test output: "offsets" (token spans into one text buffer)"""
+    
+    SAMPLE_TEXT = "CHAPTER ONE\nThe state-of-the-art reader, wonderful.\nDone! (ok)\n" * 5
+    
+    def _rebuild(self, data):
+        """Expand offsets tokens back into (word, position, is_heading) triples"""
+        text = data['text']
+        width = len(data['token_fields'])
+        rebuilt = []
+        for i in range(0, len(data['tokens']), width):
+            start, length, orp_offset, flags = data['tokens'][i:i + width]
+            if flags & 2:
+                rebuilt.append(('', 0, False))
+            else:
+                rebuilt.append((text[start:start + length], orp_offset + 1, bool(flags & 1)))
+        return rebuilt
+    
+    @pytest.mark.parametrize('detect_headings', [True, False])
+    def test_matches_default_output(self, client, detect_headings):
+        """Test offsets decode to the same words, ORP positions and stats"""
+        payload = {'text': self.SAMPLE_TEXT, 'detect_headings': detect_headings}
+        words = client.post('/api/process-text', json=payload).get_json()
+        offsets = client.post('/api/process-text', json={**payload, 'output': 'offsets'}).get_json()
+        
+        assert offsets['format'] == 'offsets'
+        assert offsets['token_fields'] == ['start', 'length', 'orp_offset', 'flags']
+        assert offsets['stats'] == words['stats']
+        assert self._rebuild(offsets) == [
+            (entry['word'], entry['position'], entry['is_heading'])
+            for entry in words['orp_data']
+        ]
+    
+    def test_output_query_parameter(self, client):
+        """Test output can be chosen with a query parameter"""
+        response = client.post('/api/process-text?output=offsets',
+                               data='Hello world.', content_type='text/plain')
+        assert response.status_code == 200
+        assert response.get_json()['format'] == 'offsets'
+    
+    def test_invalid_output(self, client):
+        """Test unknown output formats are rejected"""
+        response = client.post('/api/process-text', json={'text': 'Hello', 'output': 'xml'})
+        assert response.status_code == 400
+
+
+class TestORPFragmentCache:
+    """Test pre-serialized orp_data fragments"""
+    
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.cache = ORPFragmentCache(StreamingJSONEncoder(sort_keys=True, separators=(',', ':')))
+    
+    def test_fragment_matches_entry(self):
+        """Test fragment decodes to the orp_data entry"""
+        entry = json.loads(self.cache.get('reading', True))
+        assert entry == {
+            'word': 'reading', 'before': 're', 'orp': 'a', 'after': 'ding',
+            'position': 3, 'is_heading': True
+        }
+    
+    def test_fragments_are_reused(self):
+        """Test repeated words share one fragment per heading flag"""
+        assert self.cache.get('hello') is self.cache.get('hello')
+        assert self.cache.get('hello', True) != self.cache.get('hello')
+        assert self.cache.unique_entries == 2
+    
+    def test_blank_pause_is_shared(self):
+        """Test blank pauses use one constant fragment"""
+        assert self.cache.get(' ') is self.cache.get(' ', True)
+        assert json.loads(self.cache.get(' '))['position'] == 0
+
+
+class TestResponseCompression:
+    """Test size-aware response compression"""
+    
+    def test_negotiate_encoding(self):
+        """Test Accept-Encoding negotiation with q-values"""
+        assert negotiate_encoding('gzip, deflate', ['br', 'gzip']) == 'gzip'
+        assert negotiate_encoding('br;q=1.0, gzip;q=0.5', ['br', 'gzip']) == 'br'
+        assert negotiate_encoding('br', ['gzip']) is None
+        assert negotiate_encoding('gzip;q=0', ['gzip']) is None
+        assert negotiate_encoding('*', ['gzip']) == 'gzip'
+        assert negotiate_encoding('', ['gzip']) is None
+    
+    def test_large_response_is_gzipped(self, client):
+        """Test streamed responses above the threshold are compressed"""
+        payload = {'text': 'Hello wonderful world. ' * 500}
+        # Streamed bodies are read right away so their contexts unwind in order
+        plain = client.post('/api/process-text', json=payload).data
+        compressed = client.post('/api/process-text', json=payload,
+                                 headers={'Accept-Encoding': 'gzip'})
+        body = compressed.data
+        
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in compressed.headers['Vary']
+        assert gzip.decompress(body) == plain
+        assert len(body) < len(plain) / 10
+    
+    def test_small_response_not_compressed(self, client):
+        """Test responses below the threshold are sent as-is"""
+        client.application.config['COMPRESSION_MIN_SIZE'] = 1_000_000
+        response = client.post('/api/process-text', json={'text': 'Hi'},
+                               headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+        assert json.loads(response.data)['success'] is True
+    
+    def test_routes_without_opt_in_not_compressed(self, client):
+        """Test only @compressible routes are compressed"""
+        client.application.config['COMPRESSION_MIN_SIZE'] = 0
+        response = client.post('/api/calculate-orp', json={'word': 'reading'},
+                               headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+    
+
+
+class TestCompressedRequests:
+    """Test gzip/deflate request bodies"""
+    
+    def post_encoded(self, client, body: bytes, encoding: str):
+        return client.post(
+            '/api/process-text',
+            data=body,
+            headers={'Content-Encoding': encoding, 'Content-Type': 'application/json'}
+        )
+    
+    def test_gzip_body(self, client):
+        """Test gzip-compressed JSON is accepted"""
+        body = gzip.compress(json.dumps({'text': 'Hello world. ' * 100}).encode())
+        response = self.post_encoded(client, body, 'gzip')
+        assert response.status_code == 200
+        assert len(json.loads(response.data)['words']) > 100
+    
+    def test_deflate_body(self, client):
+        """Test zlib-deflated JSON is accepted"""
+        body = zlib.compress(json.dumps({'text': 'Hello world.'}).encode())
+        response = self.post_encoded(client, body, 'deflate')
+        assert response.status_code == 200
+        assert json.loads(response.data)['success'] is True
+    
+    def test_decompression_bomb_rejected(self, client):
+        """Test inflating past the cap returns 413"""
+        client.application.wsgi_app.max_size = 64 * 1024
+        body = gzip.compress(b'{"text": "' + b'a' * (10 * 1024 * 1024) + b'"}')
+        response = self.post_encoded(client, body, 'gzip')
+        assert response.status_code == 413
+    
+    def test_malformed_body_rejected(self, client):
+        """Test corrupt compressed data returns 400"""
+        response = self.post_encoded(client, b'not gzip at all', 'gzip')
+        assert response.status_code == 400
+    
+    def test_unsupported_encoding_rejected(self, client):
+        """Test unknown content codings return 415"""
+        response = self.post_encoded(client, b'{}', 'compress')
+        assert response.status_code == 415
+        assert json.loads(response.data)['status'] == 415
+
+
 class TestCalculateORPEndpoint:
     """Test ORP calculation endpoint"""
     
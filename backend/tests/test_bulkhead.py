@@ -0,0 +1,176 @@
+"""
+Unit Tests for Bulkheads
+Tests bounded executors and the isolation of extraction from text processing
+"""
+
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import config
+from app import create_app
+from services.bulkhead import Bulkhead, BulkheadFullError, BulkheadTimeoutError
+from services.content_extractor import ContentExtractor
+from services.metrics import metrics
+
+
+SLOW_RESPONSE_SECONDS = 1.0
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Answers every GET after SLOW_RESPONSE_SECONDS"""
+
+    def do_GET(self):
+        time.sleep(SLOW_RESPONSE_SECONDS)
+        body = b'Slow article body.'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def slow_server():
+    """Local HTTP server standing in for a slow remote site"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/article'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client (shared across threads) with one extraction thread and a fetching extractor"""
+    def fetch(self, url):
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return {'text': response.read().decode('utf-8'), 'title': '', 'metadata': {'url': url}}
+
+    monkeypatch.setattr(ContentExtractor, 'extract_from_url', fetch)
+    monkeypatch.setattr(config.Config, 'EXTRACTION_WORKERS', 1)
+    monkeypatch.setattr(config.Config, 'EXTRACTION_QUEUE', 1)
+    app = create_app()
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+def post(client, url, payload):
+    """POST and close the response (admission slots are held until close)"""
+    response = client.post(url, json=payload)
+    response.get_data()
+    response.close()
+    return response
+
+
+class TestBulkhead:
+    """Test suite for Bulkhead"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        metrics.reset()
+
+    def test_run_returns_result(self):
+        """Test results and exceptions come back to the caller"""
+        bulkhead = Bulkhead('test', workers=1, max_queue=0, timeout=5)
+        assert bulkhead.run(sum, [1, 2, 3]) == 6
+        with pytest.raises(ZeroDivisionError):
+            bulkhead.run(lambda: 1 / 0)
+        assert metrics.get('bulkhead.test.submitted') == 2
+        assert metrics.get('bulkhead.test.failures') == 1
+
+    def test_rejects_beyond_queue(self):
+        """Test submissions beyond workers + queue fail at once"""
+        release = threading.Event()
+        bulkhead = Bulkhead('test', workers=1, max_queue=1, timeout=5)
+        running = bulkhead.submit(release.wait, 5)
+        queued = bulkhead.submit(release.wait, 5)
+        with pytest.raises(BulkheadFullError):
+            bulkhead.submit(release.wait, 5)
+        assert metrics.get('bulkhead.test.rejected') == 1
+        release.set()
+        assert running.result() and queued.result()
+        assert bulkhead.pending == 0
+
+    def test_timeout_keeps_slot_until_done(self):
+        """Test a timed-out task still counts against the bulkhead while it runs"""
+        release = threading.Event()
+        bulkhead = Bulkhead('test', workers=1, max_queue=0, timeout=0.05)
+        with pytest.raises(BulkheadTimeoutError):
+            bulkhead.run(release.wait, 5)
+        assert metrics.get('bulkhead.test.timeouts') == 1
+        with pytest.raises(BulkheadFullError):
+            bulkhead.submit(release.wait, 5)
+        release.set()
+        deadline = time.monotonic() + 5
+        while bulkhead.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert bulkhead.run(len, 'ok') == 2
+
+    def test_queued_timeouts_release_slots(self):
+        """Test tasks dropped from the queue on timeout give their slots back"""
+        release = threading.Event()
+        bulkhead = Bulkhead('test', workers=1, max_queue=2, timeout=0.2)
+        running = bulkhead.submit(release.wait, 5)
+        waiters = [threading.Thread(target=self.run_expecting_timeout, args=(bulkhead, release))
+                   for _ in range(2)]
+        for waiter in waiters:
+            waiter.start()
+        for waiter in waiters:
+            waiter.join()
+        assert metrics.get('bulkhead.test.timeouts') == 2
+        release.set()
+        running.result()
+        assert bulkhead.pending == 0
+        assert bulkhead.run(len, 'ok') == 2
+
+    @staticmethod
+    def run_expecting_timeout(bulkhead, release):
+        with pytest.raises(BulkheadTimeoutError):
+            bulkhead.run(release.wait, 5)
+
+
+class TestIsolation:
+    """Test slow extraction doesn't slow down text processing"""
+
+    def test_slow_extraction_isolated(self, client, slow_server):
+        """Test processing stays fast and excess extraction is refused while a site is slow"""
+        extractions = [threading.Thread(target=post, args=(client, '/api/extract-url', {'url': slow_server}))
+                       for _ in range(2)]
+        for thread in extractions:
+            thread.start()
+        bulkhead = client.application.extensions['bulkheads']['extraction']
+        deadline = time.monotonic() + 5
+        while bulkhead.pending < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        started = time.monotonic()
+        response = post(client, '/api/extract-url', {'url': slow_server})
+        assert response.status_code == 503
+        assert response.headers['Retry-After']
+        for _ in range(5):
+            assert post(client, '/api/process-text', {'text': 'Hello world. Still fast.'}).status_code == 200
+        assert time.monotonic() - started < SLOW_RESPONSE_SECONDS / 2
+
+        for thread in extractions:
+            thread.join()
+        response = client.post('/api/extract-url', json={'url': slow_server})
+        assert response.get_json()['text'] == 'Slow article body.'
+        response.close()
+
+    def test_extraction_timeout(self, client, slow_server):
+        """Test extraction slower than the bulkhead timeout answers 504"""
+        client.application.extensions['bulkheads']['extraction'].timeout = 0.05
+        response = post(client, '/api/extract-url', {'url': slow_server})
+        assert response.status_code == 504
+
+    def test_invalid_url(self, client):
+        """Test malformed URLs are rejected before any extraction"""
+        assert post(client, '/api/extract-url', {'url': 'not a url'}).status_code == 400
+
+
+# Run tests with: pytest tests/test_bulkhead.py -v
@@ -0,0 +1,164 @@
+"""
+Unit Tests for Cooperative Cancellation
+Tests cancellation tokens, the checks in the pipeline and request deadlines/disconnects
+"""
+
+import json
+import socket
+import threading
+import time
+import pytest
+import config
+from werkzeug.serving import make_server
+from app import create_app
+from services.cancellation import (
+    CHECK_INTERVAL, CancellationToken, OperationCancelled, socket_disconnect_probe
+)
+from services.metrics import metrics
+from services.text_processor import NORMALIZE_CHECK_CHARS, TextProcessor
+from services.word_preprocessor import WordPreprocessor
+
+
+LARGE_TEXT = 'Chapter ONE\nThe quick brown fox, jumps over the lazy dog. Another one! ' * 14000
+
+
+def cancelled_token():
+    token = CancellationToken()
+    token.cancel()
+    return token
+
+
+class TestCancellationToken:
+    """Test suite for CancellationToken"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        metrics.reset()
+
+    def test_deadline(self):
+        """Test check() raises once the deadline has passed and counts it once"""
+        token = CancellationToken.with_timeout(30)
+        token.check()
+        token.deadline = time.monotonic() - 1
+        for _ in range(2):
+            with pytest.raises(OperationCancelled) as error:
+                token.check()
+        assert error.value.reason == 'deadline'
+        assert metrics.get('cancellation.deadline') == 1
+
+    def test_no_deadline(self):
+        """Test a zero timeout never expires"""
+        assert CancellationToken.with_timeout(0).deadline is None
+
+    def test_disconnect_probe(self):
+        """Test the socket probe notices a closed peer"""
+        server_side, client_side = socket.socketpair()
+        try:
+            token = CancellationToken(is_disconnected=socket_disconnect_probe(server_side))
+            assert not token.cancelled
+            client_side.close()
+            token._next_poll = 0
+            assert token.cancelled
+            assert token.reason == 'disconnect'
+            assert metrics.get('cancellation.disconnect') == 1
+        finally:
+            server_side.close()
+
+    def test_without_deadline(self):
+        """Test the streaming token keeps the disconnect probe only"""
+        token = CancellationToken(time.monotonic() - 1, lambda: False)
+        streaming = token.without_deadline()
+        assert streaming.deadline is None
+        assert not streaming.cancelled
+
+
+class TestPipelineChecks:
+    """Test the processing stages stop on a cancelled token"""
+
+    def test_text_processor(self):
+        """Test normalization, tokenization and line analysis check the token"""
+        processor = TextProcessor(cancelled_token())
+        assert len(LARGE_TEXT) >= NORMALIZE_CHECK_CHARS
+        with pytest.raises(OperationCancelled):
+            processor.normalize(LARGE_TEXT)
+        with pytest.raises(OperationCancelled):
+            processor.split_word_spans(LARGE_TEXT)
+        with pytest.raises(OperationCancelled):
+            processor.word_metadata_flags(LARGE_TEXT, 10)
+        # Short texts (e.g. single lines) skip the checks in normalize()
+        assert processor.normalize('Hello world.') == 'Hello world.'
+
+    def test_preprocessor_stops_within_interval(self):
+        """Test iter_runs stops at most CHECK_INTERVAL words after cancel()"""
+        token = CancellationToken()
+        preprocessor = WordPreprocessor(cancel=token)
+        words = ['word'] * (CHECK_INTERVAL * 4)
+        consumed = 0
+        with pytest.raises(OperationCancelled):
+            for index, _, _ in preprocessor.iter_runs(words):
+                consumed = index
+                if index == 10:
+                    token.cancel()
+        assert 10 <= consumed < 10 + CHECK_INTERVAL
+
+    def test_no_token(self):
+        """Test processing without a token is unchanged"""
+        assert TextProcessor().split_word_spans('Hello world')[1].tolist() == [5, 5]
+
+
+class TestRequestCancellation:
+    """Test request deadlines and client disconnects on the API"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        metrics.reset()
+
+    def make_app(self, monkeypatch, **settings):
+        for name, value in settings.items():
+            monkeypatch.setattr(config.Config, name, value)
+        app = create_app()
+        app.config['TESTING'] = True
+        return app
+
+    def test_deadline_exceeded(self, monkeypatch):
+        """Test a request over its deadline answers 504 and is counted"""
+        client = self.make_app(monkeypatch, REQUEST_DEADLINE=1e-9).test_client()
+        for output in ('words', 'offsets'):
+            response = client.post('/api/process-text', json={'text': LARGE_TEXT, 'output': output})
+            response.close()
+            assert response.status_code == 504
+        assert metrics.get('cancellation.deadline') == 2
+
+    def test_deadline_not_reached(self, monkeypatch):
+        """Test requests within the deadline are served normally"""
+        client = self.make_app(monkeypatch, REQUEST_DEADLINE=30).test_client()
+        response = client.post('/api/process-text', json={'text': 'Hello world.'})
+        assert response.get_json()['success'] is True
+        response.close()
+
+    def test_client_disconnect(self, monkeypatch):
+        """Test processing stops when the client closes the connection"""
+        app = self.make_app(monkeypatch, RESULT_CACHE_ENABLED=False, STAGE_CACHE_ENABLED=False)
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            body = json.dumps({'text': LARGE_TEXT + 'Unique disconnect test.'}).encode('utf-8')
+            with socket.create_connection(('127.0.0.1', server.server_port)) as connection:
+                connection.sendall(
+                    b'POST /api/process-text HTTP/1.1\r\nHost: localhost\r\n'
+                    b'Content-Type: application/json\r\n'
+                    + f'Content-Length: {len(body)}\r\n\r\n'.encode('ascii') + body
+                )
+                # Give the server time to read the body, then hang up
+                time.sleep(0.05)
+            deadline = time.monotonic() + 5
+            while not metrics.get('cancellation.disconnect') and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert metrics.get('cancellation.disconnect') == 1
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+# Run tests with: pytest tests/test_cancellation.py -v
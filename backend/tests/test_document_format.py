@@ -0,0 +1,106 @@
+"""
+Unit Tests for the Binary Document Format
+Tests writing, mmap reading and word-range access
+"""
+
+import pytest
+from app import create_app
+from services.document_format import (
+    HEADER, DocumentFormatError, encode_document, read_document, write_document
+)
+from services.processed_document import ProcessedDocument
+
+
+SAMPLE_TEXT = (
+    "CHAPTER ONE\n"
+    "The state-of-the-art reader, wonderful. Café “quotes” here!\n"
+    "Done; (ok) extraordinarily long words slow readers.\n"
+) * 3
+
+# Dash-wrapped and double-dashed words split into empty tokens
+EMPTY_TOKEN_TEXT = "Wait -x- then a--b--c more words here."
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+class TestDocumentFormat:
+    """Test suite for the document file writer and reader"""
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        """Document file written from SAMPLE_TEXT"""
+        path = str(tmp_path / 'doc.srpd')
+        write_document(ProcessedDocument.from_text(SAMPLE_TEXT), path)
+        return path
+
+    @pytest.mark.parametrize('text', [SAMPLE_TEXT, EMPTY_TOKEN_TEXT])
+    @pytest.mark.parametrize('detect_headings', [True, False])
+    def test_round_trip_matches_api(self, client, tmp_path, detect_headings, text):
+        """Test a written document reads back as the /api/process-text JSON"""
+        data = client.post('/api/process-text', json={
+            'text': text, 'detect_headings': detect_headings
+        }).get_json()
+        path = str(tmp_path / 'doc.srpd')
+        write_document(ProcessedDocument.from_text(text, detect_headings), path)
+
+        with read_document(path) as document:
+            assert document.words() == data['words']
+            assert document.orp_data() == data['orp_data']
+            assert document.original_count == data['stats']['original_count']
+            assert len(document) == data['stats']['processed_count']
+            assert document.repeated_lines == data['stats']['repeated_lines']
+
+    def test_word_ranges(self, path):
+        """Test arbitrary ranges equal slices of the full lists"""
+        with read_document(path) as document:
+            words = document.words()
+            orp_data = document.orp_data()
+            for start, stop in [(0, 1), (1, 4), (5, 37), (len(words) - 3, len(words) + 10), (7, 7)]:
+                assert document.words(start, stop) == words[start:stop]
+                assert document.orp_data(start, stop) == orp_data[start:stop]
+
+    def test_to_document(self, path):
+        """Test loading the file back gives an equal ProcessedDocument"""
+        original = ProcessedDocument.from_text(SAMPLE_TEXT)
+        with read_document(path) as document:
+            loaded = document.to_document()
+        assert loaded.strings == original.strings
+        assert list(loaded.iter_tokens()) == list(original.iter_tokens())
+        assert loaded.original_count == original.original_count
+        assert loaded.repeated_lines == original.repeated_lines == 6
+
+    def test_sentence_and_heading_indexes(self, path):
+        """Test indexes point at sentence and heading starts"""
+        with read_document(path) as document:
+            sentences = [document.record(index)[0] for index in document.sentence_starts]
+            headings = [document.record(index)[0] for index in document.heading_starts]
+        assert sentences[:4] == ['CHAPTER', 'The', 'Café', 'Done;']
+        assert headings == ['CHAPTER'] * 3
+
+    def test_rejects_bad_magic(self, tmp_path):
+        """Test non-document files are rejected"""
+        path = tmp_path / 'bad.srpd'
+        path.write_bytes(b'XXXX' + bytes(HEADER.size))
+        with pytest.raises(DocumentFormatError):
+            read_document(str(path))
+
+    def test_rejects_truncated_file(self, tmp_path):
+        """Test truncated files are rejected"""
+        data = encode_document(ProcessedDocument.from_text(SAMPLE_TEXT))
+        path = tmp_path / 'short.srpd'
+        path.write_bytes(data[:len(data) // 2])
+        with pytest.raises(DocumentFormatError):
+            read_document(str(path))
+        path.write_bytes(b'')
+        with pytest.raises(DocumentFormatError):
+            read_document(str(path))
+
+
+# Run tests with: pytest tests/test_document_format.py -v
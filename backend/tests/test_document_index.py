@@ -0,0 +1,105 @@
+"""
+Unit Tests for the Document Index
+Tests sentence, paragraph and heading offsets of processed documents
+"""
+
+import pytest
+from app import create_app
+from services.document_index import DocumentIndex, document_word_offsets, stream_word_offsets
+from services.processed_document import ProcessedDocument
+from services.text_processor import TextProcessor
+from services.word_preprocessor import WordPreprocessor
+
+
+DOCUMENT = (
+    "INTRODUCTION\nOVERVIEW\nThe state-of-the-art reader, wonderful. It works well.\n"
+    "this line is wrapped\nin the middle. Done!\n\nNext paragraph here.\nMETHODS\nshort line."
+)
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def words_at(words, offsets):
+    return [words[offset] for offset in offsets]
+
+
+class TestDocumentIndex:
+    """Test suite for DocumentIndex"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.processor = TextProcessor()
+        self.document = ProcessedDocument.from_text(DOCUMENT, True, self.processor)
+        self.words = list(self.document.iter_words())
+
+    def build(self, detect_headings=True):
+        return DocumentIndex.build(*document_word_offsets(self.document),
+                                   self.processor.iter_lines(DOCUMENT), detect_headings)
+
+    def test_word_offsets(self):
+        """Test word offsets point at each original word's first display"""
+        word_offsets, _ = document_word_offsets(self.document)
+        original = self.processor.split_words(self.processor.normalize(DOCUMENT))
+        assert len(word_offsets) == len(original)
+        assert words_at(self.words, word_offsets) == original
+
+    def test_sentences(self):
+        """Test sentences start at the first word and after every pause run"""
+        index = self.build()
+        assert words_at(self.words, index.sentences) == [
+            'INTRODUCTION', 'The', 'It', 'this', 'Done!', 'Next', 'METHODS', 'short'
+        ]
+
+    def test_paragraphs_and_headings(self):
+        """Test blank lines, sentence-ending lines and headings start paragraphs"""
+        index = self.build()
+        assert words_at(self.words, index.headings) == ['INTRODUCTION', 'OVERVIEW', 'METHODS']
+        assert words_at(self.words, index.paragraphs) == [
+            'INTRODUCTION', 'OVERVIEW', 'The', 'this', 'Next', 'METHODS', 'short'
+        ]
+
+    def test_without_headings(self):
+        """Test heading lines are plain lines when detection is off"""
+        self.document = ProcessedDocument.from_text(DOCUMENT, False, self.processor)
+        self.words = list(self.document.iter_words())
+        index = self.build(detect_headings=False)
+        assert index.headings.tolist() == []
+        assert words_at(self.words, index.paragraphs) == ['INTRODUCTION', 'this', 'Next', 'METHODS']
+
+    def test_stream_matches_document(self):
+        """Test the per-display stream gives the same offsets as the document"""
+        normalized = self.processor.normalize(DOCUMENT)
+        starts, lengths = self.processor.split_word_spans(normalized)
+        flags = self.processor.word_metadata_flags(DOCUMENT, len(starts))
+        indices, _ = WordPreprocessor().preprocess_spans(normalized, starts, lengths, flags)
+        assert stream_word_offsets(indices) == document_word_offsets(self.document)
+
+
+class TestIndexEndpoint:
+    """Test include_index on /api/process-text"""
+
+    def test_index_in_response(self, client):
+        """Test both outputs carry the same index, and only when asked"""
+        bodies = {}
+        for output in ('words', 'offsets'):
+            response = client.post('/api/process-text',
+                                   json={'text': DOCUMENT, 'output': output, 'include_index': True})
+            bodies[output] = response.get_json()
+            response.close()
+        index = bodies['words']['index']
+        assert bodies['offsets']['index'] == index
+        assert words_at(bodies['words']['words'], index['headings']) == ['INTRODUCTION', 'OVERVIEW', 'METHODS']
+
+        response = client.post('/api/process-text', json={'text': DOCUMENT})
+        assert 'index' not in response.get_json()
+        response.close()
+
+
+# Run tests with: pytest tests/test_document_index.py -v
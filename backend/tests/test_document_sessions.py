@@ -0,0 +1,163 @@
+"""
+Unit Tests for the Table of Contents and Document Sessions
+Tests heading levels, TOC entries, session windows and the /api/sessions endpoints
+"""
+
+import pytest
+import config
+from app import create_app
+from services.document_index import DocumentIndex, document_word_offsets, heading_level
+from services.document_sessions import DocumentSession
+from services.position_map import PositionMap
+from services.processed_document import ProcessedDocument
+from services.search_index import SearchIndex
+from services.text_processor import TextProcessor
+
+
+BOOK = (
+    "CHAPTER ONE\nIt was a dark and stormy night. The rain fell in torrents.\n\n"
+    "1.1 THE STORM\nExcept at occasional intervals, when it was checked.\n\n"
+    "CHAPTER TWO\nThe morning came. Everything was quiet again.\n"
+)
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app = create_app()
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+def build_session(text=BOOK):
+    processor = TextProcessor()
+    document = ProcessedDocument.from_text(text, True, processor)
+    word_offsets, sentence_words = document_word_offsets(document)
+    index = DocumentIndex.build(word_offsets, sentence_words, processor.iter_lines(text))
+    return DocumentSession(document, index, PositionMap(word_offsets), SearchIndex.build(document, processor))
+
+
+class TestTableOfContents:
+    """Test suite for TOC entries"""
+
+    def test_heading_level(self):
+        """Test numbered, major and other headings get their levels"""
+        assert heading_level('3 Results') == 1
+        assert heading_level('3.2 Results') == 2
+        assert heading_level('3.2.1. Details') == 3
+        assert heading_level('Chapter 7') == 1
+        assert heading_level('OVERVIEW') == 1
+        assert heading_level('Some Title') == 2
+
+    def test_toc_entries(self):
+        """Test each heading line is listed with its word index and offset"""
+        session = build_session()
+        words = list(session.document.iter_words())
+        toc = session.index.toc_list()
+        assert [(entry['title'], entry['level']) for entry in toc] == [
+            ('CHAPTER ONE', 1), ('1.1 THE STORM', 2), ('CHAPTER TWO', 1)
+        ]
+        original = TextProcessor().split_words(TextProcessor().normalize(BOOK))
+        assert [words[entry['offset']] for entry in toc] == ['CHAPTER', '1.', 'CHAPTER']
+        assert [original[entry['word_index']] for entry in toc] == ['CHAPTER', '1.', 'CHAPTER']
+
+    def test_chapter_end(self):
+        """Test a chapter ends at the next entry of its level or above"""
+        session = build_session()
+        index = session.index
+        assert index.chapter_end(0, len(session)) == index.toc[2][3]
+        assert index.chapter_end(1, len(session)) == index.toc[2][3]
+        assert index.chapter_end(2, len(session)) == len(session)
+
+
+class TestDocumentSession:
+    """Test suite for session windows"""
+
+    def test_window_matches_slice(self):
+        """Test every window equals the same slice of the full stream, runs cut included"""
+        session = build_session()
+        words = list(session.document.iter_words())
+        orp = list(session.document.iter_orp_data())
+        total = len(session)
+        for start in range(total):
+            for stop in (start + 1, start + 7, total):
+                window = session.window(start, stop)
+                assert list(window.iter_words()) == words[start:stop]
+                assert list(window.iter_orp_data()) == orp[start:stop]
+
+    def test_empty_window(self):
+        """Test windows past the end are empty"""
+        session = build_session()
+        assert len(session.window(len(session), len(session) + 10)) == 0
+
+
+class TestSessionEndpoints:
+    """Test the /api/sessions endpoints"""
+
+    def create_session(self, client):
+        response = client.post('/api/process-text', json={'text': BOOK, 'session': True, 'include_toc': True})
+        body = response.get_json()
+        response.close()
+        return body
+
+    def test_toc_and_chapter(self, client):
+        """Test a chapter window is the matching slice of the full response"""
+        body = self.create_session(client)
+        session_id = body['session_id']
+        response = client.get(f'/api/sessions/{session_id}/toc')
+        toc = response.get_json()
+        assert toc['toc'] == body['toc']
+        assert toc['total'] == len(body['words'])
+
+        response = client.get(f'/api/sessions/{session_id}/window?chapter=1')
+        window = response.get_json()
+        response.close()
+        start, end = body['toc'][1]['offset'], body['toc'][2]['offset']
+        assert (window['start'], window['end']) == (start, end)
+        assert window['words'] == body['words'][start:end]
+        assert window['orp_data'] == body['orp_data'][start:end]
+
+    def test_window_by_offset(self, client):
+        """Test start/count windows and their limits"""
+        body = self.create_session(client)
+        url = f"/api/sessions/{body['session_id']}/window"
+        response = client.get(f'{url}?start=3&count=5')
+        window = response.get_json()
+        response.close()
+        assert window['words'] == body['words'][3:8]
+
+        response = client.get(f'{url}?start=3&count=0')
+        assert response.status_code == 400
+        response = client.get(f'{url}?chapter=9')
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize('query', ['count=%C2%B2', 'start=%E2%91%A0', 'start=x', 'count=1.5'])
+    def test_malformed_integer(self, client, query):
+        """Test malformed integer parameters answer 400"""
+        body = self.create_session(client)
+        response = client.get(f"/api/sessions/{body['session_id']}/window?{query}")
+        assert response.status_code == 400
+        assert 'must be an integer' in response.get_json()['message']
+        response.close()
+
+    def test_unknown_session(self, client):
+        """Test unknown ids answer 404"""
+        response = client.get('/api/sessions/missing/window')
+        assert response.status_code == 404
+        assert response.get_json()['error'] == 'Unknown session'
+
+    def test_offsets_output_rejected(self, client):
+        """Test sessions need the words output"""
+        response = client.post('/api/process-text', json={'text': BOOK, 'session': True, 'output': 'offsets'})
+        assert response.status_code == 400
+
+    def test_disabled(self, monkeypatch):
+        """Test sessions answer 404 when disabled"""
+        monkeypatch.setattr(config.Config, 'DOCUMENT_SESSIONS_ENABLED', False)
+        app = create_app()
+        app.config['TESTING'] = True
+        response = app.test_client().post('/api/process-text', json={'text': BOOK, 'session': True})
+        assert response.status_code == 404
+
+
+# Run tests with: pytest tests/test_document_sessions.py -v
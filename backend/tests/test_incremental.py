@@ -0,0 +1,131 @@
+"""
+Unit Tests for Incremental Reprocessing
+Tests paragraph segment reuse, heading merging across paragraphs and edits
+"""
+
+import random
+import pytest
+from app import create_app
+from services.incremental import IncrementalProcessor, apply_edits, split_paragraphs
+from services.processed_document import ProcessedDocument
+from services.word_preprocessor import WordPreprocessor
+
+
+DOCUMENT = (
+    "INTRODUCTION\n\nThe state-of-the-art reader, wonderful.\n\n"
+    "METHODS\n\nAND RESULTS\n\nDone! (ok) The end."
+)
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def post_json(client, url, payload):
+    response = client.post(url, json=payload)
+    body = response.get_json()
+    response.close()
+    return response.status_code, body
+
+
+class TestIncrementalProcessor:
+    """Test suite for IncrementalProcessor"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.incremental = IncrementalProcessor(16 * 1024 * 1024, 16 * 1024 * 1024)
+
+    def assert_matches_full(self, text, detect_headings=True, preprocessor=None):
+        _, document, _ = self.incremental.process(text, detect_headings, preprocessor=preprocessor)
+        expected = ProcessedDocument.from_text(text, detect_headings, preprocessor=preprocessor)
+        assert list(document.iter_orp_data()) == list(expected.iter_orp_data())
+        assert document.original_count == expected.original_count
+
+    def test_split_paragraphs(self):
+        """Test paragraphs split on blank lines"""
+        assert split_paragraphs("One\ntwo\n\n \nThree\n\n") == ["One\ntwo", "Three"]
+
+    def test_heading_across_paragraphs(self):
+        """Test consecutive heading paragraphs keep one pause run around them"""
+        self.assert_matches_full(DOCUMENT)
+        self.assert_matches_full(DOCUMENT, detect_headings=False)
+
+    def test_matches_full_processing(self):
+        """Test merged segments equal processing the whole text at once"""
+        rng = random.Random(7)
+        vocabulary = ['Hello', 'world.', 'CHAPTER', 'ONE', 'state-of-the-art', 'end!', '...', 'ok,', 'x', '.']
+        for _ in range(200):
+            lines = [
+                ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 5)))
+                if rng.random() < 0.7 else ''
+                for _ in range(rng.randint(1, 10))
+            ]
+            self.assert_matches_full('\n'.join(lines), rng.random() < 0.8,
+                                     WordPreprocessor(pause_count=rng.randint(1, 5)))
+
+    def test_only_changed_paragraphs_reprocessed(self):
+        """Test an edit reuses every untouched paragraph"""
+        _, _, segments = self.incremental.process(DOCUMENT)
+        assert segments == {'total': 5, 'reused': 0}
+        edited = DOCUMENT.replace('wonderful', 'marvellous')
+        _, _, segments = self.incremental.process(edited)
+        assert segments == {'total': 5, 'reused': 4}
+
+    def test_apply_edits(self):
+        """Test edits apply in order against the previous result"""
+        edits = [{'start': 0, 'end': 5, 'text': 'Howdy'}, {'start': 5, 'text': ','}]
+        assert apply_edits('Hello world', edits) == 'Howdy, world'
+        with pytest.raises(ValueError):
+            apply_edits('Hello', [{'start': 3, 'end': 10, 'text': ''}])
+        with pytest.raises(ValueError):
+            apply_edits('Hello', [{'start': '0', 'end': 1}])
+
+
+class TestIncrementalEndpoint:
+    """Test /api/process-text/incremental"""
+
+    def test_same_output_as_process_text(self, client):
+        """Test the response matches /api/process-text for the same text"""
+        _, full = post_json(client, '/api/process-text', {'text': DOCUMENT})
+        status, body = post_json(client, '/api/process-text/incremental', {'text': DOCUMENT})
+        assert status == 200
+        assert body['words'] == full['words']
+        assert body['orp_data'] == full['orp_data']
+        assert body['stats'] == full['stats']
+        assert body['document_id']
+
+    def test_edit_by_document_id(self, client):
+        """Test edits against a document id give the edited text's output"""
+        _, first = post_json(client, '/api/process-text/incremental', {'text': DOCUMENT})
+        start = DOCUMENT.index('wonderful')
+        edits = [{'start': start, 'end': start + len('wonderful'), 'text': 'marvellous'}]
+        status, body = post_json(client, '/api/process-text/incremental',
+                                 {'document_id': first['document_id'], 'edits': edits})
+        assert status == 200
+        assert 'marvellous.' in body['words']
+        assert body['segments']['reused'] == body['segments']['total'] - 1
+
+        _, full = post_json(client, '/api/process-text', {'text': DOCUMENT.replace('wonderful', 'marvellous')})
+        assert body['orp_data'] == full['orp_data']
+
+    def test_unknown_document(self, client):
+        """Test unknown document ids ask for the full text"""
+        status, body = post_json(client, '/api/process-text/incremental',
+                                 {'document_id': 'missing', 'edits': []})
+        assert status == 404
+        assert body['error'] == 'Unknown document'
+
+    def test_invalid_edits(self, client):
+        """Test malformed edits are rejected"""
+        _, first = post_json(client, '/api/process-text/incremental', {'text': 'Hello world.'})
+        status, _ = post_json(client, '/api/process-text/incremental',
+                              {'document_id': first['document_id'], 'edits': [{'start': 50, 'end': 60}]})
+        assert status == 400
+
+
+# Run tests with: pytest tests/test_incremental.py -v
@@ -0,0 +1,187 @@
+"""
+Unit Tests for Background Jobs
+Tests the priority job queue, cancellation, expiry and the /api/jobs endpoints
+"""
+
+import threading
+import time
+import pytest
+from app import create_app
+from services import jobs as jobs_module
+from services.jobs import JOB_CANCELLED, JOB_DONE, JOB_QUEUED, Job, JobQueue, QueueFullError
+from services.processed_document import ProcessedDocument
+
+
+DOCUMENT = (
+    "INTRODUCTION\nOVERVIEW\nThe state-of-the-art reader, wonderful.\n"
+    "Done! (ok) The end.\nMETHODS\nShort line.\n" * 5
+)
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def wait_finished(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job.status
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    """Block chunk processing until the returned event is set; records chunk texts"""
+    release = threading.Event()
+    chunks = []
+    original = ProcessedDocument.from_text.__func__
+
+    def gated_from_text(cls, text, *args, **kwargs):
+        chunks.append(text)
+        release.wait(5)
+        return original(cls, text, *args, **kwargs)
+
+    monkeypatch.setattr(jobs_module.ProcessedDocument, 'from_text', classmethod(gated_from_text))
+    release.chunks = chunks
+    yield release
+    release.set()
+
+
+class TestJobQueue:
+    """Test suite for JobQueue"""
+
+    def test_result_matches_single_pass(self):
+        """Test merged chunks equal processing the whole text at once"""
+        queue = JobQueue(workers=1, chunk_lines=2)
+        for detect_headings in (True, False):
+            job = queue.submit(Job(DOCUMENT, detect_headings))
+            assert wait_finished(job) == JOB_DONE
+            expected = ProcessedDocument.from_text(DOCUMENT, detect_headings)
+            assert list(job.document.iter_orp_data()) == list(expected.iter_orp_data())
+            assert job.document.repeated_lines == expected.repeated_lines
+            assert job.progress == 100.0
+
+    def test_partial_document(self):
+        """Test the partial document comes with the status it belongs to"""
+        job = Job(DOCUMENT)
+        segment = ProcessedDocument.from_text('Hello world.')
+        job.advance(segment, 1)
+        document, status = job.partial_document()
+        assert list(document.iter_words()) == list(segment.iter_words())
+        assert status == JOB_QUEUED
+
+        job.update(status=JOB_DONE, document=segment, segments=[])
+        assert job.partial_document() == (segment, JOB_DONE)
+
+    def test_small_jobs_first(self, gate):
+        """Test queued jobs run smallest text first"""
+        queue = JobQueue(workers=1)
+        blocker = queue.submit(Job('Blocking job.'))
+        while not gate.chunks:
+            time.sleep(0.01)
+        large = queue.submit(Job('Large job text. ' * 50))
+        small = queue.submit(Job('Small job.'))
+        gate.set()
+        for job in (blocker, large, small):
+            assert wait_finished(job) == JOB_DONE
+        assert gate.chunks[1:] == ['Small job.', 'Large job text. ' * 50]
+
+    def test_cancel(self, gate):
+        """Test queued jobs cancel at once and running jobs at the next chunk"""
+        queue = JobQueue(workers=1, chunk_lines=1)
+        running = queue.submit(Job('One.\nTwo.\nThree.'))
+        while not gate.chunks:
+            time.sleep(0.01)
+        queued = queue.submit(Job('Queued.'))
+        assert queue.cancel(queued.id).status == JOB_CANCELLED
+        queue.cancel(running.id)
+        gate.set()
+        assert wait_finished(running) == JOB_CANCELLED
+        assert running.lines_done == 1
+
+    def test_queue_limit(self, gate):
+        """Test submissions beyond max_queued are refused"""
+        queue = JobQueue(workers=1, max_queued=1)
+        queue.submit(Job('Running.'))
+        while not gate.chunks:
+            time.sleep(0.01)
+        queue.submit(Job('Waiting.'))
+        with pytest.raises(QueueFullError):
+            queue.submit(Job('Refused.'))
+
+    def test_finished_jobs_expire(self):
+        """Test finished jobs are dropped after the TTL"""
+        queue = JobQueue(workers=1, ttl=0)
+        job = queue.submit(Job('Hello world.'))
+        wait_finished(job)
+        time.sleep(0.01)
+        assert queue.get(job.id) is None
+
+
+class TestJobEndpoints:
+    """Test /api/jobs"""
+
+    def test_job_lifecycle(self, client):
+        """Test a job is accepted, finishes and returns the /process-text output"""
+        response = client.post('/api/jobs', json={'text': DOCUMENT, 'pause_count': 2})
+        assert response.status_code == 202
+        job_id = response.get_json()['job_id']
+
+        status = client.get(f'/api/jobs/{job_id}').get_json()
+        deadline = time.monotonic() + 5
+        while status['status'] != JOB_DONE and time.monotonic() < deadline:
+            time.sleep(0.01)
+            status = client.get(f'/api/jobs/{job_id}').get_json()
+        assert status['progress'] == 100.0
+
+        response = client.get(f'/api/jobs/{job_id}/result')
+        result = response.get_json()
+        response.close()
+        response = client.post('/api/process-text', json={'text': DOCUMENT, 'pause_count': 2})
+        expected = response.get_json()
+        response.close()
+        assert result['partial'] is False
+        assert result['words'] == expected['words']
+        assert result['orp_data'] == expected['orp_data']
+        assert result['stats'] == expected['stats']
+
+    def test_progress_events(self, client):
+        """Test the event stream ends with the final status"""
+        job_id = client.post('/api/jobs', json={'text': DOCUMENT}).get_json()['job_id']
+        response = client.get(f'/api/jobs/{job_id}/events')
+        assert response.mimetype == 'text/event-stream'
+        body = response.get_data(as_text=True)
+        response.close()
+        assert body.startswith('event: ')
+        assert 'event: done\n' in body
+
+    def test_cancel_endpoint(self, client, gate):
+        """Test DELETE cancels a job and its result is then unavailable"""
+        client.post('/api/jobs', json={'text': 'Keeps the workers busy.'})
+        client.post('/api/jobs', json={'text': 'Keeps the workers busy too.'})
+        # Smaller texts run first: wait until both workers are blocked
+        deadline = time.monotonic() + 5
+        while len(gate.chunks) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        job_id = client.post('/api/jobs', json={'text': 'Cancel me.'}).get_json()['job_id']
+        assert client.delete(f'/api/jobs/{job_id}').get_json()['status'] == JOB_CANCELLED
+        assert client.get(f'/api/jobs/{job_id}/result').status_code == 409
+
+    def test_unknown_job(self, client):
+        """Test unknown job ids return 404"""
+        assert client.get('/api/jobs/missing').status_code == 404
+
+    def test_queue_full(self, client, gate):
+        """Test a full queue answers 503 with Retry-After"""
+        client.application.extensions['jobs'].max_queued = 0
+        response = client.post('/api/jobs', json={'text': 'Hello world.'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After']
+
+
+# Run tests with: pytest tests/test_jobs.py -v
@@ -4,6 +4,7 @@ Tests the core ORP calculation logic
 """
 
 import pytest
+from services import orp_calculator
 from services.orp_calculator import ORPCalculator
 
 
@@ -110,6 +111,23 @@ class TestORPCalculator:
         percentage = self.calculator.get_orp_percentage("the")
         assert 0.6 < percentage < 0.7  # ~67%
     
+    @pytest.mark.parametrize('use_numpy', [
+        False,
+        pytest.param(True, marks=pytest.mark.skipif(orp_calculator.np is None,
+                                                    reason="numpy not installed"))
+    ])
+    def test_batch_offsets_match_split_word(self, use_numpy):
+        """Test vectorized offsets agree with split_word"""
+        words = ["", "   ", "I", "the", "reading", "programming",
+                 "extraordinarily", "x" * 40, "h\u00e9llo,"]
+        offsets = self.calculator.batch_offsets(words, use_numpy=use_numpy)
+        
+        assert len(offsets) == len(words)
+        assert list(offsets.positions) == [0, 0, 1, 2, 3, 4, 5, 5, 3]
+        assert list(offsets.lengths) == [len(w) for w in words]
+        for i, word in enumerate(words):
+            assert offsets.split(words, i) == self.calculator.split_word(word)
+    
     def test_case_insensitivity(self):
         """Test that calculation is case-insensitive"""
         assert self.calculator.calculate("HELLO") == self.calculator.calculate("hello")
@@ -0,0 +1,165 @@
+"""
+Unit Tests for the Distributed Result Cache
+Tests the hash ring and a cluster of local backend nodes over HTTP
+"""
+
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from werkzeug.serving import make_server
+from app import create_app
+from services.metrics import metrics
+from utils.hash_ring import HashRing
+
+
+TOKEN = 'test-token'
+
+
+class TestHashRing:
+    """Test suite for consistent hashing"""
+
+    def test_deterministic(self):
+        """Test the same key always maps to the same node"""
+        ring = HashRing(['a', 'b', 'c'])
+        assert ring.node_for('key-1') == HashRing(['c', 'b', 'a']).node_for('key-1')
+
+    def test_balanced(self):
+        """Test virtual nodes spread keys roughly evenly"""
+        ring = HashRing(['a', 'b', 'c'], replicas=100)
+        counts = {'a': 0, 'b': 0, 'c': 0}
+        for i in range(3000):
+            counts[ring.node_for(f'key-{i}')] += 1
+        assert all(600 < count < 1400 for count in counts.values())
+
+    def test_removing_node_only_moves_its_keys(self):
+        """Test keys of surviving nodes keep their owner"""
+        before = HashRing(['a', 'b', 'c'])
+        after = HashRing(['a', 'b'])
+        for i in range(500):
+            key = f'key-{i}'
+            if before.node_for(key) != 'c':
+                assert after.node_for(key) == before.node_for(key)
+
+    def test_exclude_falls_through(self):
+        """Test excluded nodes are skipped in ring order"""
+        ring = HashRing(['a', 'b', 'c'])
+        owner = ring.node_for('key')
+        assert ring.node_for('key', exclude=[owner]) == ring.preference_list('key')[1]
+        assert ring.node_for('key', exclude=['a', 'b', 'c']) is None
+
+
+class Cluster:
+    """Backend nodes served over real sockets from background threads"""
+
+    def __init__(self, size, monkeypatch):
+        self.apps = [None] * size
+        self.servers = []
+        for index in range(size):
+            server = make_server('127.0.0.1', 0, self._dispatch(index), threaded=True)
+            self.servers.append(server)
+        self.urls = [f'http://127.0.0.1:{server.server_port}' for server in self.servers]
+
+        monkeypatch.setattr('config.Config.CACHE_PEERS', ','.join(self.urls))
+        monkeypatch.setattr('config.Config.CACHE_PEER_TOKEN', TOKEN)
+        monkeypatch.setattr('config.Config.CACHE_PEER_TIMEOUT', 2.0)
+        for index, url in enumerate(self.urls):
+            monkeypatch.setattr('config.Config.CACHE_NODE_URL', url)
+            self.apps[index] = create_app()
+            self.apps[index].config['TESTING'] = True
+        for server in self.servers:
+            threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def _dispatch(self, index):
+        return lambda environ, start_response: self.apps[index](environ, start_response)
+
+    def cache(self, index):
+        return self.apps[index].extensions['result_cache']
+
+    def local(self, index):
+        return self.apps[index].extensions['local_result_cache']
+
+    def stop(self, index):
+        server = self.servers[index]
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            self.servers[index] = None
+
+    def close(self):
+        for index in range(len(self.servers)):
+            self.stop(index)
+
+
+@pytest.fixture
+def cluster(monkeypatch):
+    """Three backend nodes sharing one sharded cache"""
+    cluster = Cluster(3, monkeypatch)
+    yield cluster
+    cluster.close()
+
+
+class TestPeerCache:
+    """Test suite for PeerCacheClient against live nodes"""
+
+    def test_keys_are_sharded(self, cluster):
+        """Test each key is stored once, on its owner, and readable from any node"""
+        items = {f'key-{i}': f'value-{i}'.encode() for i in range(60)}
+        assert cluster.cache(0).put_many(items) == 60
+
+        assert sum(len(cluster.local(index)) for index in range(3)) == 60
+        assert all(len(cluster.local(index)) > 0 for index in range(3))
+        assert cluster.cache(1).get_many(items) == items
+        assert cluster.cache(2).get('key-7') == b'value-7'
+        assert cluster.cache(2).get('missing') is None
+
+    def test_process_text_shared_across_nodes(self, cluster):
+        """Test a document processed on one node is a cache hit on another"""
+        payload = {'text': 'CHAPTER ONE\nShared across the whole cluster, wonderful. ' * 5}
+        first = cluster.apps[0].test_client().post('/api/process-text', json=payload)
+        first_body = first.get_data()
+        first.close()
+
+        metrics.reset()
+        second = cluster.apps[1].test_client().post('/api/process-text', json=payload)
+        second_body = second.get_data()
+        second.close()
+
+        assert second_body == first_body
+        # Served by the owning node's local store, whichever node that is
+        assert metrics.get('memory_cache.hits') == 1
+        assert metrics.get('memory_cache.misses') == 0
+
+    def test_peer_failure_falls_back(self, cluster):
+        """Test a dead peer costs a miss and its keys move to the next node"""
+        client = cluster.cache(0)
+        key = next(f'key-{i}' for i in range(1000) if client.owner(f'key-{i}') == cluster.urls[2])
+        cluster.stop(2)
+
+        assert client.get(key) is None
+        assert client.owner(key) != cluster.urls[2]
+        assert client.put(key, b'value')
+        assert client.get(key) == b'value'
+
+    def test_requires_token(self, cluster):
+        """Test peer endpoints reject requests without the shared token"""
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(cluster.urls[0] + '/api/cache/entries/key-1', timeout=2)
+        assert error.value.code == 403
+
+    def test_rejects_invalid_key(self, cluster):
+        """Test malformed keys are refused"""
+        response = cluster.apps[0].test_client().get(
+            '/api/cache/entries/bad key!', headers={'X-Cache-Token': TOKEN}
+        )
+        assert response.status_code == 400
+
+    def test_misconfigured_cluster(self, monkeypatch):
+        """Test CACHE_PEERS without a token fails at startup"""
+        monkeypatch.setattr('config.Config.CACHE_PEERS', 'http://127.0.0.1:1')
+        monkeypatch.setattr('config.Config.CACHE_PEER_TOKEN', '')
+        with pytest.raises(ValueError):
+            create_app()
+
+
+# Run tests with: pytest tests/test_peer_cache.py -v
@@ -0,0 +1,142 @@
+"""
+Unit Tests for the Position Map
+Tests translation between original word indexes, processed offsets and source text spans
+"""
+
+import pytest
+from app import create_app
+from services.document_index import document_word_offsets
+from services.position_map import PositionMap, source_spans
+from services.processed_document import ProcessedDocument
+from services.stage_cache import TokenizedText
+from services.text_processor import TextProcessor
+
+
+SOURCE = (
+    "  CHAPTER ONE\nThe quick—brown fox... jumps!Really? Pi is 3.14 . . . roughly.\n\n"
+    "A state-of-the-art reader, wonderful – truly.\tDone"
+)
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app = create_app()
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+class TestSourceSpans:
+    """Test suite for source_spans"""
+
+    def test_spans_cover_each_word(self):
+        """Test each word maps to its text in the source, normalization undone"""
+        tokens = TokenizedText.from_text(SOURCE)
+        starts, lengths = source_spans(SOURCE, tokens)
+        spans = [SOURCE[start:start + length] for start, length in zip(starts, lengths)]
+        words = tokens.words()
+        assert len(spans) == len(words)
+        changed = [(word, span) for word, span in zip(words, spans) if word != span]
+        assert changed == [('-', '—'), ('fox…', 'fox...'), ('…', '. . .'), ('-', '–')]
+        assert spans[words.index('state-of'):words.index('state-of') + 2] == ['state-of', 'the-art']
+
+    def test_empty_tokens(self):
+        """Test words after the empty token of a dash-wrapped word keep their spans"""
+        text = "Wait -x- then more words here. " * 20 + "a--b--c -- end"
+        tokens = TokenizedText.from_text(text)
+        starts, lengths = source_spans(text, tokens)
+        spans = [text[start:start + length] for start, length in zip(starts, lengths)]
+        assert spans == tokens.words()
+
+    def test_spans_ascend(self):
+        """Test spans are in order and don't overlap"""
+        tokens = TokenizedText.from_text(SOURCE * 3)
+        starts, lengths = source_spans(SOURCE * 3, tokens)
+        ends = [start + length for start, length in zip(starts, lengths)]
+        assert all(end <= start for end, start in zip(ends, starts[1:]))
+
+
+class TestPositionMap:
+    """Test suite for PositionMap"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.document = ProcessedDocument.from_text(SOURCE, True, TextProcessor())
+        self.words = list(self.document.iter_words())
+        self.positions = PositionMap(document_word_offsets(self.document)[0])
+
+    def test_round_trip(self):
+        """Test every word maps to its first display and back"""
+        for word_index in range(len(self.positions)):
+            offset = self.positions.to_processed(word_index)
+            assert self.positions.to_original(offset) == word_index
+
+    def test_repeats_and_pauses(self):
+        """Test repeated displays and pauses belong to the word before them"""
+        offsets = self.positions.word_offsets
+        for offset in range(offsets[0], len(self.words)):
+            word_index = self.positions.to_original(offset)
+            assert offsets[word_index] <= offset
+            assert word_index == len(offsets) - 1 or offsets[word_index + 1] > offset
+
+    def test_leading_pauses(self):
+        """Test pauses before the first word map to it"""
+        assert self.positions.word_offsets[0] > 0
+        assert self.positions.to_original(0) == 0
+
+
+class TestMappingEndpoints:
+    """Test include_mapping and /api/sessions/<id>/position"""
+
+    def test_mapping_in_response(self, client):
+        """Test both outputs carry the same mapping, and only when asked"""
+        bodies = {}
+        for output in ('words', 'offsets'):
+            response = client.post('/api/process-text',
+                                   json={'text': SOURCE, 'output': output, 'include_mapping': True})
+            bodies[output] = response.get_json()
+            response.close()
+        mapping = bodies['words']['mapping']
+        assert bodies['offsets']['mapping'] == mapping
+        words = bodies['words']['words']
+        starts, lengths = mapping['source_starts'], mapping['source_lengths']
+        assert words[mapping['word_offsets'][1]] == SOURCE[starts[1]:starts[1] + lengths[1]] == 'ONE'
+
+        response = client.post('/api/process-text', json={'text': SOURCE, 'include_index': True})
+        assert 'mapping' not in response.get_json()
+        response.close()
+
+    def get_json(self, client, url):
+        response = client.get(url)
+        body = response.get_json()
+        response.close()
+        return response.status_code, body
+
+    def test_session_position(self, client):
+        """Test the session translates words and offsets both ways"""
+        response = client.post('/api/process-text',
+                               json={'text': SOURCE, 'session': True, 'include_mapping': True})
+        body = response.get_json()
+        response.close()
+        url = f"/api/sessions/{body['session_id']}/position"
+        offset = body['mapping']['word_offsets'][2]
+
+        _, by_word = self.get_json(client, f'{url}?word=2')
+        _, by_offset = self.get_json(client, f'{url}?offset={offset}')
+        assert by_word == by_offset
+        assert (by_word['offset'], by_word['source_start']) == (offset, body['mapping']['source_starts'][2])
+
+        assert self.get_json(client, url)[0] == 400
+        assert self.get_json(client, f"{url}?offset={len(body['words'])}")[0] == 400
+
+    def test_session_without_spans(self, client):
+        """Test sessions without include_mapping translate indexes only"""
+        response = client.post('/api/process-text', json={'text': SOURCE, 'session': True})
+        session_id = response.get_json()['session_id']
+        response.close()
+        _, position = self.get_json(client, f'/api/sessions/{session_id}/position?word=0')
+        assert position['word_index'] == 0
+        assert 'source_start' not in position
+
+
+# Run tests with: pytest tests/test_position_map.py -v
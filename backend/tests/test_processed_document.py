@@ -0,0 +1,93 @@
+"""
+Unit Tests for ProcessedDocument
+Tests the compact token arrays and the lazily rendered views
+"""
+
+import pytest
+from services.orp_calculator import ORPCalculator
+from services.processed_document import (
+    PAUSE_WORD_ID, TOKEN_FLAG_HEADING, TOKEN_FLAG_PAUSE, ProcessedDocument
+)
+from services.text_processor import TextProcessor
+from services.word_preprocessor import WordPreprocessor
+
+
+class TestProcessedDocument:
+    """Test suite for ProcessedDocument"""
+
+    SAMPLE_TEXT = "INTRODUCTION\nThe state-of-the-art reader, wonderful.\nDone! (ok) The end."
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.processor = TextProcessor()
+        self.preprocessor = WordPreprocessor(long_word_threshold=7, pause_count=4)
+
+    def _document(self, text, detect_headings=True):
+        return ProcessedDocument.from_text(text, detect_headings, self.processor, self.preprocessor)
+
+    def test_words_match_preprocess(self):
+        """Test words view equals preprocess() without heading detection"""
+        document = self._document(self.SAMPLE_TEXT, detect_headings=False)
+        words = self.processor.split_words(self.processor.normalize(self.SAMPLE_TEXT))
+        assert list(document.iter_words()) == self.preprocessor.preprocess(words)
+        assert len(document) == len(self.preprocessor.preprocess(words))
+        assert document.original_count == len(words)
+
+    def test_word_objects_match_preprocess_with_headings(self):
+        """Test word object view expands like preprocess_with_headings()"""
+        document = self._document(self.SAMPLE_TEXT)
+        expected = self.preprocessor.preprocess_with_headings(
+            self.processor.split_words_with_metadata(self.SAMPLE_TEXT)
+        )
+        assert list(document.iter_word_objects()) == expected
+
+    def test_orp_data_matches_split_word(self):
+        """Test orp_data view renders ORPCalculator splits"""
+        document = self._document(self.SAMPLE_TEXT)
+        orp_calc = ORPCalculator()
+        for word, entry in zip(document.iter_words(), document.iter_orp_data()):
+            if word == ' ':
+                assert entry['word'] == '' and entry['position'] == 0
+                continue
+            split = orp_calc.split_word(word)
+            assert entry['word'] == word
+            assert (entry['before'], entry['orp'], entry['after'], entry['position']) == (
+                split['before'], split['orp'], split['after'], split['orp_position']
+            )
+
+    def test_orp_data_empty_token(self):
+        """Test empty tokens from dash-wrapped words render as blank entries"""
+        document = self._document('ab -x- cd', detect_headings=False)
+        assert list(document.iter_words()) == ['ab', '-x', '', 'cd']
+        entry = list(document.iter_orp_data())[2]
+        assert (entry['word'], entry['orp'], entry['position']) == ('', '', 0)
+
+    def test_string_table_is_deduplicated(self):
+        """Test repeated words share one string table entry"""
+        document = self._document("Hello there. Hello there. Hello there.", detect_headings=False)
+        assert document.strings.count('Hello') == 1
+        assert document.strings[PAUSE_WORD_ID] == ' '
+        hello_id = document.strings.index('Hello')
+        assert list(document.word_ids).count(hello_id) == 3
+
+    def test_pause_run_is_one_token(self):
+        """Test a run of blank pauses is stored as a single token"""
+        document = self._document("Stop.", detect_headings=False)
+        assert list(document.iter_tokens()) == [('Stop.', 2, 1, 0), (' ', 0, 4, TOKEN_FLAG_PAUSE)]
+
+    def test_heading_flags(self):
+        """Test heading words carry the heading flag and a triple display"""
+        document = self._document("INTRODUCTION\nSome normal text here.")
+        tokens = [token for token in document.iter_tokens() if not token[3] & TOKEN_FLAG_PAUSE]
+        assert tokens[0] == ('INTRODUCTION', 4, 3, TOKEN_FLAG_HEADING)
+        assert all(flags == 0 for _, _, _, flags in tokens[1:])
+
+    @pytest.mark.parametrize('text', ['', '   '])
+    def test_empty_text(self, text):
+        """Test empty input gives an empty document"""
+        document = self._document(text)
+        assert len(document) == 0
+        assert list(document.iter_words()) == []
+
+
+# Run tests with: pytest tests/test_processed_document.py -v
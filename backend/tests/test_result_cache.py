@@ -0,0 +1,173 @@
+"""
+Unit Tests for the Persistent Result Cache
+Tests keys, LRU eviction by size, persistence and the /api/process-text hook
+"""
+
+import gzip
+import sqlite3
+import pytest
+from app import create_app
+from api.compression import compress_response, store_compressed, variant_key
+from api.json_stream import stream_json
+from services import result_cache
+from services.cache_backend import CacheBackend, MemoryCache
+from services.cancellation import CancellationToken
+from services.metrics import metrics
+from services.processed_document import ProcessedDocument
+from services.result_cache import ResultCache, cache_key
+
+
+class TestResultCache:
+    """Test suite for ResultCache"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Cache with a 1000-byte budget"""
+        return ResultCache(str(tmp_path / 'cache.sqlite3'), max_bytes=1000)
+
+    def test_cache_key(self):
+        """Test keys depend on text, options and the algorithm version"""
+        key = cache_key('Hello world.', {'detect_headings': True})
+        assert key == cache_key('Hello world.', {'detect_headings': True})
+        assert key != cache_key('Hello world!', {'detect_headings': True})
+        assert key != cache_key('Hello world.', {'detect_headings': False})
+
+    def test_cache_key_changes_with_version(self, monkeypatch):
+        """Test bumping ALGORITHM_VERSION invalidates old keys"""
+        key = cache_key('Hello', {})
+        monkeypatch.setattr(result_cache, 'ALGORITHM_VERSION', result_cache.ALGORITHM_VERSION + 1)
+        assert cache_key('Hello', {}) != key
+
+    def test_backend_is_abstract(self):
+        """Test backends must implement get() and put()"""
+        with pytest.raises(TypeError):
+            CacheBackend()
+
+    def test_put_get(self, cache):
+        """Test stored values are returned"""
+        assert cache.get('a') is None
+        assert cache.put('a', b'value')
+        assert cache.get('a') == b'value'
+        assert len(cache) == 1
+
+    def test_lru_eviction_by_size(self, cache):
+        """Test least recently used entries go first when over budget"""
+        cache.put('a', b'x' * 400)
+        cache.put('b', b'x' * 400)
+        # Make 'b' the least recently used entry
+        cache._connection().execute("UPDATE results SET last_access = 0 WHERE key = 'b'")
+        cache.put('c', b'x' * 400)
+        assert cache.get('a') is not None
+        assert cache.get('b') is None
+        assert cache.get('c') is not None
+        assert cache.total_bytes() <= 1000
+
+    def test_rejects_oversized_value(self, cache):
+        """Test values larger than the whole budget are not stored"""
+        assert not cache.put('big', b'x' * 1001)
+        assert cache.get('big') is None
+
+    def test_survives_reopen(self, tmp_path):
+        """Test entries persist across cache instances (restarts, other workers)"""
+        path = str(tmp_path / 'cache.sqlite3')
+        ResultCache(path, max_bytes=1000).put('a', b'value')
+        assert ResultCache(path, max_bytes=1000).get('a') == b'value'
+
+    def test_uses_wal(self, cache):
+        """Test the database runs in WAL mode"""
+        assert cache._connection().execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    def test_document_round_trip(self, tmp_path):
+        """Test documents are stored compressed and load back equal"""
+        cache = ResultCache(str(tmp_path / 'cache.sqlite3'), max_bytes=1024 * 1024)
+        document = ProcessedDocument.from_text("CHAPTER ONE\nHello world, wonderful.")
+        cache.put_document('doc', document)
+        loaded = cache.get_document('doc')
+        assert list(loaded.iter_tokens()) == list(document.iter_tokens())
+        assert loaded.original_count == document.original_count
+
+    def test_corrupt_entry_is_a_miss(self, cache):
+        """Test undecodable entries are treated as misses"""
+        cache.put('doc', b'not zlib')
+        assert cache.get_document('doc') is None
+
+
+class TestProcessTextResultCache:
+    """Test /api/process-text with the result cache enabled"""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        """Client of an app with the result cache in tmp_path"""
+        monkeypatch.setattr('config.Config.RESULT_CACHE_ENABLED', True)
+        monkeypatch.setattr('config.Config.RESULT_CACHE_PATH', str(tmp_path / 'cache.sqlite3'))
+        app = create_app()
+        app.config['TESTING'] = True
+        metrics.reset()
+        return app.test_client()
+
+    def post(self, client, payload, **headers):
+        response = client.post('/api/process-text', json=payload, headers=headers)
+        body = response.get_data()
+        response.close()
+        return response, body
+
+    def test_repeated_text_hits_cache(self, client, tmp_path):
+        """Test a repeated document is served from the cache unchanged"""
+        payload = {'text': 'CHAPTER ONE\nHello world, wonderful reading. ' * 10}
+        _, first_body = self.post(client, payload)
+        _, second_body = self.post(client, payload)
+
+        assert second_body == first_body
+        assert metrics.get('result_cache.misses') == 1
+        assert metrics.get('result_cache.hits') == 1
+        with sqlite3.connect(str(tmp_path / 'cache.sqlite3')) as connection:
+            assert connection.execute('SELECT COUNT(*) FROM results').fetchone()[0] == 1
+
+    def test_compressed_body_is_cached(self, client, monkeypatch):
+        """Test a repeated document is served precompressed, per encoding and level"""
+        payload = {'text': 'CHAPTER ONE\nHello world, wonderful reading. ' * 100}
+        _, plain = self.post(client, payload)
+        first, first_body = self.post(client, payload, **{'Accept-Encoding': 'gzip'})
+        assert metrics.get('compression.precompressed.gzip.stored') == 1
+
+        second, second_body = self.post(client, payload, **{'Accept-Encoding': 'gzip'})
+        assert second.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in second.headers['Vary']
+        assert second_body == first_body
+        assert gzip.decompress(second_body) == plain
+        assert metrics.get('compression.precompressed.gzip.responses') == 1
+
+        # Another level is another variant
+        settings = client.application.view_functions['api.process_text']._compression_settings
+        monkeypatch.setitem(settings['level'], 'gzip', 1)
+        self.post(client, payload, **{'Accept-Encoding': 'gzip'})
+        assert metrics.get('compression.precompressed.gzip.responses') == 1
+        assert metrics.get('compression.precompressed.gzip.stored') == 2
+
+    def test_cancelled_stream_not_kept(self, client):
+        """Test a stream cut short by its cancel token leaves no compressed body"""
+        cache = MemoryCache(max_bytes=1024 * 1024)
+        with client.application.test_request_context('/api/process-text', method='POST',
+                                                      headers={'Accept-Encoding': 'gzip'}):
+            for cancelled in (True, False):
+                cancel = CancellationToken()
+                response = stream_json({'words': ['reading'] * 10_000}, cancel=cancel)
+                response = compress_response(store_compressed(response, cache, f'doc{cancelled}', cancel))
+                chunks = iter(response.response)
+                next(chunks)
+                if cancelled:
+                    cancel.cancel()
+                list(chunks)
+                stored = cache.get(variant_key(f'doc{cancelled}', 'gzip', 6))
+                assert (stored is None) == cancelled
+
+    def test_session_responses_not_precompressed(self, client):
+        """Test responses with per-request extras are compressed as usual"""
+        payload = {'text': 'Hello world, wonderful reading. ' * 100, 'include_toc': True}
+        for _ in range(2):
+            response, _ = self.post(client, payload, **{'Accept-Encoding': 'gzip'})
+            assert response.headers['Content-Encoding'] == 'gzip'
+        assert metrics.get('compression.precompressed.gzip.stored') == 0
+
+
+# Run tests with: pytest tests/test_result_cache.py -v
@@ -0,0 +1,136 @@
+"""
+Unit Tests for the Search Index
+Tests word and phrase lookup in processed documents and /api/sessions/<id>/search
+"""
+
+import pytest
+from app import create_app
+from services.cancellation import CancellationToken, OperationCancelled
+from services.processed_document import ProcessedDocument
+from services.search_index import SearchIndex
+from services.text_processor import TextProcessor
+
+
+BOOK = (
+    "CHAPTER ONE\nThe state-of-the-art reader was fast. \"The reader,\" she said, \"is fast!\"\n\n"
+    "CHAPTER TWO\nNothing else was as fast as the reader. THE END."
+)
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app = create_app()
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+class TestSearchIndex:
+    """Test suite for SearchIndex"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.processor = TextProcessor()
+        self.document = ProcessedDocument.from_text(BOOK, True, self.processor)
+        self.index = SearchIndex.build(self.document, self.processor)
+        self.words = self.processor.split_words(self.processor.normalize(BOOK))
+
+    def scan(self, *keys):
+        """Reference result: a linear scan over the original words, punctuation-only ones skipped"""
+        cleaned = [(index, self.processor.clean_punctuation(word).lower()) for index, word in enumerate(self.words)]
+        cleaned = [(index, key) for index, key in cleaned if key]
+        return [cleaned[start][0] for start in range(len(cleaned) - len(keys) + 1)
+                if tuple(key for _, key in cleaned[start:start + len(keys)]) == keys]
+
+    def test_word(self):
+        """Test words match case-insensitively, ignoring punctuation"""
+        assert self.index.search('READER').tolist() == self.scan('reader')
+        assert len(self.scan('reader')) == 3
+        assert self.index.search('"the,').tolist() == self.scan('the')
+
+    def test_phrase(self):
+        """Test phrases match consecutive words only"""
+        assert self.index.search('the reader').tolist() == self.scan('the', 'reader')
+        assert self.index.search('was fast').tolist() == self.scan('was', 'fast')
+        assert self.index.search('fast reader').tolist() == self.scan('fast', 'reader') == []
+
+    def test_split_compound(self):
+        """Test queries are split like the document"""
+        assert self.index.search('state-of-the-art').tolist() == self.scan('state-of', 'the-art')
+
+    def test_no_match(self):
+        """Test unknown words and empty queries match nothing"""
+        assert self.index.search('missing').tolist() == []
+        assert self.index.search('...').tolist() == []
+
+    def test_punctuation_words(self):
+        """Test phrases copied from the text find themselves across punctuation-only words"""
+        text = "He said yes — and then left. Wait -x- then go."
+        document = ProcessedDocument.from_text(text, False, self.processor)
+        index = SearchIndex.build(document, self.processor)
+        words = self.processor.split_words(self.processor.normalize(text))
+        assert [words[match] for match in index.search('yes — and')] == ['yes']
+        assert index.search('yes and').tolist() == index.search('yes — and').tolist()
+        assert [words[match] for match in index.search('-x- then')] == ['-x']
+
+    def test_postings_ascend(self):
+        """Test every searchable word is posted once, in order"""
+        postings = [self.index.postings(key).tolist() for key in self.index.keys]
+        assert all(positions == sorted(positions) for positions in postings)
+        assert sorted(sum(postings, [])) == list(range(len(self.index.word_indexes)))
+        assert [self.words[index] for index in self.index.word_indexes] == [
+            word for word in self.words if self.processor.clean_punctuation(word)
+        ]
+
+    def test_index_drops_build_token(self):
+        """Test searches don't check the token of the request that built the index"""
+        token = CancellationToken()
+        index = SearchIndex.build(self.document, TextProcessor(token), token)
+        token.cancel()
+        assert index.processor.cancel is None
+        assert index.search('reader ' * 20_000).tolist() == []
+
+    def test_cancellation(self):
+        """Test the build stops on a cancelled token"""
+        token = CancellationToken()
+        token.cancel()
+        with pytest.raises(OperationCancelled):
+            SearchIndex.build(self.document, self.processor, token)
+
+
+class TestSearchEndpoint:
+    """Test /api/sessions/<id>/search"""
+
+    def get_json(self, client, url):
+        response = client.get(url)
+        body = response.get_json()
+        response.close()
+        return response.status_code, body
+
+    def test_search(self, client):
+        """Test matches point at the query's first word in the words list"""
+        response = client.post('/api/process-text', json={'text': BOOK, 'session': True})
+        body = response.get_json()
+        response.close()
+        url = f"/api/sessions/{body['session_id']}/search"
+
+        status, result = self.get_json(client, f'{url}?q=the+reader')
+        assert status == 200
+        assert result['total'] == 2
+        assert [body['words'][match['offset']].lower().strip('"') for match in result['matches']] == ['the', 'the']
+
+        _, limited = self.get_json(client, f'{url}?q=fast&limit=1')
+        assert (limited['total'], len(limited['matches'])) == (3, 1)
+
+    def test_invalid_query(self, client):
+        """Test missing queries and limits out of range answer 400"""
+        response = client.post('/api/process-text', json={'text': BOOK, 'session': True})
+        session_id = response.get_json()['session_id']
+        response.close()
+        url = f'/api/sessions/{session_id}/search'
+        assert self.get_json(client, url)[0] == 400
+        assert self.get_json(client, f'{url}?q=fast&limit=0')[0] == 400
+        assert self.get_json(client, f"{url}?q={'a' * 201}")[0] == 400
+
+
+# Run tests with: pytest tests/test_search_index.py -v
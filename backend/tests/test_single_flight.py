@@ -0,0 +1,140 @@
+"""
+Unit Tests for Request Coalescing
+Tests single-flight deduplication, timeouts and cross-process file locks
+"""
+
+import threading
+import time
+import pytest
+from app import create_app
+from services import processed_document
+from services.single_flight import SingleFlight, cross_process_locks_available, file_lock
+
+
+def run_concurrently(count, target):
+    """Start `count` threads on target at once and return their results"""
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        results[index] = target()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight"""
+
+    def test_concurrent_calls_share_one_run(self):
+        """Test identical concurrent calls run the function once"""
+        flight = SingleFlight(timeout=5)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return object()
+
+        results = run_concurrently(8, lambda: flight.do('key', compute))
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.in_flight() == 0
+
+    def test_different_keys_run_separately(self):
+        """Test calls with different keys are not coalesced"""
+        flight = SingleFlight(timeout=5)
+        assert flight.do('a', lambda: 1) == 1
+        assert flight.do('b', lambda: 2) == 2
+
+    def test_follower_timeout(self):
+        """Test followers stop waiting for a stuck leader"""
+        flight = SingleFlight(timeout=0.1)
+        release = threading.Event()
+        leader = threading.Thread(target=flight.do, args=('key', release.wait))
+        leader.start()
+        while not flight.in_flight():
+            time.sleep(0.01)
+
+        start = time.monotonic()
+        assert flight.do('key', lambda: 'own result') == 'own result'
+        assert time.monotonic() - start < 2
+        release.set()
+        leader.join()
+
+    def test_leader_error_is_not_shared(self):
+        """Test followers recompute when the leader fails"""
+        flight = SingleFlight(timeout=5)
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError('boom')
+
+        errors = []
+
+        def leader():
+            try:
+                flight.do('key', failing)
+            except RuntimeError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        started.wait()
+        assert flight.do('key', lambda: 'recovered') == 'recovered'
+        thread.join()
+        assert len(errors) == 1
+
+
+@pytest.mark.skipif(not cross_process_locks_available(), reason='fcntl not available')
+class TestFileLock:
+    """Test suite for cross-process file locks"""
+
+    def test_exclusive(self, tmp_path):
+        """Test a held lock times out other holders"""
+        with file_lock(str(tmp_path), 'key', timeout=1) as acquired:
+            assert acquired
+            with file_lock(str(tmp_path), 'key', timeout=0.1) as second:
+                assert not second
+        with file_lock(str(tmp_path), 'key', timeout=0.1) as acquired:
+            assert acquired
+
+
+class TestProcessTextCoalescing:
+    """Test /api/process-text request coalescing"""
+
+    def test_identical_requests_process_once(self, monkeypatch):
+        """Test concurrent identical documents run the pipeline once"""
+        original = processed_document.ProcessedDocument.from_words.__func__
+        calls = []
+
+        def slow_from_words(cls, *args, **kwargs):
+            calls.append(1)
+            time.sleep(0.2)
+            return original(cls, *args, **kwargs)
+
+        monkeypatch.setattr(processed_document.ProcessedDocument, 'from_words',
+                            classmethod(slow_from_words))
+        app = create_app()
+        app.config['TESTING'] = True
+        payload = {'text': 'Viral article text, shared by everyone. ' * 20}
+
+        def request():
+            response = app.test_client().post('/api/process-text', json=payload)
+            body = response.get_data()
+            response.close()
+            return body
+
+        bodies = run_concurrently(6, request)
+        assert len(calls) == 1
+        assert all(body == bodies[0] for body in bodies)
+
+
+# Run tests with: pytest tests/test_single_flight.py -v
@@ -0,0 +1,51 @@
+"""
+Unit Tests for the Sized LRU
+Tests size-bounded eviction shared by the in-process caches
+"""
+
+from services.cache_backend import MemoryCache
+from services.metrics import metrics
+from utils.sized_lru import SizedLRU
+
+
+class TestSizedLRU:
+    """Test suite for SizedLRU"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        metrics.reset()
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently read entry goes first"""
+        lru = SizedLRU(max_bytes=20, name='lru')
+        lru.put('a', 'A', 10)
+        lru.put('b', 'B', 10)
+        assert lru.get('a') == 'A'
+        lru.put('c', 'C', 10)
+        assert lru.get('b') is None
+        assert (lru.get('a'), lru.get('c')) == ('A', 'C')
+        assert lru.total_bytes == 20
+        assert metrics.get('lru.evictions') == 1
+
+    def test_replace_and_oversize(self):
+        """Test replacing a key updates its size and oversized values are refused"""
+        lru = SizedLRU(max_bytes=20, name='lru')
+        assert lru.put('a', 'A', 5)
+        assert lru.put('a', 'AA', 15)
+        assert (len(lru), lru.total_bytes) == (1, 15)
+        assert not lru.put('b', 'B', 21)
+        assert lru.get('b') is None
+
+    def test_memory_cache(self):
+        """Test MemoryCache is bounded by value length"""
+        cache = MemoryCache(max_bytes=10)
+        assert cache.put('a', b'12345')
+        assert cache.put('b', b'67890')
+        assert cache.put('c', b'x')
+        assert cache.get('a') is None
+        assert cache.total_bytes == 6
+        assert not cache.put('d', b'x' * 11)
+        assert metrics.get('memory_cache.hits') == 0
+
+
+# Run tests with: pytest tests/test_sized_lru.py -v
@@ -0,0 +1,118 @@
+"""
+Unit Tests for the Stage Cache and Per-Request Pacing Options
+Tests cached tokenization and long_word_threshold/pause_count handling
+"""
+
+import pytest
+from app import create_app
+from services.metrics import metrics
+from services.stage_cache import StageCache, TokenizedText
+from services.text_processor import TextProcessor
+
+
+SAMPLE_TEXT = "INTRODUCTION\nThe state-of-the-art reader, wonderful.\nDone! (ok) The end."
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+class TestStageCache:
+    """Test suite for TokenizedText and StageCache"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.processor = TextProcessor()
+        metrics.reset()
+
+    def test_tokenized_text_matches_processor(self):
+        """Test cached words and flags equal the TextProcessor output"""
+        tokens = TokenizedText.from_text(SAMPLE_TEXT, self.processor)
+        expected = self.processor.split_words_with_metadata(SAMPLE_TEXT)
+        assert tokens.words() == [word for word, _ in expected]
+        assert tokens.flags is None
+        flags = tokens.word_flags(SAMPLE_TEXT, self.processor)
+        assert [bool(flag & 1) for flag in flags] == [meta['is_heading'] for _, meta in expected]
+        assert tokens.word_flags(SAMPLE_TEXT, self.processor) is flags
+
+    def test_cache_hit(self):
+        """Test the same text is tokenized once"""
+        cache = StageCache(max_bytes=1024 * 1024)
+        first = cache.get(SAMPLE_TEXT, self.processor)
+        assert cache.get(SAMPLE_TEXT, self.processor) is first
+        assert metrics.get('stage_cache.misses') == 1
+        assert metrics.get('stage_cache.hits') == 1
+
+    def test_lru_eviction(self):
+        """Test old entries are evicted past the byte budget"""
+        size = TokenizedText.from_text('word ' * 100).memory_size() + 100
+        cache = StageCache(max_bytes=size * 2)
+        texts = [f'{prefix} ' * 100 for prefix in ('aaaa', 'bbbb', 'cccc')]
+        for text in texts:
+            cache.get(text)
+        assert len(cache) == 2
+        assert cache.total_bytes <= cache.max_bytes
+
+
+class TestPacingOptions:
+    """Test per-request long_word_threshold and pause_count"""
+
+    def _stats(self, client, **options):
+        response = client.post('/api/process-text', json={'text': 'Hello wonderful world.', **options})
+        assert response.status_code == 200
+        return response.get_json()
+
+    def test_pause_count(self, client):
+        """Test pause_count sets the number of blanks after a sentence"""
+        words = self._stats(client, pause_count=2, long_word_threshold=20)['words']
+        assert words == ['Hello', 'wonderful', 'world.', ' ', ' ']
+
+    def test_long_word_threshold(self, client):
+        """Test long_word_threshold sets which words are tripled"""
+        words = self._stats(client, long_word_threshold=4, pause_count=1)['words']
+        assert words == ['Hello'] * 3 + ['wonderful'] * 3 + ['world.'] * 3 + [' ']
+
+    def test_options_in_query_string(self, client):
+        """Test options are read from the query string for text/plain bodies"""
+        response = client.post('/api/process-text?pause_count=1&long_word_threshold=20',
+                               data='Hello world.', content_type='text/plain')
+        assert response.get_json()['words'] == ['Hello', 'world.', ' ']
+
+    @pytest.mark.parametrize('options', [
+        {'pause_count': 0},
+        {'pause_count': 'many'},
+        {'long_word_threshold': 51},
+        {'long_word_threshold': True},
+        {'long_word_threshold': '²'},
+        {'pause_count': '①'},
+    ])
+    def test_invalid_options(self, client, options):
+        """Test out-of-range or non-integer options are rejected"""
+        response = client.post('/api/process-text', json={'text': 'Hello', **options})
+        assert response.status_code == 400
+
+    def test_non_ascii_digits_in_query_string(self, client):
+        """Test digits int() can't parse are rejected, not a server error"""
+        response = client.post('/api/process-text?long_word_threshold=%C2%B2',
+                               data='Hello world.', content_type='text/plain')
+        assert response.status_code == 400
+        assert 'must be an integer' in response.get_json()['message']
+
+    def test_option_change_reuses_tokens(self, client):
+        """Test changing options skips the text stages"""
+        metrics.reset()
+        for options in ({}, {'detect_headings': False}, {'pause_count': 2}):
+            response = client.post('/api/process-text', json={'text': SAMPLE_TEXT, **options})
+            assert response.status_code == 200
+            response.get_data()
+            response.close()
+        assert metrics.get('stage_cache.misses') == 1
+        assert metrics.get('stage_cache.hits') == 2
+
+
+# Run tests with: pytest tests/test_stage_cache.py -v
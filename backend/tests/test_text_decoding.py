@@ -0,0 +1,52 @@
+"""
+Unit Tests for Text Stream Decoding
+Tests BOM/charset detection and the incremental length limit
+"""
+
+import io
+import pytest
+from utils.text_decoding import TextTooLongError, decode_stream, detect_bom
+
+
+class TestTextDecoding:
+    """Test suite for decode_stream"""
+    
+    def test_utf8_default(self):
+        """Test undeclared bytes decode as UTF-8"""
+        text, encoding = decode_stream(io.BytesIO('Héllo'.encode('utf-8')), 100)
+        assert text == 'Héllo'
+        assert encoding == 'utf-8'
+    
+    def test_bom_overrides_charset(self):
+        """Test BOM detection wins over a declared charset"""
+        data = 'Héllo wörld'.encode('utf-16')
+        text, encoding = decode_stream(io.BytesIO(data), 100, charset='latin-1')
+        assert text == 'Héllo wörld'
+        assert encoding.startswith('utf-16')
+    
+    def test_declared_charset(self):
+        """Test the Content-Type charset is honoured"""
+        text, _ = decode_stream(io.BytesIO('café'.encode('latin-1')), 100, charset='ISO-8859-1')
+        assert text == 'café'
+    
+    def test_multibyte_split_across_chunks(self):
+        """Test characters split between reads are decoded intact"""
+        data = ('é' * 1000).encode('utf-8')
+        text, _ = decode_stream(io.BytesIO(data), 5000, chunk_size=7)
+        assert text == 'é' * 1000
+    
+    def test_too_long_stops_early(self):
+        """Test oversized input raises before the stream is fully read"""
+        stream = io.BytesIO(b'a' * 100_000)
+        with pytest.raises(TextTooLongError):
+            decode_stream(stream, 10, chunk_size=1024)
+        assert stream.tell() < 100_000
+    
+    def test_detect_bom(self):
+        """Test BOM lookup order"""
+        assert detect_bom(b'\xff\xfe\x00\x00abc') == ('utf-32-le', 4)
+        assert detect_bom(b'\xef\xbb\xbfabc') == ('utf-8', 3)
+        assert detect_bom(b'abc') == (None, 0)
+
+
+# Run tests with: pytest tests/test_text_decoding.py -v
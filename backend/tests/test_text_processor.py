@@ -153,6 +153,42 @@ class TestTextProcessor:
         assert "is" in result
         assert "well-known" in result
         assert "today" in result
+    
+    @pytest.mark.parametrize('text', [
+        "Hello   world. This is a test.",
+        "The state-of-the-art technology is well-known today",
+        "one-two-three-four-five a--b -x- trailing-",
+        "",
+    ])
+    def test_split_word_spans_match_split_words(self, text):
+        """Test word spans slice out exactly the split_words() tokens"""
+        normalized = self.processor.normalize(text)
+        starts, lengths = self.processor.split_word_spans(normalized)
+        spans = [normalized[s:s + n] for s, n in zip(starts, lengths)]
+        assert spans == self.processor.split_words(normalized)
+    
+    def test_word_metadata_flags(self):
+        """Test per-word flags match split_words_with_metadata()"""
+        text = "INTRODUCTION\nSome normal text here.\nALL CAPS SHOUTING LINE FOR EMPHASIS HERE TODAY"
+        words_with_meta = self.processor.split_words_with_metadata(text)
+        flags = self.processor.word_metadata_flags(text, len(words_with_meta))
+        assert list(flags) == [
+            (1 if meta['is_heading'] else 0) | (2 if meta['is_all_caps'] else 0)
+            for _, meta in words_with_meta
+        ]
+    
+    def test_repeated_lines_reuse_metadata(self):
+        """Test repeated lines are analysed once and counted in line_stats"""
+        text = "PAGE HEADER\nFirst page text.\nPAGE HEADER\nSecond page text.\n\nPAGE HEADER"
+        words_with_meta = self.processor.split_words_with_metadata(text)
+        line_stats = {}
+        flags = self.processor.word_metadata_flags(text, len(words_with_meta), line_stats)
+        assert list(flags) == [
+            (1 if meta['is_heading'] else 0) | (2 if meta['is_all_caps'] else 0)
+            for _, meta in words_with_meta
+        ]
+        assert line_stats == {'lines': 5, 'repeated_lines': 2}
+        assert self.processor.count_repeated_lines(text) == 2
 
 
 # Run tests with: pytest tests/test_text_processor.py -v
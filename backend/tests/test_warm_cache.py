@@ -0,0 +1,66 @@
+"""
+Unit Tests for Boot-time Warm Cache
+Tests that pre-computed tables match the uncached code paths
+"""
+
+import pytest
+from services import warm_cache
+from services.orp_calculator import ORPCalculator
+from services.word_preprocessor import WordPreprocessor
+
+
+class TestWarmCache:
+    """Test suite for warm_cache"""
+    
+    def setup_method(self):
+        """Setup test fixtures"""
+        warm_cache.reset()
+        self.calculator = ORPCalculator()
+    
+    def teardown_method(self):
+        """Leave the module cold for other tests"""
+        warm_cache.reset()
+    
+    def test_load_word_list_respects_count(self):
+        """Test that the bundled list is truncated to N words"""
+        words = warm_cache.load_word_list(50)
+        assert len(words) == 50
+        assert words[0] == "the"
+        assert len(set(words)) == 50
+    
+    def test_expand_variants(self):
+        """Test capitalized and punctuated variants are generated"""
+        variants = warm_cache.expand_variants(["read"])
+        assert variants == ["read", "read,", "read.", "Read", "Read,", "Read."]
+    
+    def test_warm_up_populates_tables(self):
+        """Test warm-up builds immutable tables"""
+        assert not warm_cache.is_warm()
+        stats = warm_cache.warm_up(100)
+        assert warm_cache.is_warm()
+        assert stats['orp_entries'] == stats['tokens']
+        
+        with pytest.raises(TypeError):
+            warm_cache._orp_splits['new'] = ('', '', '', 0)
+    
+    def test_warm_split_matches_computed(self):
+        """Test cached ORP splits equal freshly computed ones"""
+        warm_cache.warm_up(200)
+        for token in warm_cache.expand_variants(warm_cache.load_word_list(200)):
+            assert warm_cache.lookup_split(token) is not None
+            assert self.calculator.split_word(token) == self.calculator.compute_split(token)
+    
+    def test_warm_classification_matches_uncached(self):
+        """Test cached token classes give the same preprocessing output"""
+        words = ["The", "information,", "world.", "government", "is", "unknownword;"]
+        cold = WordPreprocessor(long_word_threshold=7, pause_count=4).preprocess(words)
+        
+        warm_cache.warm_up()
+        warm = WordPreprocessor(long_word_threshold=7, pause_count=4).preprocess(words)
+        assert warm == cold
+        
+        # Same table serves a different threshold
+        assert WordPreprocessor(long_word_threshold=3)._should_duplicate("world") is True
+
+
+# Run tests with: pytest tests/test_warm_cache.py -v
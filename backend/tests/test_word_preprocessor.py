@@ -133,6 +133,36 @@ class TestWordPreprocessor:
         
         # Should be duplicated
         assert result.count("wonderful") == 3
+    
+    def test_preprocess_with_headings_pauses(self):
+        """Test pauses around a heading and after sentences"""
+        words_with_meta = [
+            ("CHAPTER", {'is_heading': True, 'is_all_caps': True}),
+            ("ONE", {'is_heading': True, 'is_all_caps': True}),
+            ("Hello.", {'is_heading': False, 'is_all_caps': False}),
+        ]
+        result = self.preprocessor.preprocess_with_headings(words_with_meta)
+        words = [item['word'] for item in result]
+        
+        # 4 pauses before the heading, 5 after it, 4 after the sentence
+        assert words == [' '] * 4 + ["CHAPTER", "ONE"] + [' '] * 5 + ["Hello."] + [' '] * 4
+        assert result[4] == {'word': "CHAPTER", 'is_heading': True, 'display_multiplier': 3}
+        assert result[11]['display_multiplier'] == 1
+    
+    def test_heading_at_end_is_closed(self):
+        """Test a trailing heading still gets its closing pauses"""
+        result = self.preprocessor.preprocess_with_headings([("Summary", {'is_heading': True})])
+        assert [item['word'] for item in result] == [' '] * 4 + ["Summary"] + [' '] * 5
+    
+    def test_token_actions_are_cached(self):
+        """Test each distinct token is classified once per instance"""
+        self.preprocessor.preprocess(["wonderful,", "wonderful,", "end."])
+        assert set(self.preprocessor._actions) == {"wonderful,", "end."}
+    
+    def test_customize_duplication(self):
+        """Test custom duplication map is case-insensitive"""
+        result = self.preprocessor.customize_duplication(["Hello", "hello", "x"], {'hello': 2, 'x': 0})
+        assert result == ["Hello", "Hello", "hello", "hello"]
 
 
 # Run tests with: pytest tests/test_word_preprocessor.py -v
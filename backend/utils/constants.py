@@ -25,6 +25,9 @@ ORP_LOOKUP_TABLE = {
     # 14+ → position 5
 }
 
+# ORP position for words longer than the lookup table
+ORP_MAX_POSITION = 5
+
 # Alternative ORP calculation method (percentage-based)
 ORP_PERCENTAGE = 0.35  # Optimal viewing position at ~35% from start
 
@@ -59,6 +62,12 @@ DEFAULT_LONG_WORD_THRESHOLD = 7  # Words longer than this get duplicated
 DEFAULT_PAUSE_COUNT = 4  # Number of blank pauses after sentences
 DEFAULT_DUPLICATION_COUNT = 3  # How many times to show long words
 
+# Accepted (min, max) for per-request pacing options
+PACING_OPTION_RANGES = {
+    'long_word_threshold': (1, 50),
+    'pause_count': (1, 20),
+}
+
 
 # ============================================================
 # READING SPEED CONSTANTS
@@ -85,6 +94,9 @@ DEFAULT_WPM = 300
 
 # Supported file types (for future features)
 SUPPORTED_DOCUMENT_TYPES = ['.txt', '.pdf', '.docx', '.epub']
+
+# Document types /process-text accepts as plain-text uploads
+TEXT_UPLOAD_EXTENSIONS = ['.txt']
 SUPPORTED_IMAGE_TYPES = ['.jpg', '.jpeg', '.png', '.gif']
 
 # File size limits (bytes)
@@ -0,0 +1,53 @@
+"""
+Consistent Hashing
+Hash ring with virtual nodes for sharding cache keys across peers
+"""
+
+import hashlib
+from bisect import bisect
+from typing import Iterable, List, Optional
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """
+    Maps keys to nodes so that adding or removing a node only moves the
+    keys of that node. Each node is placed on the ring `replicas` times
+    (virtual nodes) to even out the load.
+    """
+
+    def __init__(self, nodes: Iterable[str], replicas: int = 100):
+        self.nodes = list(dict.fromkeys(nodes))
+        self.replicas = replicas
+        points = sorted(
+            (_hash(f'{node}#{replica}'), node)
+            for node in self.nodes
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def preference_list(self, key: str) -> List[str]:
+        """All nodes in ring order starting at the key's owner."""
+        if not self._hashes:
+            return []
+        start = bisect(self._hashes, _hash(key)) % len(self._hashes)
+        ordered = []
+        for index in range(start, start + len(self._owners)):
+            node = self._owners[index % len(self._owners)]
+            if node not in ordered:
+                ordered.append(node)
+                if len(ordered) == len(self.nodes):
+                    break
+        return ordered
+
+    def node_for(self, key: str, exclude: Iterable[str] = ()) -> Optional[str]:
+        """The first node for key that isn't excluded (e.g. marked down)."""
+        excluded = set(exclude)
+        for node in self.preference_list(key):
+            if node not in excluded:
+                return node
+        return None
@@ -0,0 +1,53 @@
+"""
+Sized LRU
+Thread-safe LRU bounded by the total size of its entries
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict
+
+from services.metrics import metrics
+
+
+class SizedLRU:
+    """
+    Thread-safe LRU of objects bounded by caller-supplied sizes. Hits,
+    misses and evictions are counted under the `name` metrics prefix.
+    """
+
+    def __init__(self, max_bytes: int, name: str):
+        self.max_bytes = max_bytes
+        self.name = name
+        self.total_bytes = 0
+        self._entries: 'OrderedDict[str, Any]' = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        metrics.increment(f'{self.name}.hits' if value is not None else f'{self.name}.misses')
+        return value
+
+    def put(self, key: str, value: Any, size: int) -> bool:
+        """Store a value; returns False when it alone exceeds the budget."""
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._sizes[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                evicted, _ = self._entries.popitem(last=False)
+                self.total_bytes -= self._sizes.pop(evicted)
+                metrics.increment(f'{self.name}.evictions')
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
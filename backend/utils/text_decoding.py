@@ -0,0 +1,74 @@
+"""
+Text Stream Decoding
+Incremental bytes-to-text decoding with BOM/charset detection
+"""
+
+import codecs
+from typing import BinaryIO, Optional, Tuple
+
+# Longest BOMs first so UTF-32 LE isn't mistaken for UTF-16 LE
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+DEFAULT_ENCODING = 'utf-8'
+DECODE_CHUNK_SIZE = 64 * 1024
+
+
+class TextTooLongError(ValueError):
+    pass
+
+
+def detect_bom(head: bytes) -> Tuple[Optional[str], int]:
+    """Return (encoding, bom_length) for a byte-order mark at the start of head."""
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding, len(bom)
+    return None, 0
+
+
+def resolve_encoding(name: Optional[str]) -> Optional[str]:
+    """Normalize a charset label, or None if Python doesn't know it."""
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.strip().strip('"\'')).name
+    except LookupError:
+        return None
+
+
+def decode_stream(stream: BinaryIO, max_chars: int, charset: str = None,
+                  chunk_size: int = DECODE_CHUNK_SIZE) -> Tuple[str, str]:
+    """
+    Decode a byte stream to text chunk by chunk.
+
+    A BOM wins over the declared charset, which wins over UTF-8. Invalid
+    bytes are replaced rather than rejected. Raises TextTooLongError as
+    soon as more than max_chars characters have been decoded, so oversized
+    uploads are never fully read. Returns (text, encoding used).
+    """
+    head = stream.read(chunk_size)
+    bom_encoding, bom_length = detect_bom(head)
+    encoding = bom_encoding or resolve_encoding(charset) or DEFAULT_ENCODING
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    parts = []
+    total = 0
+    chunk = head[bom_length:]
+    while True:
+        final = not chunk
+        text = decoder.decode(chunk, final=final)
+        if text:
+            total += len(text)
+            if total > max_chars:
+                raise TextTooLongError(f"Text too long (maximum {max_chars} characters)")
+            parts.append(text)
+        if final:
+            break
+        chunk = stream.read(chunk_size)
+
+    return ''.join(parts), encoding
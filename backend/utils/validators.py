@@ -70,6 +70,20 @@ class Validator:
         
         return True, None
     
+    @staticmethod
+    def validate_int_option(value, name: str, minimum: int, maximum: int) -> Tuple[bool, Optional[str]]:
+        # Query-string and form values arrive as strings; isdigit() alone
+        # would pass digits int() can't parse, such as '²'
+        if isinstance(value, str) and value.strip().isascii() and value.strip().isdecimal():
+            value = int(value)
+        if not isinstance(value, int) or isinstance(value, bool):
+            return False, f"{name} must be an integer"
+        
+        if value < minimum or value > maximum:
+            return False, f"{name} must be between {minimum} and {maximum}"
+        
+        return True, None
+    
     @staticmethod
     def validate_file_extension(filename: str, allowed_extensions: list) -> Tuple[bool, Optional[str]]:
         if not filename: